@@ -0,0 +1,89 @@
+"""Cold-start import benchmark.
+
+Imports the app entry point in a fresh interpreter with ``-X importtime``,
+prints the most expensive imports and exits non-zero when the total import
+cost exceeds the budget.
+
+    python benchmarks/import_budget.py --budget-ms 1000
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '1000'))
+
+
+def measure_imports(module, runs=1):
+    """Import a module with -X importtime and return {name: (self_us, cumulative_us)}."""
+    best = None
+    for _ in range(runs):
+        env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        timings = parse_importtime(result.stderr)
+        if best is None or total_ms(timings) < total_ms(best):
+            best = timings
+    return best
+
+
+def parse_importtime(output):
+    """Parse 'import time: self | cumulative | name' lines."""
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def total_ms(timings):
+    return sum(self_us for self_us, _ in timings.values()) / 1000
+
+
+def by_package(timings):
+    """Sum self time per top-level package."""
+    packages = defaultdict(int)
+    for name, (self_us, _) in timings.items():
+        packages[name.split(".")[0]] += self_us
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N cold imports")
+    args = parser.parse_args()
+
+    timings = measure_imports(args.module, args.runs)
+    total = total_ms(timings)
+
+    print(f"Top {args.top} imports by cumulative time:")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    ranked = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    print("\nSelf time by top-level package:")
+    for package, self_us in by_package(timings)[:args.top]:
+        print(f"{self_us / 1000:>9.1f} ms  {package}")
+
+    print(f"\nTotal import time for '{args.module}': {total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if total > args.budget_ms:
+        print("FAIL: cold-start import cost exceeds the budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
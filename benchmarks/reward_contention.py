@@ -0,0 +1,183 @@
+"""Reward claim contention benchmark.
+
+Runs concurrent claimers against the claim API and checks that no reward
+is claimed twice and no balance is overspent or drifts from the ledger:
+
+- same-reward: every worker races for the same rewards
+- same-balance: every worker spends from one person's balance
+- independent: each worker claims its own rewards with its own balance,
+  which should scale with workers since no lock is shared
+
+It writes inactive family members, rewards and ledger entries under a
+"bench-<run>" name prefix, so point it at a scratch database.
+
+    python benchmarks/reward_contention.py --workers 16 --claims 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def create_members(cur, names):
+    """Create inactive family members, kept off the app's pickers; returns their ids."""
+    member_ids = []
+    for name in names:
+        cur.execute("""
+            INSERT INTO family_members (name, active) VALUES (%s, FALSE)
+            RETURNING member_id
+        """, (name,))
+        member_ids.append(cur.fetchone()[0])
+    return member_ids
+
+
+def seed(cur, prefix, users, points_each, rewards, cost):
+    """Give members a starting balance and create rewards; returns the reward ids."""
+    from utils.points import add_ledger_entry
+    for user in users:
+        add_ledger_entry(cur, user, points_each, 'adjustment')
+    cur.execute("""
+        INSERT INTO rewards (reward_name, points_required, description)
+        SELECT %s || '-reward-' || n, %s, 'benchmark'
+        FROM generate_series(1, %s) AS n
+        RETURNING reward_id
+    """, (prefix, cost, rewards))
+    return [row[0] for row in cur.fetchall()]
+
+
+def run_claims(jobs, workers):
+    """Run (reward_id, user) claims across workers starting together; returns (results, latencies, seconds)."""
+    from utils.rewards import claim_reward
+    barrier = threading.Barrier(workers)
+    chunks = [jobs[i::workers] for i in range(workers)]
+
+    def worker(chunk):
+        barrier.wait()
+        outcomes = []
+        for reward_id, user in chunk:
+            started = time.perf_counter()
+            result = claim_reward(reward_id, user)
+            outcomes.append((reward_id, user, result, time.perf_counter() - started))
+        return outcomes
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = [item for chunk in pool.map(worker, chunks) for item in chunk]
+    return outcomes, time.perf_counter() - started
+
+
+def check_invariants(cur, users, reward_ids):
+    """Return a list of violated invariants for the given member ids and rewards."""
+    problems = []
+    cur.execute("""
+        SELECT reward_id, COUNT(*) FROM points_ledger
+        WHERE reason = 'reward' AND reward_id = ANY(%s)
+        GROUP BY reward_id HAVING COUNT(*) > 1
+    """, (reward_ids,))
+    for reward_id, count in cur.fetchall():
+        problems.append(f"reward {reward_id} was paid for {count} times")
+    cur.execute("""
+        SELECT COUNT(*) FROM rewards r
+        WHERE r.reward_id = ANY(%s) AND (r.claimed_by_id IS NOT NULL) <> EXISTS (
+            SELECT 1 FROM points_ledger l WHERE l.reason = 'reward' AND l.reward_id = r.reward_id
+        )
+    """, (reward_ids,))
+    mismatched = cur.fetchone()[0]
+    if mismatched:
+        problems.append(f"{mismatched} rewards are claimed without a ledger entry or the reverse")
+    cur.execute("""
+        SELECT l.member_id, SUM(l.points), b.points
+        FROM points_ledger l
+        LEFT JOIN points_balance b ON b.member_id = l.member_id
+        WHERE l.member_id = ANY(%s)
+        GROUP BY l.member_id, b.points
+    """, (users,))
+    for user, ledger_total, balance in cur.fetchall():
+        if balance != ledger_total:
+            problems.append(f"member {user}: balance {balance} does not match ledger total {ledger_total}")
+        if balance is not None and balance < 0:
+            problems.append(f"member {user}: balance went negative ({balance})")
+    return problems
+
+
+def report(name, outcomes, seconds):
+    statuses = Counter(result.status for _, _, result, _ in outcomes)
+    latencies = sorted(latency * 1000 for *_, latency in outcomes)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{name:>13}: {len(outcomes)} claims in {seconds:.2f}s ({len(outcomes) / seconds:.0f}/s), "
+          f"p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms, "
+          + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--claims", type=int, default=50, help="claims per worker")
+    parser.add_argument("--cost", type=int, default=10)
+    args = parser.parse_args()
+
+    # One pooled connection per worker plus one for setup and checks
+    os.environ['DB_POOL_MAX'] = str(max(int(os.environ.get('DB_POOL_MAX', '20')), args.workers + 2))
+    from utils.database import get_db_connection
+    from utils.init_database import ensure_database
+    from utils.rewards import CLAIMED
+    if not ensure_database():
+        print("FAIL: database is not available")
+        return 1
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    total = args.workers * args.claims
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            # Everyone races for a few rewards and has points for all of them
+            racers = create_members(cur, [f"{prefix}-racer-{i}" for i in range(args.workers)])
+            contested = seed(cur, f"{prefix}-race", racers, args.cost * args.claims, args.claims, args.cost)
+            # One balance that covers half of the claims made against it
+            spender, = create_members(cur, [f"{prefix}-spender"])
+            shared = seed(cur, f"{prefix}-shared", [spender], args.cost * total // 2, total, args.cost)
+            # Nothing shared between workers
+            loners = create_members(cur, [f"{prefix}-loner-{i}" for i in range(args.workers)])
+            own = seed(cur, f"{prefix}-own", loners, args.cost * args.claims, total, args.cost)
+        conn.commit()
+
+        scenarios = [
+            ("same-reward", [(reward_id, user) for reward_id in contested for user in racers],
+             {CLAIMED: len(contested)}),
+            ("same-balance", [(reward_id, spender) for reward_id in shared], {CLAIMED: total // 2}),
+            ("independent", [(own[w * args.claims + i], loners[w]) for i in range(args.claims)
+                             for w in range(args.workers)], {CLAIMED: total}),
+        ]
+        problems = []
+        for name, jobs, expected in scenarios:
+            outcomes, seconds = run_claims(jobs, args.workers)
+            statuses = report(name, outcomes, seconds)
+            for status, count in expected.items():
+                if statuses[status] != count:
+                    problems.append(f"{name}: expected {count} {status}, got {statuses[status]}")
+
+        with conn.cursor() as cur:
+            problems += check_invariants(cur, racers + [spender] + loners, contested + shared + own)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        return 1
+    print("OK: no reward claimed twice, no balance overspent or out of step with the ledger")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,31 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+def start_metrics():
+    """Serve Prometheus metrics on a side port, off the Streamlit request path."""
+    if os.environ.get('METRICS_ENABLED', 'true').lower() == 'false':
+        return
+    from utils.metrics_server import start_metrics_server
+    start_metrics_server()
+
+def warm_up():
+    """Prepare the pool, schema, stylesheet and reference data before accepting traffic."""
+    if os.environ.get('WARMUP_ENABLED', 'true').lower() == 'false':
+        return
+    from utils.warmup import warm_up as run_warm_up
+    run_warm_up()
+
+def start_scheduler():
+    """Generate recurring chores on a background thread rather than on page views."""
+    from utils.chore_rotation import start_chore_scheduler
+    start_chore_scheduler()
+
 def run_app():
     import streamlit.web.bootstrap as bootstrap
+    # Metrics first, so /ready reports progress while the warm-up runs
+    start_metrics()
+    warm_up()
+    start_scheduler()
     flag_options = {
         'server.port': 5000,
         'server.headless': True,
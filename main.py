@@ -1,22 +1,13 @@
 import streamlit as st
-from datetime import datetime, timedelta
 from utils.database import get_db_connection
-from utils.helpers import format_date, is_mobile
-from utils.notifications import (
-    get_notifications, mark_notification_as_read, 
-    get_unread_count, check_and_create_notifications,
-    get_notification_color, get_notification_sound
-)
-from psycopg2.extras import RealDictCursor
-from utils.styles import get_mobile_styles, get_base_styles
-from utils.init_database import initialize_database
-from utils.websocket import websocket_manager
-from utils.logger import log_info, log_error
-from pages.calendar import main as calendar_viewc
-from pages.grocery_list import main as display_shopping_view
-from pages.events import main as render_events_view
-from pages.home import main as home_view
-from pages.todolist import main as display_todo_list
+from utils.notifications import get_unread_count
+from utils.styles import inject_stylesheet
+from utils.warmup import warm_up
+from utils.chore_rotation import start_chore_scheduler
+from utils.logger import log_error
+from utils.performance import performance_monitor
+from utils.memory_diagnostics import memory_diagnostics
+from pages import load_page
 
 # Must be the first Streamlit command
 st.set_page_config(
@@ -26,77 +17,95 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# View key -> (navigation label, page module); None marks a placeholder.
+# Page modules are imported on first use, so only the active view's code loads.
+VIEWS = {
+    "home": ("🏠 Home", "home"),
+    "tasks": ("✅ Tasks", "todolist"),
+    "calendar": ("📅 Calendar", "calendar"),
+    "shopping": ("🛒 Shopping", "grocery_list"),
+    "events": ("📋 Events", "events"),
+    "family": ("👨‍👩‍👧‍👦 Family", None),
+    "gym": ("🏋️ Gym", None),
+    "school": ("🎓 School", None),
+    "finances": ("📈 Finances", None),
+    "goals": ("📊 Goals", None),
+    "celebrations": ("🎉 Celebrations", None),
+}
+DEFAULT_VIEW = "home"
+
+# The unread badge refreshes on its own, without rerunning the whole page
+NOTIFICATION_REFRESH_SECONDS = 60
+
+def select_view():
+    """Render the view selector and return the active view key."""
+    if "active_view" not in st.session_state:
+        requested = st.query_params.get("view", DEFAULT_VIEW)
+        st.session_state.active_view = requested if requested in VIEWS else DEFAULT_VIEW
+    
+    view = st.radio(
+        "View",
+        options=list(VIEWS),
+        format_func=lambda key: VIEWS[key][0],
+        key="active_view",
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    # Mirror the selection into the URL so views can be deep-linked
+    if st.query_params.get("view") != view:
+        st.query_params["view"] = view
+    return view
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+@performance_monitor.track_render()
+def notification_badge():
+    """Display the family's unread notification count."""
+    conn = get_db_connection()
+    if conn:
+        try:
+            unread = get_unread_count(conn)
+        finally:
+            conn.close()
+        if unread:
+            st.markdown(
+                f'<div class="notification-badge">🔔 {unread} unread</div>',
+                unsafe_allow_html=True
+            )
+
+@performance_monitor.track_response_time(page="main", operation="rerun")
 def main():
     """Main application function."""
+    with performance_monitor.span("rerun", page="main"):
+        render_app()
+    memory_diagnostics.record_session_state_size()
+
+def render_app():
+    """Render the dashboard header and the active view."""
     try:
-        # Initialize database
-        initialize_database()
+        # No-op once the warm-up has run; covers `streamlit run main.py` without bootstrap.py
+        warm_up()
+        # Likewise starts once per process; chores are generated on its timer, not per rerun
+        start_chore_scheduler()
         
         # Add base styles and header
+        inject_stylesheet()
         st.markdown("""
-            <style>
-                /* Header container */
-                .dashboard-header {
-                    text-align: center;
-                    padding: 2rem;
-                    background: linear-gradient(90deg, rgba(255,75,75,0.1) 0%, rgba(255,143,0,0.1) 100%);
-                    border-radius: 10px;
-                    margin: 1rem 0 3rem 0;
-                    position: relative;
-                    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-                    border: 1px solid rgba(255,255,255,0.1);
-                    clear: both;
-                    display: block;
-                    width: 100%;
-                }
-                
-                /* Title styling */
-                .main-title {
-                    font-size: 2.5rem;
-                    font-weight: bold;
-                    background: linear-gradient(45deg, #FF4B4B, #FF8F00);
-                    -webkit-background-clip: text;
-                    -webkit-text-fill-color: transparent;
-                    margin-bottom: 1rem;
-                    text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
-                    line-height: 1.4;
-                    display: block;
-                }
-                
-                /* Subtitle styling */
-                .subtitle {
-                    font-size: 1.2rem;
-                    color: #9CA3AF;
-                    animation: fadeInOut 4s infinite;
-                    display: block;
-                    margin-top: 0.5rem;
-                    clear: both;
-                }
-            </style>
-            
             <div class="dashboard-header">
                 <h1 class="main-title">🏠 Family Hub Dashboard</h1>
                 <p class="subtitle">Organizing Family Life Together</p>
             </div>
         """, unsafe_allow_html=True)
         
-        # Create tabs
-        tabs = st.tabs([
-            "🏠 Home", "✅ Tasks", "📅 Calendar", "🛒 Shopping",
-            "📋 Events", "👨‍👩‍👧‍👦 Family", "🏋️ Gym", "🎓 School",
-            "📈 Finances", "📊 Goals", "🎉 Celebrations"
-        ])
-        
-        # Tab content
-        with tabs[0]: home_view()
-        with tabs[1]: display_todo_list()
-        with tabs[2]: calendar_viewc()
-        with tabs[3]: display_shopping_view()
-        with tabs[4]: render_events_view()
+        notification_badge()
         
-        # Placeholder tabs
-        for i in range(5, 11):
-            with tabs[i]:
+        # Navigation: only the selected view is executed on each rerun
+        view = select_view()
+        label, page_name = VIEWS[view]
+        with performance_monitor.span("tab", page=label.split(" ", 1)[1]):
+            page = load_page(page_name) if page_name else None
+            if page:
+                page.main()
+            else:
                 st.info("This feature is coming soon!")
                 
     except Exception as e:
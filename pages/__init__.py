@@ -1,9 +1,24 @@
-# Empty file to make the directory a Python package
+# Page modules, imported on first use through load_page()
 import importlib
+import sys
+import time
 
 def load_page(page_name):
-    """Load a page module by name."""
+    """Load a page module by name, importing it on first use."""
+    module_name = f"pages.{page_name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    start = time.perf_counter()
     try:
-        return importlib.import_module(f"pages.{page_name}")
-    except ImportError:
-        return None
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        # Only a page that does not exist yet is "coming soon"; a broken
+        # import inside the page is raised and logged by the caller
+        if e.name == module_name:
+            return None
+        raise
+    
+    from utils.performance import performance_monitor
+    performance_monitor.record('page_import_time', time.perf_counter() - start, page=page_name)
+    return module
@@ -2,8 +2,19 @@ import streamlit as st
 from datetime import datetime, timedelta
 from utils.database import get_db_connection
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
 from psycopg2.extras import RealDictCursor
+from utils.list_renderer import CardTemplate, render_list
 
+EVENT_CARD = CardTemplate("""
+    <div class="list-card">
+        <div class="list-card-title">$title</div>
+        <p>$description</p>
+        <div class="list-card-meta">Date: $date | Type: $event_type</div>
+    </div>
+""")
+
+@performance_monitor.track_render("calendar.main")
 def main():
     display_header()
     display_page_title("Calendar 📅")
@@ -16,6 +27,7 @@ def main():
     selected_month = st.date_input("Select Month", current_date)
     
     # Get events for the selected month
+    events = []
     conn = get_db_connection()
     if conn:
         try:
@@ -59,21 +71,20 @@ def main():
     
     # Display upcoming events
     st.subheader("Upcoming Events")
-    if 'events' in locals() and events:
-        for event in events:
-            st.markdown(f"""
-                <div style='padding: 10px; border-left: 3px solid var(--primary-color); 
-                    margin: 5px 0; background: rgba(255,255,255,0.05); border-radius: 5px;'>
-                    <h3>{event['title']}</h3>
-                    <p>{event['description']}</p>
-                    <small style='color: #9CA3AF;'>
-                        Date: {event['start_date'].strftime('%Y-%m-%d')} | 
-                        Type: {event['event_type']}
-                    </small>
-                </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.info("No events found for the selected month")
+    render_list(
+        (
+            {
+                'title': event['title'],
+                'description': event['description'],
+                'date': event['start_date'].strftime('%Y-%m-%d'),
+                'event_type': event['event_type']
+            }
+            for event in events
+        ),
+        EVENT_CARD,
+        empty_message="No events found for the selected month",
+        name="calendar_events"
+    )
 
 if __name__ == "__main__":
     main()
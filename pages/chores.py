@@ -4,6 +4,34 @@ from utils.database import get_db_connection
 from utils.helpers import format_date
 from psycopg2.extras import RealDictCursor
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
+from utils.reference_data import get_family_members
+from utils.list_renderer import CardTemplate, render_list
+from utils.pagination import KeysetPaginator
+from utils.chores import complete_chores, fetch_chore_page
+from utils.points import DEFAULT_CHORE_POINTS, get_leaderboard
+from utils.chore_rotation import (
+    FREQUENCIES, ROTATE_EVERY, WEEKDAYS, add_chore_template, generate_chores, get_chore_templates,
+    stop_chore_template
+)
+from utils.rewards import (
+    ALREADY_CLAIMED, CLAIMED, INSUFFICIENT_POINTS, add_reward, claim_reward, get_available_rewards
+)
+
+# Chores ticked off on another device show up within this many seconds
+CHORE_REFRESH_SECONDS = 60
+
+CHORE_CARD = CardTemplate("""
+    <div class="list-card $variant">
+        <div class="list-card-title">$task</div>
+        <div>Assigned to: $member</div>
+        <div>Status: $status</div>
+        <div>Points: $points</div>
+    </div>
+""")
+# Same colours the per-row st.info / st.warning / st.success boxes used;
+# overdue chores get st.error's
+CHORE_VARIANTS = {"today": "info", "tomorrow": "warning", "upcoming": "success", "overdue": "error"}
 
 def add_sample_chores():
     """Add sample chores data to the database."""
@@ -24,11 +52,12 @@ def add_sample_chores():
                 cur.execute("SELECT COUNT(*) FROM chores")
                 count = cur.fetchone()[0]
                 if count == 0:
-                    for chore in sample_chores:
+                    members = get_family_members()
+                    for task, name, due_date, completed in sample_chores:
                         cur.execute("""
-                            INSERT INTO chores (task, assigned_to, due_date, completed)
+                            INSERT INTO chores (task, member_id, due_date, completed)
                             VALUES (%s, %s, %s, %s)
-                        """, chore)
+                        """, (task, members.id_for(name), due_date, completed))
                     conn.commit()
                     st.success("Sample chores added successfully!")
         except Exception as e:
@@ -36,6 +65,7 @@ def add_sample_chores():
         finally:
             conn.close()
 
+@performance_monitor.track_render("chores.main")
 def main():
     display_header()
     display_page_title("Family Chores ✨")
@@ -48,77 +78,246 @@ def main():
     with st.expander("Add New Chore"):
         with st.form("new_chore"):
             task = st.text_input("Task Description")
-            assigned_to = st.selectbox("Assign To", 
-                ["Emma", "James", "Sarah", "David"])
+            members = get_family_members()
+            member_id = st.selectbox("Assign To", members.ids(), format_func=members.name)
             due_date = st.date_input("Due Date")
+            points = st.number_input("Points", min_value=0, value=DEFAULT_CHORE_POINTS, step=5)
             
             if st.form_submit_button("Add Chore"):
-                conn = get_db_connection()
-                if conn and task:
+                if task:
+                    conn = get_db_connection()
+                    if conn:
+                        try:
+                            with conn.cursor() as cur:
+                                cur.execute("""
+                                    INSERT INTO chores (task, member_id, due_date, points)
+                                    VALUES (%s, %s, %s, %s)
+                                """, (task, member_id, due_date, points))
+                            conn.commit()
+                            st.success("Chore added successfully!")
+                        except Exception as e:
+                            st.error(f"Error adding chore: {type(e).__name__}")
+                        finally:
+                            conn.close()
+    
+    display_recurring_chores()
+    
+    # Filter options
+    st.sidebar.subheader("Filter Options")
+    members = get_family_members()
+    filter_person = st.sidebar.multiselect(
+        "Filter by Person",
+        members.ids(),
+        format_func=members.name
+    )
+    
+    # Show completed checkbox moved out of sidebar with default True
+    show_completed = st.checkbox("Show Completed Tasks", value=True)
+    
+    display_chore_list(filter_person, show_completed)
+    display_rewards()
+
+def describe_template(template, members):
+    """One line describing when a recurring chore happens and who it rotates through."""
+    when = "Every day" if template['frequency'] == 'daily' else f"Every {WEEKDAYS[template['weekday'] - 1]}"
+    rotation = " → ".join(members.name(member_id) for member_id in template['rotation']) or "Unassigned"
+    return f"**{template['task']}** · {when} · {rotation} (next person each {template['rotate_every']})"
+
+def display_recurring_chores():
+    """Set up chores that repeat and rotate between family members."""
+    members = get_family_members()
+    with st.expander("Recurring Chores"):
+        with st.form("new_chore_template"):
+            task = st.text_input("Task Description", key="template_task")
+            rotation = st.multiselect(
+                "Rotate between (in order)", members.ids(), format_func=members.name
+            )
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                frequency = st.selectbox("Repeats", FREQUENCIES, index=1)
+            with col2:
+                weekday = st.selectbox(
+                    "On (weekly)", range(1, 8), format_func=lambda day: WEEKDAYS[day - 1]
+                )
+            with col3:
+                rotate_every = st.selectbox("Next person each", ROTATE_EVERY)
+            start_date = st.date_input("Starting", key="template_start")
+            points = st.number_input(
+                "Points", min_value=0, value=DEFAULT_CHORE_POINTS, step=5, key="template_points"
+            )
+            if st.form_submit_button("Add Recurring Chore") and task:
+                try:
+                    template_id = add_chore_template(
+                        task, rotation, frequency, weekday, rotate_every, start_date, points
+                    )
+                    # Schedule the new chore right away instead of waiting for the next run
+                    created = generate_chores(template_ids=[template_id])
+                    st.success(f"Recurring chore added, {created} chores scheduled")
+                except Exception as e:
+                    st.error(f"Error adding recurring chore: {type(e).__name__}")
+        
+        for template in get_chore_templates():
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(describe_template(template, members))
+            with col2:
+                if st.button("Stop", key=f"stop_template_{template['template_id']}"):
                     try:
-                        with conn.cursor() as cur:
-                            cur.execute("""
-                                INSERT INTO chores (task, assigned_to, due_date)
-                                VALUES (%s, %s, %s)
-                            """, (task, assigned_to, due_date))
-                        conn.commit()
-                        st.success("Chore added successfully!")
+                        stop_chore_template(template['template_id'])
+                        st.rerun()
                     except Exception as e:
-                        st.error(f"Error adding chore: {type(e).__name__}")
-                    finally:
-                        conn.close()
+                        st.error(f"Error stopping recurring chore: {type(e).__name__}")
+
+CLAIM_MESSAGES = {
+    ALREADY_CLAIMED: "Someone else just claimed that reward",
+    INSUFFICIENT_POINTS: "Not enough points yet",
+}
+
+def display_rewards():
+    """Let family members spend their points on rewards."""
+    st.subheader("Rewards 🎁")
+    with st.expander("Add Reward"):
+        with st.form("new_reward"):
+            reward_name = st.text_input("Reward")
+            points_required = st.number_input("Points required", min_value=1, value=50, step=10)
+            description = st.text_input("Description")
+            if st.form_submit_button("Add Reward") and reward_name:
+                try:
+                    add_reward(reward_name, points_required, description or None)
+                    st.success("Reward added!")
+                except Exception as e:
+                    st.error(f"Error adding reward: {type(e).__name__}")
     
-    # Display chores
+    rewards = {reward['reward_id']: reward for reward in get_available_rewards()}
+    if not rewards:
+        st.info("No rewards available")
+        return
+    with st.form("claim_reward"):
+        col1, col2 = st.columns(2)
+        with col1:
+            reward_id = st.selectbox(
+                "Reward",
+                options=list(rewards),
+                format_func=lambda rid: f"{rewards[rid]['reward_name']} ({rewards[rid]['points_required']} points)"
+            )
+        with col2:
+            members = get_family_members()
+            member_id = st.selectbox("Claim for", members.ids(), format_func=members.name)
+        if st.form_submit_button("Claim"):
+            try:
+                result = claim_reward(reward_id, member_id)
+            except Exception as e:
+                st.error(f"Error claiming reward: {type(e).__name__}")
+                return
+            if result.status == CLAIMED:
+                st.success(f"{members.name(member_id)} claimed {rewards[reward_id]['reward_name']}! {result.balance} points left")
+            else:
+                st.warning(CLAIM_MESSAGES.get(result.status, "The reward is busy, please try again"))
+
+@performance_monitor.track_render()
+def display_leaderboard():
+    """Show points standings, read from the running balances rather than the ledger."""
+    st.subheader("Leaderboard 🏆")
+    standings = get_leaderboard()
+    if not standings:
+        st.info("No points earned yet")
+        return
+    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    st.dataframe(
+        [
+            {"": medals.get(row['rank'], str(row['rank'])), "Name": row['name'], "Points": row['points']}
+            for row in standings
+        ],
+        hide_index=True,
+        use_container_width=True
+    )
+
+def complete_selected_chores():
+    """Mark the chores picked in the 'Mark as done' box as completed."""
+    chore_ids = st.session_state.get("chores_to_complete", [])
+    if not chore_ids:
+        return
+    try:
+        completed, points = complete_chores(chore_ids)
+        st.session_state.chores_to_complete = []
+        if points:
+            st.toast(f"{completed} chores done, {points} points earned!")
+    except Exception as e:
+        st.error(f"Error completing chores: {type(e).__name__}")
+
+@st.fragment(run_every=CHORE_REFRESH_SECONDS)
+@performance_monitor.track_render()
+def display_chore_list(filter_person, show_completed):
+    """Display chores by day; reruns on its own when chores are ticked off.
+
+    Each tab fetches one keyset page with the person, completed and date
+    filters pushed into the query.
+    """
+    today = datetime.now().date()
+    pages = {}
     conn = get_db_connection()
     if conn:
         try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT * FROM chores 
-                    ORDER BY due_date, completed
-                """)
-                chores = cur.fetchall()
-                
-                # Filter options
-                st.sidebar.subheader("Filter Options")
-                filter_person = st.sidebar.multiselect(
-                    "Filter by Person",
-                    ["Emma", "James", "Sarah", "David"]
-                )
-                
-                # Show completed checkbox moved out of sidebar with default True
-                show_completed = st.checkbox("Show Completed Tasks", value=True)
-                
-                # Display chores in tabs by date
-                st.subheader("Tasks Overview")
-                tab1, tab2, tab3 = st.tabs(["Today", "Tomorrow", "Upcoming"])
-                
-                today = datetime.now().date()
-                tomorrow = today + timedelta(days=1)
-                
-                for chore in chores:
-                    if (not filter_person or chore[2] in filter_person) and \
-                       (show_completed or not chore[3]):
-                        
-                        due_date = chore[3]
-                        content = f"""
-                        **{chore[1]}**  
-                        Assigned to: {chore[2]}  
-                        Status: {'✅ Completed' if chore[3] else '⏳ Pending'}
-                        """
-                        
-                        if due_date == today:
-                            with tab1:
-                                st.info(content)
-                        elif due_date == tomorrow:
-                            with tab2:
-                                st.warning(content)
-                        else:
-                            with tab3:
-                                st.success(content)
-                                
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                for bucket in CHORE_VARIANTS:
+                    paginator = KeysetPaginator(
+                        f"chores_{bucket}", filters=(sorted(filter_person), show_completed, today)
+                    )
+                    pages[bucket] = (paginator, fetch_chore_page(
+                        cur, paginator,
+                        people=filter_person,
+                        # Past chores that were done are history, not overdue
+                        completed=None if show_completed and bucket != "overdue" else False,
+                        window=bucket,
+                        today=today
+                    ))
         finally:
             conn.close()
+    
+    members = get_family_members()
+    # Pending chores on the pages being shown can be ticked off
+    pending = {
+        chore['id']: chore
+        for _, page in pages.values() for chore in page.rows
+        if not chore['completed']
+    }
+    if pending:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.multiselect(
+                "Mark as done",
+                options=list(pending),
+                format_func=lambda chore_id: f"{pending[chore_id]['task']} ({members.name(pending[chore_id]['member_id'])})",
+                key="chores_to_complete"
+            )
+        with col2:
+            st.button("Complete", key="complete_chores", on_click=complete_selected_chores)
+    
+    # Display chores in tabs by date
+    st.subheader("Tasks Overview")
+    tabs = st.tabs(["Today", "Tomorrow", "Upcoming", "Overdue"])
+    
+    # One HTML block per tab, however many chores there are
+    for tab, (bucket, (paginator, page)) in zip(tabs, pages.items()):
+        with tab:
+            render_list(
+                (
+                    {
+                        'variant': CHORE_VARIANTS[bucket],
+                        'task': chore['task'],
+                        'member': members.name(chore['member_id']),
+                        'status': '✅ Completed' if chore['completed'] else '⏳ Pending',
+                        'points': chore['points'] if chore['points'] is not None else DEFAULT_CHORE_POINTS
+                    }
+                    for chore in page.rows
+                ),
+                CHORE_CARD,
+                name=f"chores_{bucket}"
+            )
+            paginator.controls(page)
+    
+    # Inside the fragment, so completing chores updates the standings too
+    display_leaderboard()
 
 if __name__ == "__main__":
     main()
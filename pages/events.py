@@ -1,10 +1,11 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from utils.database import get_db_connection
 from utils.helpers import configure_page, format_date
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
 
+@performance_monitor.track_render("events.main")
 def main():
     display_header()
     display_page_title("Events 📅")
@@ -5,8 +5,147 @@ from utils.helpers import configure_page, format_date, is_mobile
 from utils.styles import get_mobile_styles
 from psycopg2.extras import RealDictCursor
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
+from utils.grocery import merge_grocery_items, summarize_merge
+from utils.meal_plans import week_bounds
+from utils.shopping_list import generate_shopping_list, missing_items
 
+# Items added or bought on another device show up within this many seconds
+GROCERY_REFRESH_SECONDS = 30
+
+def mark_selected_purchased():
+    """Mark the items picked in the 'Mark as purchased' box as bought."""
+    item_ids = st.session_state.get("grocery_to_purchase", [])
+    if not item_ids:
+        return
+    conn = get_db_connection()
+    if conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE grocery_items SET purchased = TRUE
+                    WHERE id = ANY(%s)
+                """, (item_ids,))
+            conn.commit()
+            st.session_state.grocery_to_purchase = []
+        except Exception as e:
+            st.error(f"Error updating grocery list: {str(e)}")
+        finally:
+            conn.close()
+
+@st.fragment(run_every=GROCERY_REFRESH_SECONDS)
+@performance_monitor.track_render()
+def display_grocery_items():
+    """Display unpurchased items by category; reruns on its own."""
+    items = []
+    conn = get_db_connection()
+    if conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT id, item, quantity, unit, category
+                    FROM grocery_items
+                    WHERE purchased = FALSE
+                    ORDER BY category, item
+                """)
+                items = cur.fetchall()
+        finally:
+            conn.close()
+    
+    if not items:
+        st.info("The grocery list is empty")
+        return
+    
+    by_id = {item['id']: item for item in items}
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.multiselect(
+            "Mark as purchased",
+            options=list(by_id),
+            format_func=lambda item_id: by_id[item_id]['item'],
+            key="grocery_to_purchase"
+        )
+    with col2:
+        st.button("Purchased", key="mark_purchased", on_click=mark_selected_purchased)
+    
+    current_category = None
+    for item in items:
+        category = item['category'] or "Other"
+        if category != current_category:
+            st.subheader(category)
+            current_category = category
+        st.markdown(f"- {item['quantity']} {item['unit'] or ''} {item['item']}")
+
+def display_shopping_list_generator():
+    """Aggregate the ingredients planned over a date range against the list.
+
+    Expander bodies run even when collapsed, so nothing is queried until
+    the list is switched on.
+    """
+    if not st.toggle("Build shopping list", key="build_shopping_list"):
+        return
+    week_start, week_end = week_bounds(datetime.now().date())
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_date = st.date_input("From", value=week_start, key="shopping_start")
+    with col2:
+        end_date = st.date_input("To", value=week_end, key="shopping_end")
+    with col3:
+        servings = st.number_input("Servings per meal", min_value=0, value=0, key="shopping_servings",
+                                   help="0 keeps each recipe's own servings")
+    
+    if end_date < start_date:
+        st.warning("The end date is before the start date")
+        return
+    
+    try:
+        shopping_list = generate_shopping_list(start_date, end_date, servings or None)
+    except Exception as e:
+        st.error(f"Error generating shopping list: {str(e)}")
+        return
+    if shopping_list is None or shopping_list.empty:
+        st.info("No meals with recipes planned in this range")
+        return
+    
+    st.dataframe(
+        shopping_list[['item', 'required', 'on_list', 'to_buy', 'unit', 'meals']],
+        hide_index=True,
+        use_container_width=True
+    )
+    missing = missing_items(shopping_list)
+    if not missing:
+        st.success("Everything for these meals is already on the list")
+    elif st.button(f"Add {len(missing)} missing items", key="add_missing_items"):
+        try:
+            rows = merge_grocery_items(missing)
+            if rows:
+                inserted, merged = summarize_merge(rows)
+                st.success(f"Added {inserted} items, topped up {merged} existing items")
+        except Exception as e:
+            st.error(f"Error adding items: {str(e)}")
+
+@performance_monitor.track_render("grocery_list.main")
 def main():
     display_header()
     display_page_title("Grocery List 🛒")
-    # Rest of the code...
+    
+    with st.expander("Add Item"):
+        with st.form("new_grocery_item"):
+            item = st.text_input("Item")
+            quantity = st.number_input("Quantity", min_value=1, value=1)
+            unit = st.selectbox("Unit", ["piece", "g", "kg", "ml", "l", "cup", "tbsp", "tsp"])
+            category = st.text_input("Category")
+            
+            if st.form_submit_button("Add Item") and item:
+                # Merges into an unpurchased item with the same name and unit
+                try:
+                    rows = merge_grocery_items([(item, quantity, unit)], category=category or None)
+                    if rows:
+                        st.success("Item added!" if rows[0]['inserted'] else "Quantity added to existing item!")
+                except Exception as e:
+                    st.error(f"Error adding item: {str(e)}")
+    
+    with st.expander("Generate from meal plan"):
+        display_shopping_list_generator()
+    
+    display_grocery_items()
@@ -1,16 +1,20 @@
 import streamlit as st
 from utils.database import get_db_connection
 from utils.header import display_header
+from utils.performance import performance_monitor
 from datetime import datetime, timedelta
 
-# Must be the first Streamlit command
-st.set_page_config(
-    page_title="Home | Family Hub",
-    page_icon="🏠",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
+# Must be the first Streamlit command when run as its own page; main.py
+# configures the page itself before loading this module as a view.
+if __name__ == "__main__":
+    st.set_page_config(
+        page_title="Home | Family Hub",
+        page_icon="🏠",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
 
+@performance_monitor.track_render("home.main")
 def main():
     st.markdown('<div class="page-transition">', unsafe_allow_html=True)
     
@@ -1,241 +1,139 @@
+import io
 import streamlit as st
 from datetime import datetime, timedelta
 from utils.database import get_db_connection
 from utils.helpers import format_date
 from psycopg2.extras import RealDictCursor
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
+from utils.reference_data import invalidate_recipes
+from utils.recipe_search import search_recipes
+from utils.recipe_import import import_recipe_file
+from utils.list_renderer import CardTemplate
+from utils.fragment_cache import fragment_cache
+from utils.grocery import add_recipes_to_grocery_list, summarize_merge
+from utils.meal_plans import MEAL_TYPES, MealPlanRange, week_bounds, save_meal_plan as save_meal_plan_row
 
-# Add responsive styles
-st.markdown("""
-<style>
-    /* Mobile-friendly styles */
-    @media (max-width: 768px) {
-        .stColumn {
-            flex: 0 1 100% !important;
-            width: 100% !important;
-            margin-bottom: 1rem;
-        }
-        
-        .meal-card {
-            margin: 0.5rem 0;
-            padding: 0.75rem;
-        }
-        
-        .meal-title {
-            font-size: 1.1rem;
-        }
-        
-        .meal-description {
-            font-size: 0.9rem;
-        }
-    }
-    
-    /* Enhanced card styling */
-    .meal-card {
-        background-color: var(--secondary-background-color);
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.75rem 0;
-        border-left: 4px solid var(--primary-color);
-    }
-    
-    .meal-header {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        margin-bottom: 0.5rem;
-    }
-    
-    .meal-title {
-        color: #FFFFFF;
-        font-weight: bold;
-        font-size: 1.2rem;
-    }
-    
-    .meal-type {
-        background: var(--primary-color);
-        padding: 0.25rem 0.5rem;
-        border-radius: 4px;
-        font-size: 0.8rem;
-        color: #FFFFFF;
-    }
-    
-    .meal-content {
-        color: #FFFFFF;
-        font-size: 1rem;
-    }
-    
-    .ingredient-list {
-        margin-top: 1rem;
-        padding-left: 1rem;
-    }
-    
-    .ingredient-item {
-        margin: 0.5rem 0;
-        color: #FFFFFF;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-def get_existing_meal(date, meal_type):
-    """Get existing meal plan for a specific date and meal type."""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT recipe_id, notes
-                    FROM meal_plans
-                    WHERE date = %s AND meal_type = %s
-                """, (date, meal_type))
-                return cur.fetchone() or {}
-        finally:
-            conn.close()
-    return {}
+RECIPE_CARD = CardTemplate("""
+    <div class="meal-card">
+        <div class="meal-header">
+            <span class="meal-title">$name</span>
+            <span class="meal-type">Recipe</span>
+        </div>
+        <div class="meal-content">
+            <p>$description</p>
+            <p><strong>Servings:</strong> $servings<br>
+            <strong>Prep Time:</strong> $prep_time minutes</p>
+            <p><strong>Instructions:</strong><br>
+            $instructions</p>
+        </div>
+    </div>
+""")
+INGREDIENT_ITEM = CardTemplate("""
+    <div class="ingredient-item">• $quantity $unit $name</div>
+""")
 
-def save_meal_plan(date, meal_type, recipe_id, notes):
+def save_meal_plan(meal_plans, date, meal_type, recipe_id, notes):
     """Save or update a meal plan."""
     if recipe_id == 0:
         st.warning("Please select a recipe first")
         return
         
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                existing = get_existing_meal(date, meal_type)
-                if existing:
-                    cur.execute("""
-                        UPDATE meal_plans
-                        SET recipe_id = %s, notes = %s
-                        WHERE date = %s AND meal_type = %s
-                    """, (recipe_id, notes, date, meal_type))
-                else:
-                    cur.execute("""
-                        INSERT INTO meal_plans
-                        (date, meal_type, recipe_id, notes)
-                        VALUES (%s, %s, %s, %s)
-                    """, (date, meal_type, recipe_id, notes))
-                conn.commit()
-                st.success(f"{meal_type} plan saved!")
-        except Exception as e:
-            st.error(f"Error saving meal plan: {str(e)}")
-        finally:
-            conn.close()
+    try:
+        if save_meal_plan_row(date, meal_type, recipe_id, notes):
+            meal_plans.set_meal(date, meal_type, recipe_id, notes)
+            st.success(f"{meal_type} plan saved!")
+    except Exception as e:
+        st.error(f"Error saving meal plan: {str(e)}")
+
+def render_recipe_card(recipe, ingredients):
+    """Build the recipe preview HTML: details card plus ingredient list."""
+    html = RECIPE_CARD.render(
+        name=recipe['name'],
+        description=recipe['description'],
+        servings=recipe['servings'],
+        prep_time=recipe['prep_time'],
+        instructions=recipe['instructions']
+    )
+    if ingredients:
+        items = "".join(
+            INGREDIENT_ITEM.render(quantity=f"{float(ing['quantity']):g}", unit=ing['unit'], name=ing['ingredient_name'])
+            for ing in ingredients
+        )
+        html += f'<div class="ingredient-list">{items}</div>'
+    return html
 
-def display_recipe_preview(recipe_id):
+@performance_monitor.track_render()
+def display_recipe_preview(recipe, key_suffix=""):
     """Display a preview of the recipe details."""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute('''
-                    SELECT r.name, r.description, r.servings, r.prep_time,
-                           COALESCE(r.instructions, '') as instructions
-                    FROM recipes r 
-                    WHERE r.recipe_id = %s
-                ''', (recipe_id,))
-                recipe = cur.fetchone()
-                
-                if recipe:
-                    st.markdown(f'''
-                    <div class="meal-card">
-                        <div class="meal-header">
-                            <span class="meal-title">{recipe['name']}</span>
-                            <span class="meal-type">Recipe</span>
-                        </div>
-                        <div class="meal-content">
-                            <p>{recipe['description']}</p>
-                            <p><strong>Servings:</strong> {recipe['servings']}<br>
-                            <strong>Prep Time:</strong> {recipe['prep_time']} minutes</p>
-                            <p><strong>Instructions:</strong><br>
-                            {recipe['instructions']}</p>
-                        </div>
-                    </div>
-                    ''', unsafe_allow_html=True)
-                    
-                    # Get ingredients
-                    cur.execute("""
-                        SELECT ingredient_name, quantity, unit
-                        FROM recipe_ingredients
-                        WHERE recipe_id = %s
-                    """, (recipe_id,))
-                    ingredients = cur.fetchall()
-                    
-                    if ingredients:
-                        st.markdown('<div class="ingredient-list">', unsafe_allow_html=True)
-                        for ing in ingredients:
-                            st.markdown(
-                                f'<div class="ingredient-item">• {ing["quantity"]} {ing["unit"]} {ing["ingredient_name"]}</div>',
-                                unsafe_allow_html=True
-                            )
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Add to grocery list button
-                        servings = st.number_input(
-                            "Servings to make:", 
-                            min_value=1, 
-                            value=recipe['servings'],
-                            key=f"servings_preview_{recipe_id}"
-                        )
-                        if st.button("Add ingredients to grocery list", key=f"add_to_grocery_{recipe_id}"):
-                            add_ingredients_to_grocery_list(recipe_id, servings / recipe['servings'])
-        finally:
-            conn.close()
+    ingredients = recipe['ingredients']
+    # The card is re-rendered only when the recipe or one of its ingredients changes
+    version = (recipe['row_version'],) + tuple(ing['row_version'] for ing in ingredients)
+    st.markdown(
+        fragment_cache.render(
+            ("recipe_preview", recipe['recipe_id'], version),
+            lambda: render_recipe_card(recipe, ingredients),
+            cache="fragments:recipe_preview"
+        ),
+        unsafe_allow_html=True
+    )
+    
+    if ingredients:
+        # Add to grocery list button
+        servings = st.number_input(
+            "Servings to make:", 
+            min_value=1, 
+            value=recipe['servings'],
+            key=f"servings_preview_{recipe['recipe_id']}{key_suffix}"
+        )
+        if st.button("Add ingredients to grocery list", key=f"add_to_grocery_{recipe['recipe_id']}{key_suffix}"):
+            add_ingredients_to_grocery_list({recipe['recipe_id']: servings / recipe['servings']})
 
-def add_ingredients_to_grocery_list(recipe_id, servings_multiplier=1):
-    """Add recipe ingredients to grocery list."""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT ingredient_name, quantity, unit
-                    FROM recipe_ingredients
-                    WHERE recipe_id = %s
-                """, (recipe_id,))
-                ingredients = cur.fetchall()
-                
-                for ingredient in ingredients:
-                    qty = float(ingredient['quantity']) * servings_multiplier
-                    
-                    cur.execute("""
-                        SELECT id, quantity
-                        FROM grocery_items
-                        WHERE item = %s AND purchased = FALSE
-                    """, (ingredient['ingredient_name'],))
-                    existing = cur.fetchone()
-                    
-                    if existing:
-                        cur.execute("""
-                            UPDATE grocery_items
-                            SET quantity = quantity + %s
-                            WHERE id = %s
-                        """, (qty, existing['id']))
-                    else:
-                        cur.execute("""
-                            INSERT INTO grocery_items
-                            (item, quantity, unit, category)
-                            VALUES (%s, %s, %s, 'From Meal Plan')
-                        """, (ingredient['ingredient_name'], qty, ingredient['unit']))
-                
-                conn.commit()
-                st.success("Ingredients added to grocery list!")
-        except Exception as e:
-            st.error(f"Error managing ingredients: {str(e)}")
-        finally:
-            conn.close()
+def add_ingredients_to_grocery_list(multipliers):
+    """Add the scaled ingredients of one or more recipes to the grocery list."""
+    try:
+        rows = add_recipes_to_grocery_list(multipliers)
+    except Exception as e:
+        st.error(f"Error managing ingredients: {str(e)}")
+        return
+    if rows is not None:
+        inserted, merged = summarize_merge(rows)
+        st.success(f"Ingredients added to grocery list! ({inserted} new, {merged} merged)")
+
+def recipe_choices(meal_plans, query, selected_id):
+    """Return {recipe_id: name} for the search results, keeping the selected recipe."""
+    options = {0: "Select a recipe..."}
+    if selected_id:
+        recipe = meal_plans.get_recipe(selected_id)
+        if recipe:
+            options[selected_id] = recipe['name']
+    options.update((r['recipe_id'], r['name']) for r in search_recipes(query))
+    return options
+
+@st.fragment
+def display_meal_plan(meal_plans, date, meal_type):
+    """Display meal plan for a specific meal type.
 
-def display_meal_plan(date, meal_type, recipe_options):
-    """Display meal plan for a specific meal type."""
-    existing_meal = get_existing_meal(date, meal_type)
+    Runs as a fragment, so picking a recipe, opening its details or saving
+    reruns only this meal column.
+    """
+    existing_meal = meal_plans.get_meal(date, meal_type)
+    
+    # Only the top matches are loaded, not the whole recipe table
+    query = st.text_input(
+        "Search recipes",
+        key=f"recipe_search_{date}_{meal_type}",
+        placeholder="Name or ingredient"
+    )
+    selected_id = st.session_state.get(f"{date}_{meal_type}", existing_meal.get('recipe_id') or 0)
+    recipe_options = recipe_choices(meal_plans, query, selected_id)
     
     recipe_id = st.selectbox(
         "Select Recipe",
         options=list(recipe_options.keys()),
         format_func=lambda x: recipe_options[x],
         key=f"{date}_{meal_type}",
-        index=list(recipe_options.keys()).index(existing_meal.get('recipe_id', 0))
+        index=list(recipe_options.keys()).index(selected_id) if selected_id in recipe_options else 0
     )
     
     if existing_meal.get('notes'):  # Only show notes if they exist
@@ -250,12 +148,64 @@ def display_meal_plan(date, meal_type, recipe_options):
     
     # Always keep recipe details expanded when a recipe is selected
     if recipe_id != 0:
-        with st.expander("Recipe Details", expanded=True):
-            display_recipe_preview(recipe_id)
+        recipe = meal_plans.get_recipe(recipe_id)
+        if recipe:
+            with st.expander("Recipe Details", expanded=True):
+                # The same recipe can be planned for several meals of the day
+                display_recipe_preview(recipe, key_suffix=f"_{date}_{meal_type}")
     
     if st.button("Save", key=f"save_{date}_{meal_type}"):
-        save_meal_plan(date, meal_type, recipe_id, notes)
+        save_meal_plan(meal_plans, date, meal_type, recipe_id, notes)
 
+@performance_monitor.track_render()
+def display_week_view(meal_plans):
+    """Display the planned meals for every day of the loaded week."""
+    rows = []
+    for day in meal_plans.days():
+        row = {"Day": day.strftime("%a %d %b")}
+        for meal_type in MEAL_TYPES:
+            recipe = meal_plans.recipes.get(meal_plans.get_meal(day, meal_type).get('recipe_id'))
+            row[meal_type] = recipe['name'] if recipe else ""
+        rows.append(row)
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+    
+    # Every planned meal of the week in a single merge
+    multipliers = {}
+    for meal in meal_plans.meals.values():
+        if meal['recipe_id'] in meal_plans.recipes:
+            multipliers[meal['recipe_id']] = multipliers.get(meal['recipe_id'], 0) + 1
+    if multipliers and st.button("Add week's ingredients to grocery list", key="add_week_to_grocery"):
+        add_ingredients_to_grocery_list(multipliers)
+
+def display_recipe_import():
+    """Bulk-load recipes from an uploaded CSV, JSON or JSON Lines file."""
+    st.caption(
+        "CSV: one row per ingredient with columns name, description, servings, prep_time, "
+        "instructions, ingredient_name, quantity, unit. JSON: a list of recipes, each with "
+        "an ingredients list of name, quantity and unit. Recipes with an existing name are updated."
+    )
+    uploaded_file = st.file_uploader("Recipe file", type=['csv', 'json', 'jsonl'], key="recipe_import_file")
+    if uploaded_file is None or not st.button("Import Recipes", key="import_recipes"):
+        return
+    
+    progress = st.empty()
+    stream = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    result = import_recipe_file(
+        stream,
+        uploaded_file.name,
+        progress=lambda loaded, failed: progress.caption(f"{loaded} recipes loaded, {failed} errors")
+    )
+    progress.empty()
+    if result.inserted or result.updated:
+        st.success(
+            f"Imported {result.inserted} new and updated {result.updated} recipes "
+            f"({result.ingredients} ingredients) in {result.seconds:.1f}s"
+        )
+    if result.errors:
+        st.warning(f"{len(result.errors)} problems; the affected recipes were skipped")
+        st.dataframe([error._asdict() for error in result.errors], hide_index=True, use_container_width=True)
+
+@performance_monitor.track_render("mealplanner.main")
 def main():
     display_header()
     display_page_title("Meal Planner 🍽️")
@@ -335,6 +285,7 @@ def main():
                                         """, (recipe_id, ing[0], ing[1], ing[2]))
                                     
                                     conn.commit()
+                                    invalidate_recipes()
                                     st.success("Recipe added successfully!")
                                     st.session_state.num_ingredients = 3  # Reset ingredient count
                             except Exception as e:
@@ -343,33 +294,32 @@ def main():
                     finally:
                         conn.close()
     
+    with st.expander("Import Recipes"):
+        display_recipe_import()
+    
     # Meal Planning section
     st.header("Meal Planning")
     date = st.date_input("Select date", datetime.now(), key="meal_plan_date")
+    view = st.radio("View", ["Day", "Week"], horizontal=True, key="meal_plan_view")
+    
+    # The whole week is loaded at once; both views read from it
+    meal_plans = MealPlanRange.load(*week_bounds(date))
+    
+    if view == "Week":
+        display_week_view(meal_plans)
+        return
     
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get all recipes for selection
-                cur.execute("SELECT recipe_id, name FROM recipes ORDER BY name")
-                recipes = cur.fetchall()
-                recipe_options = {r['recipe_id']: r['name'] for r in recipes}
-                recipe_options[0] = "Select a recipe..."
-                
-                # Display meal types side by side
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.subheader("🌅 Breakfast")
-                    display_meal_plan(date, "Breakfast", recipe_options)
-                with col2:
-                    st.subheader("☀️ Lunch")
-                    display_meal_plan(date, "Lunch", recipe_options)
-                with col3:
-                    st.subheader("🌙 Dinner")
-                    display_meal_plan(date, "Dinner", recipe_options)
-        finally:
-            conn.close()
+    # Display meal types side by side
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("🌅 Breakfast")
+        display_meal_plan(meal_plans, date, "Breakfast")
+    with col2:
+        st.subheader("☀️ Lunch")
+        display_meal_plan(meal_plans, date, "Lunch")
+    with col3:
+        st.subheader("🌙 Dinner")
+        display_meal_plan(meal_plans, date, "Dinner")
 
 if __name__ == "__main__":
     main()
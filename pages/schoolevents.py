@@ -4,6 +4,22 @@ from utils.database import get_db_connection
 from utils.helpers import format_date
 from psycopg2.extras import RealDictCursor
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
+from utils.list_renderer import CardTemplate, render_list
+from utils.pagination import KeysetPaginator
+from utils.fragment_cache import ROW_VERSION
+
+# The timeline starts this many days back unless an earlier date is picked
+EVENT_HISTORY_DAYS = 7
+
+EVENT_CARD = CardTemplate("""
+    <div class="list-card tinted" style="background-color: $color;">
+        <div class="list-card-title">$title</div>
+        <p><strong>Date:</strong> $date</p>
+        <p><strong>Type:</strong> $event_type</p>
+        <p>$description</p>
+    </div>
+""")
 
 def add_sample_school_events():
     """Add sample school events to the database."""
@@ -50,6 +66,7 @@ def get_event_color(event_type):
     }
     return colors.get(event_type, "#FFFFFF")
 
+@performance_monitor.track_render("schoolevents.main")
 def main():
     display_header()
     display_page_title("School Events 🎓")
@@ -68,65 +85,67 @@ def main():
                 ["Conference", "Performance", "Academic", "Sports", "Other"])
             
             if st.form_submit_button("Add Event"):
-                conn = get_db_connection()
-                if conn and title:
-                    try:
-                        with conn.cursor() as cur:
-                            cur.execute("""
-                                INSERT INTO school_events 
-                                (title, description, event_date, event_type)
-                                VALUES (%s, %s, %s, %s)
-                            """, (title, description, event_date, event_type))
-                        conn.commit()
-                        st.success("Event added successfully!")
-                    except Exception as e:
-                        st.error(f"Error adding event: {type(e).__name__}")
-                    finally:
-                        conn.close()
+                if title:
+                    conn = get_db_connection()
+                    if conn:
+                        try:
+                            with conn.cursor() as cur:
+                                cur.execute("""
+                                    INSERT INTO school_events 
+                                    (title, description, event_date, event_type)
+                                    VALUES (%s, %s, %s, %s)
+                                """, (title, description, event_date, event_type))
+                            conn.commit()
+                            st.success("Event added successfully!")
+                        except Exception as e:
+                            st.error(f"Error adding event: {type(e).__name__}")
+                        finally:
+                            conn.close()
+    
+    # Filter options, pushed down into the query
+    st.sidebar.subheader("Filter Options")
+    filter_type = st.sidebar.multiselect(
+        "Filter by Event Type",
+        ["Conference", "Performance", "Academic", "Sports", "Other"]
+    )
+    start_date = st.sidebar.date_input(
+        "Show events from", datetime.now().date() - timedelta(days=EVENT_HISTORY_DAYS)
+    )
+    
+    # Timeline view
+    st.subheader("School Events Timeline")
     
-    # Display school events
     conn = get_db_connection()
     if conn:
         try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT * FROM school_events 
-                    ORDER BY event_date
-                """)
-                events = cur.fetchall()
-                
-                # Filter options
-                st.sidebar.subheader("Filter Options")
-                filter_type = st.sidebar.multiselect(
-                    "Filter by Event Type",
-                    ["Conference", "Performance", "Academic", "Sports", "Other"]
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                where, params = ["event_date >= %s"], [start_date]
+                if filter_type:
+                    where.append("event_type = ANY(%s)")
+                    params.append(filter_type)
+                paginator = KeysetPaginator("school_events", filters=(filter_type, start_date))
+                page = paginator.fetch(
+                    cur, "school_events", f"id, title, description, event_date, event_type, {ROW_VERSION}",
+                    order_by=("event_date", "id"), where=where, params=params
                 )
-                
-                # Timeline view
-                st.subheader("School Events Timeline")
-                
-                today = datetime.now().date()
-                for event in events:
-                    if not filter_type or event[4] in filter_type:
-                        event_date = event[3]
-                        
-                        # Create colored box based on event type
-                        st.markdown(f"""
-                        <div style="
-                            background-color: {get_event_color(event[4])};
-                            padding: 10px;
-                            border-radius: 5px;
-                            margin: 5px 0;
-                        ">
-                            <h3>{event[1]}</h3>
-                            <p><strong>Date:</strong> {format_date(str(event_date))}</p>
-                            <p><strong>Type:</strong> {event[4]}</p>
-                            <p>{event[2]}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
         finally:
             conn.close()
+        
+        render_list(
+            page.rows,
+            EVENT_CARD,
+            empty_message="No school events found",
+            name="school_events",
+            fields=lambda event: {
+                'color': get_event_color(event['event_type']),
+                'title': event['title'],
+                'date': format_date(str(event['event_date'])),
+                'event_type': event['event_type'],
+                'description': event['description']
+            },
+            cache_key=lambda event: ("school_event", event['id'], event['row_version'])
+        )
+        paginator.controls(page)
 
 if __name__ == "__main__":
     main()
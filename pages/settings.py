@@ -12,6 +12,13 @@ from utils.system_info import get_system_info
 from utils.backup_manager import create_backup, restore_backup
 from utils.header import display_header
 from utils.logger import display_logs_in_settings, clear_old_logs
+from utils.performance import performance_monitor
+from utils.query_stats import query_stats, N_PLUS_ONE_THRESHOLD
+from utils.profiler import profiler, MAX_PROFILE_SECONDS
+from utils.memory_diagnostics import memory_diagnostics, DEFAULT_SCHEDULE_SECONDS
+from utils.tracing import tracer
+from utils.family import add_family_member, deactivate_family_member
+from utils.reference_data import get_family_members, invalidate_family_members
 import json
 
 def render_settings_page():
@@ -27,7 +34,8 @@ def render_settings_page():
         "🔔 Notifications",
         "💾 Backup & Restore",
         "ℹ️ System Info",
-        "📝 Logs"
+        "📝 Logs",
+        "👪 Family"
     ])
     
     # Load current settings
@@ -64,6 +72,147 @@ def render_settings_page():
                     reset_settings()
                     st.success("Settings reset to defaults")
                     st.rerun()
+        
+        # Render timings
+        st.subheader("Render Timings")
+        render_report = performance_monitor.get_render_report()
+        if render_report:
+            st.dataframe(render_report, use_container_width=True, hide_index=True)
+        else:
+            st.info("No render timings recorded yet")
+        
+        session_timings = performance_monitor.get_session_render_timings()
+        for timing in reversed(session_timings[-5:]):
+            with st.expander(
+                f"{timing['timestamp']} · {timing['name']} · "
+                f"{timing['duration_ms']} ms ({timing['db_ms']} ms in database)"
+            ):
+                st.dataframe(timing['spans'], use_container_width=True, hide_index=True)
+        
+        # Top queries
+        st.subheader("Top Queries")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            sort_by = st.selectbox(
+                "Sort by",
+                ["total_ms", "calls", "p95_ms", "max_per_rerun", "rows"],
+                key="top_queries_sort"
+            )
+        with col2:
+            if st.button("Reset Query Stats"):
+                query_stats.reset()
+        
+        top_queries = query_stats.top_queries(sort_by=sort_by)
+        if top_queries:
+            st.dataframe(top_queries, use_container_width=True, hide_index=True)
+        else:
+            st.info("No queries recorded yet")
+        
+        detections = query_stats.get_detections()
+        if detections:
+            st.warning(
+                f"Possible N+1 queries: {len(detections)} statement(s) ran "
+                f"{N_PLUS_ONE_THRESHOLD}+ times within a single rerun"
+            )
+            st.dataframe(detections, use_container_width=True, hide_index=True)
+        
+        # Sampling profiler
+        st.subheader("Sampling Profiler")
+        profile_status = profiler.status()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            profile_seconds = st.number_input(
+                "Seconds to profile",
+                min_value=1,
+                max_value=MAX_PROFILE_SECONDS,
+                value=10,
+                key="profile_seconds"
+            )
+        with col2:
+            if st.button(f"Profile next {profile_seconds} seconds", disabled=profile_status['running']):
+                if profiler.start(profile_seconds):
+                    st.rerun()
+                else:
+                    st.warning("A profile is already running")
+        
+        if profile_status['running']:
+            st.info(
+                f"Profiling all script threads: {profile_status['elapsed']:.0f}/"
+                f"{profile_status['duration']}s, {profile_status['samples']} samples"
+            )
+            if st.button("Refresh Profile Status"):
+                st.rerun()
+        elif profile_status['finished_at']:
+            st.caption(
+                f"Last profile: {profile_status['started_at']:%Y-%m-%d %H:%M:%S}, "
+                f"{profile_status['samples']} samples, "
+                f"{profile_status['overhead']:.2%} sampling overhead"
+            )
+            st.dataframe(profiler.top_functions(), use_container_width=True, hide_index=True)
+            st.download_button(
+                "Download Collapsed Stacks",
+                profiler.collapsed_stacks(),
+                file_name=f"profile_{profile_status['started_at']:%Y%m%d_%H%M%S}.folded",
+                mime="text/plain"
+            )
+        
+        # Memory diagnostics
+        st.subheader("Memory")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Take Memory Snapshot"):
+                with st.spinner("Taking snapshot..."):
+                    memory_diagnostics.take_snapshot()
+        with col2:
+            scheduled = st.toggle(
+                f"Snapshot every {DEFAULT_SCHEDULE_SECONDS // 60} minutes",
+                value=memory_diagnostics.scheduled
+            )
+            if scheduled and not memory_diagnostics.scheduled:
+                memory_diagnostics.start_schedule()
+            elif not scheduled and memory_diagnostics.scheduled:
+                memory_diagnostics.stop_schedule()
+        with col3:
+            if memory_diagnostics.tracing and st.button("Stop Memory Tracing"):
+                memory_diagnostics.stop_tracing()
+                st.rerun()
+        
+        snapshots = memory_diagnostics.list_snapshots()
+        if snapshots:
+            st.dataframe(snapshots, use_container_width=True, hide_index=True)
+        if len(snapshots) >= 2:
+            group_by = st.radio("Group growth by", ["lineno", "filename", "traceback"], horizontal=True)
+            st.write("Top allocation sites by growth since the previous snapshot")
+            st.dataframe(
+                memory_diagnostics.compare(key_type=group_by),
+                use_container_width=True,
+                hide_index=True
+            )
+        elif memory_diagnostics.tracing:
+            st.info("Take another snapshot to see what is growing")
+        
+        memory_diagnostics.record_session_state_size(force=True)
+        st.write("Session state size by session")
+        st.dataframe(memory_diagnostics.get_session_sizes(), use_container_width=True, hide_index=True)
+        
+        # Trace files
+        st.subheader("Traces")
+        trace_files = tracer.writer.list_files()
+        if trace_files:
+            st.caption("Open trace files in Perfetto (ui.perfetto.dev) or chrome://tracing")
+            selected_trace = st.selectbox(
+                "Trace file",
+                trace_files,
+                format_func=lambda path: f"{path.name} ({path.stat().st_size / 1024:.0f} KB)"
+            )
+            st.download_button(
+                "Download Trace",
+                selected_trace.read_bytes(),
+                file_name=selected_trace.name,
+                mime="application/json"
+            )
+        else:
+            st.info("No traces written yet")
     
     # Appearance Tab
     with settings_tabs[1]:
@@ -199,6 +348,34 @@ def render_settings_page():
                 days = st.number_input("Days to keep", min_value=1, value=7)
                 clear_old_logs(days)
                 st.success(f"Cleared logs older than {days} days")
+    
+    # Family Tab
+    with settings_tabs[6]:
+        st.header("Family Members")
+        
+        members = get_family_members()
+        for member in members:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(member.name)
+            with col2:
+                if st.button("Remove", key=f"remove_member_{member.member_id}"):
+                    try:
+                        deactivate_family_member(member.member_id)
+                        invalidate_family_members()
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error removing family member: {str(e)}")
+        
+        with st.form("add_family_member"):
+            name = st.text_input("Name")
+            if st.form_submit_button("Add Member") and name.strip():
+                try:
+                    add_family_member(name)
+                    invalidate_family_members()
+                    st.success(f"Added {name.strip()}")
+                except Exception as e:
+                    st.error(f"Error adding family member: {str(e)}")
 
 if __name__ == "__main__":
     render_settings_page() 
\ No newline at end of file
@@ -5,8 +5,11 @@ from utils.helpers import configure_page
 from utils.styles import get_mobile_styles
 from psycopg2.extras import RealDictCursor
 from utils.header import display_header, display_page_title
+from utils.performance import performance_monitor
+from utils.features import display_todo_list
 
+@performance_monitor.track_render("todolist.main")
 def main():
     display_header()
     display_page_title("Todo List ✅")
-    # Rest of the code...
+    display_todo_list()
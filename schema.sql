@@ -1,3 +1,11 @@
+-- Family members; everything assigned to a person references member_id
+CREATE TABLE IF NOT EXISTS family_members (
+    member_id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Events table for calendar
 CREATE TABLE IF NOT EXISTS events (
     id SERIAL PRIMARY KEY,
@@ -13,31 +21,94 @@ CREATE TABLE IF NOT EXISTS events (
 CREATE TABLE IF NOT EXISTS chores (
     id SERIAL PRIMARY KEY,
     task VARCHAR(255) NOT NULL,
-    assigned_to VARCHAR(100),
+    member_id INTEGER REFERENCES family_members(member_id),
     due_date DATE,
     completed BOOLEAN DEFAULT FALSE,
     points INTEGER DEFAULT 10,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS idx_chores_person_status_due ON chores(member_id, completed, due_date) INCLUDE (id, task, points);
+CREATE INDEX IF NOT EXISTS idx_chores_status_due ON chores(completed, due_date);
+
+-- Recurring chores; instances are generated a fixed horizon ahead, see
+-- utils/chore_rotation.py
+CREATE TABLE IF NOT EXISTS chore_templates (
+    template_id SERIAL PRIMARY KEY,
+    task TEXT NOT NULL,
+    points INTEGER DEFAULT 10,
+    frequency VARCHAR(10) NOT NULL CHECK (frequency IN ('daily', 'weekly')),
+    weekday SMALLINT CHECK (weekday BETWEEN 1 AND 7),
+    rotate_every VARCHAR(10) NOT NULL DEFAULT 'week' CHECK (rotate_every IN ('week', 'occurrence')),
+    start_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    generated_through DATE,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT weekly_has_weekday CHECK (frequency <> 'weekly' OR weekday IS NOT NULL)
+);
+
+CREATE TABLE IF NOT EXISTS chore_template_members (
+    template_id INTEGER NOT NULL REFERENCES chore_templates(template_id) ON DELETE CASCADE,
+    position SMALLINT NOT NULL,
+    member_id INTEGER NOT NULL REFERENCES family_members(member_id),
+    PRIMARY KEY (template_id, position)
+);
+
+ALTER TABLE chores ADD COLUMN IF NOT EXISTS template_id INTEGER
+    REFERENCES chore_templates(template_id) ON DELETE SET NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_chores_template_due ON chores(template_id, due_date)
+    WHERE template_id IS NOT NULL;
+
 -- Rewards table
 CREATE TABLE IF NOT EXISTS rewards (
     reward_id SERIAL PRIMARY KEY,
     reward_name VARCHAR(255) NOT NULL,
     points_required INTEGER NOT NULL,
     description TEXT,
-    claimed_by VARCHAR(100),
+    claimed_by_id INTEGER REFERENCES family_members(member_id),
+    claimed_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS idx_rewards_available ON rewards(points_required, reward_id) WHERE claimed_by_id IS NULL;
+
 -- Points balance table
 CREATE TABLE IF NOT EXISTS points_balance (
-    id SERIAL PRIMARY KEY,
-    user_name VARCHAR(100) NOT NULL UNIQUE,
-    points INTEGER DEFAULT 0,
+    member_id INTEGER PRIMARY KEY REFERENCES family_members(member_id),
+    points INTEGER NOT NULL DEFAULT 0 CONSTRAINT points_balance_not_negative CHECK (points >= 0),
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Append-only points history; points_balance is maintained from it by a
+-- trigger, see utils/points.py
+CREATE TABLE IF NOT EXISTS points_ledger (
+    entry_id BIGSERIAL PRIMARY KEY,
+    member_id INTEGER NOT NULL REFERENCES family_members(member_id),
+    points INTEGER NOT NULL,
+    reason VARCHAR(20) NOT NULL CHECK (reason IN ('chore', 'reward', 'adjustment')),
+    chore_id INTEGER,
+    reward_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_points_ledger_chore ON points_ledger(chore_id) WHERE reason = 'chore';
+CREATE INDEX IF NOT EXISTS idx_points_ledger_user ON points_ledger(member_id, entry_id);
+
+-- Todo list
+CREATE TABLE IF NOT EXISTS todo_items (
+    id SERIAL PRIMARY KEY,
+    task TEXT NOT NULL,
+    priority VARCHAR(20) DEFAULT 'normal',
+    due_date DATE,
+    completed BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_priority CHECK (priority IN ('high', 'normal', 'low'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_todo_items_pending_due_rank_id ON todo_items(
+    (COALESCE(due_date, DATE '9999-12-31')), (CASE priority WHEN 'high' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END), id
+) WHERE completed = FALSE;
+
 -- Grocery items table with unit column
 CREATE TABLE IF NOT EXISTS grocery_items (
     id SERIAL PRIMARY KEY,
@@ -63,7 +134,8 @@ CREATE TABLE IF NOT EXISTS school_events (
 -- Notifications table
 CREATE TABLE IF NOT EXISTS notifications (
     notification_id SERIAL PRIMARY KEY,
-    user_id VARCHAR(100) NOT NULL,
+    -- NULL for notifications meant for the whole family
+    member_id INTEGER REFERENCES family_members(member_id) ON DELETE CASCADE,
     message TEXT NOT NULL,
     type VARCHAR(50) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -71,6 +143,8 @@ CREATE TABLE IF NOT EXISTS notifications (
     priority INTEGER DEFAULT 1
 );
 
+CREATE INDEX IF NOT EXISTS idx_notifications_member_read ON notifications(member_id, read_status);
+
 -- Recipes table
 CREATE TABLE IF NOT EXISTS recipes (
     recipe_id SERIAL PRIMARY KEY,
@@ -79,9 +153,14 @@ CREATE TABLE IF NOT EXISTS recipes (
     servings INTEGER,
     prep_time INTEGER,
     instructions TEXT,
+    -- Maintained by triggers, see utils/recipe_search.py
+    search_vector tsvector,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS idx_recipes_search ON recipes USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_recipes_name_key ON recipes ((lower(trim(name))));
+
 -- Recipe ingredients table
 CREATE TABLE IF NOT EXISTS recipe_ingredients (
     ingredient_id SERIAL PRIMARY KEY,
@@ -102,6 +181,9 @@ CREATE TABLE IF NOT EXISTS meal_plans (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- One meal per slot; save_meal_plan upserts on it
+CREATE UNIQUE INDEX IF NOT EXISTS uq_meal_plans_date_meal_type ON meal_plans(date, meal_type);
+
 -- Family messages table
 CREATE TABLE IF NOT EXISTS family_messages (
     message_id SERIAL PRIMARY KEY,
@@ -0,0 +1,28 @@
+from datetime import date
+import pytest
+from utils.chores import chore_filters, due_window
+
+TODAY = date(2030, 1, 10)
+TOMORROW = date(2030, 1, 11)
+
+
+@pytest.mark.parametrize("window, expected", [
+    ("today", ("due_date = %s", [TODAY])),
+    ("tomorrow", ("due_date = %s", [TOMORROW])),
+    ("upcoming", ("due_date > %s OR due_date IS NULL", [TOMORROW])),
+    ("overdue", ("due_date < %s", [TODAY])),
+])
+def test_due_windows(window, expected):
+    assert due_window(window, TODAY) == expected
+
+
+def test_unknown_window_is_an_error():
+    with pytest.raises(ValueError):
+        due_window("someday", TODAY)
+
+
+def test_filters_are_only_added_when_given():
+    assert chore_filters() == ([], [])
+    where, params = chore_filters(people=[2, 1], completed=False, window="upcoming", today=TODAY)
+    assert where == ["member_id = ANY(%s)", "completed = %s", "due_date > %s OR due_date IS NULL"]
+    assert params == [[2, 1], False, TOMORROW]
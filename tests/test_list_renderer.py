@@ -0,0 +1,71 @@
+import pytest
+from utils.fragment_cache import fragment_cache
+from utils.list_renderer import CardTemplate, render_list_html
+
+CARD = CardTemplate("""
+    <div class="list-card $variant">
+        <div class="list-card-title">$title</div>
+        <div>$body</div>
+    </div>
+""", safe_fields=('body',))
+
+
+def test_template_is_collapsed_onto_one_line():
+    html = CARD.render(variant="info", title="Dishes", body="")
+    assert "\n" not in html
+    assert html == '<div class="list-card info"><div class="list-card-title">Dishes</div><div></div></div>'
+
+
+def test_fields_are_html_escaped():
+    html = CARD.render(variant='x" onmouseover="alert(1)', title="<script>alert('hi')</script> & co", body="")
+    assert "<script>" not in html
+    assert "&lt;script&gt;alert(&#x27;hi&#x27;)&lt;/script&gt; &amp; co" in html
+    assert 'class="list-card x&quot; onmouseover=&quot;alert(1)"' in html
+
+
+def test_safe_fields_are_left_as_is():
+    html = CARD.render(variant="info", title="t", body="<b>bold</b>")
+    assert "<div><b>bold</b></div>" in html
+
+
+def test_line_breaks_stay_inside_the_html_block():
+    html = CARD.render(variant="info", title="line one\r\nline two\n\nthree", body="")
+    assert "\n" not in html
+    assert "line one<br>line two<br><br>three" in html
+
+
+def test_none_renders_as_empty():
+    html = CARD.render(variant="info", title=None, body="")
+    assert '<div class="list-card-title"></div>' in html
+
+
+def test_missing_field_is_an_error():
+    with pytest.raises(KeyError):
+        CARD.render(variant="info", title="t")
+
+
+def test_list_html_wraps_every_row():
+    rows = [{'variant': 'info', 'title': f"Task {i}", 'body': ""} for i in range(3)]
+    html = render_list_html(rows, CARD, list_class="chores")
+    assert html.startswith('<div class="chores">') and html.endswith("</div>")
+    assert all(f"Task {i}" in html for i in range(3))
+
+
+def test_cached_rows_are_not_rebuilt():
+    fragment_cache.clear()
+    built = []
+
+    def fields(row):
+        built.append(row['id'])
+        return {'variant': 'info', 'title': row['title'], 'body': ""}
+
+    def cache_key(row):
+        return ('chore', row['id'], row['version'])
+
+    rows = [{'id': 1, 'title': "One", 'version': 'a'}, {'id': 2, 'title': "Two", 'version': 'a'}]
+    first = render_list_html(rows, CARD, fields=fields, cache_key=cache_key, name="test_cached")
+    rows[1] = {'id': 2, 'title': "Two, edited", 'version': 'b'}
+    second = render_list_html(rows, CARD, fields=fields, cache_key=cache_key, name="test_cached")
+
+    assert built == [1, 2, 2]
+    assert "Two, edited" in second and "Two, edited" not in first
@@ -0,0 +1,87 @@
+import pytest
+from utils.pagination import NO_DATE, fetch_keyset_page
+
+ORDER_BY = (f"COALESCE(due_date, {NO_DATE})", "id")
+
+
+class FakeCursor:
+    """Records the statement and returns canned dict rows, like a RealDictCursor."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.query = None
+        self.params = None
+
+    def execute(self, query, params):
+        self.query = query
+        self.params = params
+
+    def fetchall(self):
+        return self.rows
+
+
+def chore_rows(count):
+    return [{'id': i, 'task': f"Task {i}", '_k0': f"2030-01-{i:02d}", '_k1': i} for i in range(1, count + 1)]
+
+
+def test_first_page_selects_sort_keys_and_one_extra_row():
+    cur = FakeCursor([])
+    fetch_keyset_page(cur, "chores", "id, task", ORDER_BY, limit=10)
+    assert cur.query == (
+        f"SELECT id, task, COALESCE(due_date, {NO_DATE}) AS _k0, id AS _k1 FROM chores"
+        f" ORDER BY COALESCE(due_date, {NO_DATE}), id LIMIT %s"
+    )
+    assert cur.params == [11]
+
+
+def test_later_page_compares_the_whole_key_after_the_filters():
+    cur = FakeCursor([])
+    fetch_keyset_page(cur, "chores", "id, task", ORDER_BY,
+                      where=["member_id = ANY(%s)", "completed = %s"], params=[[1, 2], False],
+                      after=("2030-01-05", 17), limit=10)
+    assert cur.query == (
+        f"SELECT id, task, COALESCE(due_date, {NO_DATE}) AS _k0, id AS _k1 FROM chores"
+        f" WHERE (member_id = ANY(%s)) AND (completed = %s)"
+        f" AND ((COALESCE(due_date, {NO_DATE}), id) > (%s, %s))"
+        f" ORDER BY COALESCE(due_date, {NO_DATE}), id LIMIT %s"
+    )
+    assert cur.params == [[1, 2], False, "2030-01-05", 17, 11]
+
+
+def test_descending_pages_flip_the_comparison_and_order():
+    cur = FakeCursor([])
+    fetch_keyset_page(cur, "school_events", "id", ("event_date", "id"), after=("2030-01-05", 3), descending=True)
+    assert "((event_date, id) < (%s, %s))" in cur.query
+    assert cur.query.endswith("ORDER BY event_date DESC, id DESC LIMIT %s")
+
+
+def test_where_conditions_are_parenthesized():
+    cur = FakeCursor([])
+    fetch_keyset_page(cur, "chores", "id", ("id",), where=["due_date > %s OR due_date IS NULL"], params=["2030-01-01"])
+    assert " WHERE (due_date > %s OR due_date IS NULL) ORDER BY" in cur.query
+
+
+def test_extra_row_means_another_page_and_sets_the_cursor():
+    rows, next_after, has_more = fetch_keyset_page(FakeCursor(chore_rows(4)), "chores", "id, task", ORDER_BY, limit=3)
+    assert [row['id'] for row in rows] == [1, 2, 3]
+    assert has_more
+    assert next_after == ("2030-01-03", 3)
+
+
+def test_last_page_has_no_cursor():
+    rows, next_after, has_more = fetch_keyset_page(FakeCursor(chore_rows(3)), "chores", "id, task", ORDER_BY, limit=3)
+    assert len(rows) == 3
+    assert not has_more
+    assert next_after is None
+
+
+def test_input_params_are_not_modified():
+    params = [False]
+    fetch_keyset_page(FakeCursor([]), "chores", "id", ("id",), where=["completed = %s"], params=params, after=(5,))
+    assert params == [False]
+
+
+def test_tuple_rows_are_rejected():
+    # The next cursor is read back by alias, so a plain cursor cannot page
+    with pytest.raises(TypeError):
+        fetch_keyset_page(FakeCursor([(1, 1), (2, 2)]), "chores", "id", ("id",), limit=1)
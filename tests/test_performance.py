@@ -0,0 +1,72 @@
+import time
+import pytest
+from utils.performance import (
+    HISTOGRAM_MAX_BUCKETS, HISTOGRAM_MIN_VALUE, LogHistogram, WindowedHistogram
+)
+
+
+def histogram_of(values):
+    histogram = LogHistogram()
+    for value in values:
+        histogram.add(value)
+    return histogram
+
+
+def test_empty_histogram_percentile_is_zero():
+    assert LogHistogram().percentile(95) == 0.0
+
+
+@pytest.mark.parametrize("pct", [50, 90, 95, 99])
+def test_percentiles_within_bucket_error(pct):
+    # 1 ms to 1 s in 1 ms steps; the exact rank is known
+    values = [i / 1000 for i in range(1, 1001)]
+    expected = values[int(len(values) * pct / 100) - 1]
+    assert histogram_of(values).percentile(pct) == pytest.approx(expected, rel=0.1)
+
+
+def test_percentile_of_a_single_value():
+    histogram = histogram_of([0.25])
+    for pct in (0, 50, 100):
+        assert histogram.percentile(pct) == pytest.approx(0.25, rel=0.1)
+
+
+def test_tiny_and_huge_values_are_clamped_to_the_end_buckets():
+    assert LogHistogram.bucket_index(0) == 0
+    assert LogHistogram.bucket_index(HISTOGRAM_MIN_VALUE / 10) == 0
+    assert LogHistogram.bucket_index(1e12) == HISTOGRAM_MAX_BUCKETS - 1
+
+
+def test_bucket_bounds_contain_their_values():
+    for value in (0.0002, 0.003, 0.05, 1.7, 42.0):
+        index = LogHistogram.bucket_index(value)
+        assert LogHistogram.bucket_upper_bound(index - 1) < value <= LogHistogram.bucket_upper_bound(index)
+
+
+def test_merge_adds_counts_and_totals():
+    merged = histogram_of([0.01, 0.02])
+    merged.merge(histogram_of([0.02, 0.5]))
+    assert merged.count == 4
+    assert merged.total == pytest.approx(0.55)
+    assert sum(merged.buckets.values()) == 4
+    assert merged.percentile(100) == pytest.approx(0.5, rel=0.1)
+
+
+def test_window_only_merges_recent_slices():
+    now = time.time()
+    histogram = WindowedHistogram(slice_seconds=60, slices=60)
+    histogram.add(5.0, timestamp=now - 600)
+    histogram.add(0.01, timestamp=now)
+    histogram.add(0.02, timestamp=now)
+
+    recent = histogram.window(60)
+    assert recent.count == 2
+    assert recent.percentile(100) == pytest.approx(0.02, rel=0.1)
+    assert histogram.window(900).count == 3
+
+
+def test_window_keeps_a_bounded_number_of_slices():
+    now = time.time()
+    histogram = WindowedHistogram(slice_seconds=1, slices=3)
+    for age in range(10, 0, -1):
+        histogram.add(1.0, timestamp=now - age)
+    assert histogram.window(3600).count == 3
@@ -0,0 +1,84 @@
+import pytest
+from utils.performance import performance_monitor
+from utils.query_stats import N_PLUS_ONE_THRESHOLD, QueryStatsRegistry, fingerprint
+
+SELECT_CHORE = "SELECT task FROM chores WHERE id = %s"
+
+
+@pytest.fixture
+def registry():
+    return QueryStatsRegistry()
+
+
+def test_fingerprint_replaces_literals_and_placeholders():
+    assert fingerprint("SELECT * FROM chores WHERE id = 42 AND task = 'Dishes'") == \
+        "select * from chores where id = ? and task = ?"
+    assert fingerprint("SELECT * FROM chores WHERE id = %(id)s AND points > %s") == \
+        "select * from chores where id = ? and points > ?"
+
+
+def test_fingerprint_groups_statements_that_differ_only_in_literals():
+    assert fingerprint("SELECT name FROM recipes WHERE recipe_id = 1") == \
+        fingerprint("select name\n  FROM recipes\n WHERE recipe_id = 27;")
+
+
+def test_fingerprint_strips_comments_and_collapses_in_lists():
+    assert fingerprint("""
+        -- load a few chores
+        SELECT * FROM chores /* by id */ WHERE id IN (1, 2, 3)
+    """) == "select * from chores where id in (?+)"
+    assert fingerprint("SELECT * FROM chores WHERE id IN (%s, %s)") == \
+        fingerprint("SELECT * FROM chores WHERE id IN (7, 8, 9, 10)")
+
+
+def test_fingerprint_handles_escaped_quotes():
+    assert fingerprint("SELECT 1 FROM t WHERE name = 'it''s'") == "select ? from t where name = ?"
+
+
+def test_repeated_statement_in_one_rerun_is_an_n_plus_one(registry):
+    with performance_monitor.span("rerun", page="test"):
+        for _ in range(N_PLUS_ONE_THRESHOLD - 1):
+            registry.record(SELECT_CHORE, 0.001)
+        assert registry.get_detections() == []
+        registry.record(SELECT_CHORE, 0.001)
+        registry.record(SELECT_CHORE, 0.001)
+
+    detections = registry.get_detections()
+    assert len(detections) == 1
+    assert detections[0]['query'] == fingerprint(SELECT_CHORE)
+    assert detections[0]['calls_in_rerun'] == N_PLUS_ONE_THRESHOLD + 1
+    assert detections[0]['page'] == "test"
+
+
+def test_counts_start_over_with_each_rerun(registry):
+    for _ in range(N_PLUS_ONE_THRESHOLD):
+        with performance_monitor.span("rerun", page="test"):
+            registry.record(SELECT_CHORE, 0.001)
+    assert registry.get_detections() == []
+    assert registry.top_queries()[0]['max_per_rerun'] == 1
+
+
+def test_batched_calls_count_towards_the_threshold(registry):
+    with performance_monitor.span("rerun", page="test"):
+        registry.record(SELECT_CHORE, 0.002, calls=N_PLUS_ONE_THRESHOLD)
+    assert len(registry.get_detections()) == 1
+
+
+def test_statements_outside_a_rerun_are_not_checked(registry):
+    for _ in range(N_PLUS_ONE_THRESHOLD * 2):
+        registry.record(SELECT_CHORE, 0.001)
+    assert registry.get_detections() == []
+
+
+def test_top_queries_aggregates_by_fingerprint(registry):
+    registry.record("SELECT * FROM chores WHERE id = 1", 0.010, rows=1)
+    registry.record("SELECT * FROM chores WHERE id = 2", 0.030, rows=1)
+    registry.record("SELECT * FROM recipes", 0.001, rows=5)
+
+    top = registry.top_queries()
+    assert [row['query'] for row in top] == ["select * from chores where id = ?", "select * from recipes"]
+    assert top[0]['calls'] == 2
+    assert top[0]['rows'] == 2
+    assert top[0]['total_ms'] == pytest.approx(40.0)
+    assert top[0]['max_ms'] == pytest.approx(30.0)
+    assert top[0]['top_caller'].startswith("tests")
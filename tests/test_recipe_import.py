@@ -0,0 +1,111 @@
+import io
+import json
+from decimal import Decimal
+import pytest
+from utils import recipe_import
+from utils.recipe_import import RowError, iter_csv_recipes, iter_json_recipes, validate_recipe
+
+
+def recipe(name, **fields):
+    return dict({'name': name, 'ingredients': [{'name': "Flour", 'quantity': 200, 'unit': "g"}]}, **fields)
+
+
+def read_all(text, chunk_size=32):
+    return list(iter_json_recipes(io.StringIO(text), chunk_size=chunk_size))
+
+
+def test_valid_recipe_gets_defaults():
+    clean, errors = validate_recipe({
+        'name': "  Pancakes ",
+        'ingredients': [{'name': " Milk ", 'quantity': "0.5", 'unit': " l "}]
+    })
+    assert errors == []
+    assert clean == {
+        'name': "Pancakes", 'description': None, 'servings': 4, 'prep_time': 30,
+        'instructions': None, 'ingredients': [("Milk", Decimal("0.5"), "l")]
+    }
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({'name': ""}, "name is required"),
+    ({'name': "x" * 201}, "name is longer than 200 characters"),
+    ({'servings': "two"}, "servings must be a whole number"),
+    ({'prep_time': -5}, "prep_time must be positive"),
+    ({'ingredients': []}, "at least one ingredient is required"),
+    ({'ingredients': ["flour"]}, "ingredient 1: must be an object"),
+    ({'ingredients': [{'name': "Salt", 'quantity': 0, 'unit': "g"}]}, "ingredient 1: quantity must be a positive number"),
+    ({'ingredients': [{'name': "Salt", 'quantity': "NaN", 'unit': "g"}]}, "ingredient 1: quantity must be a positive number"),
+    ({'ingredients': [{'name': "Salt", 'quantity': 1}]}, "ingredient 1: unit is required"),
+])
+def test_invalid_recipes_are_reported(fields, message):
+    _, errors = validate_recipe(dict(recipe("Bread"), **fields))
+    assert message in errors
+
+
+def test_non_object_recipe_is_reported():
+    assert validate_recipe(["Bread"]) == (None, ["recipe must be an object"])
+
+
+def test_csv_rows_with_the_same_name_form_one_recipe():
+    stream = io.StringIO(
+        "name,servings,ingredient_name,quantity,unit\n"
+        "Bread,2,Flour,500,g\n"
+        "bread,,Water,300,ml\n"
+        "Soup,4,Leeks,2,piece\n"
+    )
+    recipes = list(iter_csv_recipes(stream))
+    assert [(row, r['name'], r['servings'], len(r['ingredients'])) for row, r in recipes] == [
+        (2, "Bread", "2", 2), (4, "Soup", "4", 1)
+    ]
+
+
+def test_csv_without_required_columns_is_rejected():
+    with pytest.raises(ValueError, match="ingredient_name"):
+        list(iter_csv_recipes(io.StringIO("name,quantity\nBread,1\n")))
+
+
+def test_json_array_is_read_across_chunk_boundaries():
+    recipes = [recipe(f"Recipe {i}", instructions="Mix. " * 20) for i in range(5)]
+    assert read_all(json.dumps(recipes, indent=2), chunk_size=16) == list(enumerate(recipes, 1))
+
+
+def test_empty_json_array():
+    assert read_all("  [ ]  ") == []
+
+
+def test_json_lines_report_bad_lines_and_keep_going():
+    text = "\n".join([json.dumps(recipe("One")), "{not json}", "", json.dumps(recipe("Two"))])
+    records = read_all(text)
+    assert [index for index, _ in records] == [1, 2, 4]
+    assert records[0][1]['name'] == "One"
+    assert records[1][1] == RowError(2, None, "invalid JSON: Expecting property name enclosed in double quotes at column 2")
+    assert records[2][1]['name'] == "Two"
+
+
+def test_truncated_json_array_raises_after_the_complete_recipes():
+    text = json.dumps([recipe("One"), recipe("Two")])[:-40]
+    records = iter_json_recipes(io.StringIO(text), chunk_size=16)
+    assert next(records)[1]['name'] == "One"
+    with pytest.raises(ValueError):
+        next(records)
+
+
+def test_broken_json_array_element_does_not_read_the_rest_of_the_file(monkeypatch):
+    monkeypatch.setattr(recipe_import, 'MAX_JSON_RECIPE_SIZE', 256)
+    text = "[" + json.dumps(recipe("One")) + ", {broken}, " + ", ".join(
+        json.dumps(recipe(f"Recipe {i}")) for i in range(500)
+    ) + "]"
+    stream = io.StringIO(text)
+    records = iter_json_recipes(stream, chunk_size=64)
+    assert next(records)[1]['name'] == "One"
+    with pytest.raises(ValueError, match="recipe 2 is not valid JSON"):
+        next(records)
+    # The buffer stopped growing at about MAX_JSON_RECIPE_SIZE
+    assert stream.tell() < 256 + 3 * 64
+    assert stream.tell() < len(text) / 10
+
+
+def test_import_without_a_database_reports_it(monkeypatch):
+    monkeypatch.setattr(recipe_import, 'get_db_connection', lambda: None)
+    result = recipe_import.import_recipes(iter([]))
+    assert result.errors == [RowError(None, None, "Database connection failed")]
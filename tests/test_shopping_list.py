@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from utils.shopping_list import build_shopping_list, missing_items, round_up
+
+
+def frame(*rows):
+    return pd.DataFrame(list(rows), columns=['item', 'quantity', 'unit'])
+
+
+def row_for(shopping_list, item):
+    rows = shopping_list[shopping_list['item'].str.lower() == item.lower()]
+    assert len(rows) == 1
+    return rows.iloc[0]
+
+
+def test_no_planned_meals_gives_an_empty_list():
+    shopping_list = build_shopping_list(frame(), frame())
+    assert shopping_list.empty
+    assert missing_items(shopping_list) == []
+
+
+def test_ingredients_aggregate_across_case_whitespace_and_units():
+    shopping_list = build_shopping_list(
+        frame(("Flour", 500, "g"), (" flour ", 0.75, "KG"), ("Milk", 1, "cup"), ("milk", 2, "tbsp")),
+        frame()
+    )
+    assert len(shopping_list) == 2
+    flour = row_for(shopping_list, "Flour")
+    assert (flour['required'], flour['unit'], flour['meals']) == (1.25, "kg", 2)
+    milk = row_for(shopping_list, "Milk")
+    assert milk['unit'] == "ml"
+    assert milk['required'] == pytest.approx(236.588 + 2 * 14.7868, abs=0.01)
+
+
+def test_incompatible_units_stay_separate():
+    shopping_list = build_shopping_list(frame(("Eggs", 2, "piece"), ("Eggs", 100, "g")), frame())
+    assert sorted(shopping_list['unit']) == ["g", "piece"]
+
+
+def test_items_on_the_list_are_subtracted_in_the_list_unit():
+    shopping_list = build_shopping_list(
+        frame(("Sugar", 1500, "g")),
+        frame(("sugar", 1, "kg"))
+    )
+    sugar = row_for(shopping_list, "Sugar")
+    assert (sugar['required'], sugar['on_list'], sugar['to_buy'], sugar['unit']) == (1.5, 1.0, 0.5, "kg")
+    assert missing_items(shopping_list) == [("Sugar", 0.5, "kg")]
+
+
+def test_items_fully_on_the_list_are_not_missing():
+    shopping_list = build_shopping_list(frame(("Rice", 200, "g")), frame(("Rice", 0.5, "kg")))
+    assert row_for(shopping_list, "Rice")['to_buy'] == 0
+    assert missing_items(shopping_list) == []
+
+
+def test_conversion_noise_is_not_something_to_buy():
+    # 3 tsp and 1 tbsp differ by a few hundred-thousandths of a ml
+    shopping_list = build_shopping_list(frame(("Vanilla", 3, "tsp")), frame(("Vanilla", 1, "tbsp")))
+    assert missing_items(shopping_list) == []
+
+
+def test_small_shortfall_in_a_large_display_unit_is_kept():
+    # 4 g short of 2 kg is 0.004 kg, which rounds to 0 at two decimals
+    shopping_list = build_shopping_list(frame(("Butter", 2004, "g")), frame(("Butter", 2, "kg")))
+    butter = row_for(shopping_list, "Butter")
+    assert butter['to_buy'] == 0.01
+    assert missing_items(shopping_list) == [("Butter", 0.01, "kg")]
+
+
+def test_small_shortfall_without_a_list_row_is_kept():
+    shopping_list = build_shopping_list(frame(("Salt", 1000, "g"), ("Salt", 2, "g")), frame())
+    assert missing_items(shopping_list) == [("Salt", 1.01, "kg")]
+
+
+def test_round_up():
+    assert list(round_up([0.001, 0.1 + 0.2, 1.0, 0.0, 2.345])) == [0.01, 0.3, 1.0, 0.0, 2.35]
@@ -3,6 +3,7 @@ import zipfile
 import tempfile
 from datetime import datetime
 from utils.database import get_db_connection
+from utils.tracing import tracer
 import shutil
 
 def get_all_tables():
@@ -23,6 +24,7 @@ def get_all_tables():
             conn.close()
     return tables
 
+@tracer.trace_function("create_backup", "outbound")
 def create_backup():
     """Create a backup of the database and settings."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -61,6 +63,7 @@ def create_backup():
                 os.remove(backup_path)
             raise Exception(f"Backup failed: {str(e)}")
 
+@tracer.trace_function("restore_backup", "outbound")
 def restore_backup(backup_file):
     """Restore from a backup file."""
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -0,0 +1,67 @@
+import threading
+import time
+from utils.performance import performance_monitor
+from utils.tracing import tracer
+
+DEFAULT_TTL = 300
+
+
+class SharedCache:
+    """Process-wide TTL cache shared by every session.
+
+    Lookups are counted per cache name in the performance monitor, and
+    loads are traced so slow reference-data queries show up in traces.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, key):
+        """Return a fresh cached value, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    def get_or_load(self, key, loader, ttl=DEFAULT_TTL):
+        """Return the cached value for key, calling loader once on a miss."""
+        value = self.get(key)
+        if value is not None:
+            performance_monitor.record_cache(key, True)
+            return value
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        # Concurrent misses wait for a single load instead of stampeding the database
+        with load_lock:
+            value = self.get(key)
+            if value is not None:
+                performance_monitor.record_cache(key, True)
+                return value
+            performance_monitor.record_cache(key, False)
+            with tracer.span(f"cache load {key}", "cache"):
+                value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+
+shared_cache = SharedCache()
@@ -0,0 +1,268 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from psycopg2.extras import RealDictCursor
+from utils.database import get_db_connection
+from utils.logger import log_info, log_error
+from utils.performance import performance_monitor
+from utils.points import DEFAULT_CHORE_POINTS
+from utils.tracing import tracer
+
+# Only this many days of recurring chores exist ahead of today
+ROTATION_HORIZON_DAYS = int(os.environ.get('CHORE_HORIZON_DAYS', '14'))
+ROTATION_INTERVAL_SECONDS = int(os.environ.get('CHORE_ROTATION_INTERVAL', '3600'))
+
+FREQUENCIES = ('daily', 'weekly')
+# 'week' keeps one person on a chore for a calendar week, 'occurrence'
+# hands it to the next person every time it comes round
+ROTATE_EVERY = ('week', 'occurrence')
+# ISO day numbers, Monday = 1
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+CHORE_ROTATION_SCHEMA_SQL = f"""
+    CREATE TABLE IF NOT EXISTS chore_templates (
+        template_id SERIAL PRIMARY KEY,
+        task TEXT NOT NULL,
+        points INTEGER DEFAULT {DEFAULT_CHORE_POINTS},
+        frequency VARCHAR(10) NOT NULL CHECK (frequency IN ('daily', 'weekly')),
+        weekday SMALLINT CHECK (weekday BETWEEN 1 AND 7),
+        rotate_every VARCHAR(10) NOT NULL DEFAULT 'week' CHECK (rotate_every IN ('week', 'occurrence')),
+        start_date DATE NOT NULL DEFAULT CURRENT_DATE,
+        generated_through DATE,
+        active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT weekly_has_weekday CHECK (frequency <> 'weekly' OR weekday IS NOT NULL)
+    );
+
+    -- Rotation order; members who are no longer active are skipped
+    CREATE TABLE IF NOT EXISTS chore_template_members (
+        template_id INTEGER NOT NULL REFERENCES chore_templates(template_id) ON DELETE CASCADE,
+        position SMALLINT NOT NULL,
+        member_id INTEGER NOT NULL REFERENCES family_members(member_id),
+        PRIMARY KEY (template_id, position)
+    );
+
+    ALTER TABLE chores ADD COLUMN IF NOT EXISTS template_id INTEGER
+        REFERENCES chore_templates(template_id) ON DELETE SET NULL;
+    -- One instance per template and day, however often the generator runs
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_chores_template_due ON chores(template_id, due_date)
+        WHERE template_id IS NOT NULL;
+"""
+
+# Materializes every active template's instances from where it last stopped
+# up to the horizon in one INSERT, and moves generated_through along, so a
+# run only looks at days not generated before. Chores deleted by hand are
+# not brought back; the unique index makes overlapping runs harmless.
+GENERATE_CHORES_SQL = """
+    WITH templates AS (
+        SELECT template_id, task, points, frequency, weekday, rotate_every, start_date,
+               GREATEST(start_date, %(today)s, generated_through + 1) AS first_day
+        FROM chore_templates
+        WHERE active AND (%(template_ids)s::int[] IS NULL OR template_id = ANY(%(template_ids)s))
+    ), rotation AS (
+        SELECT r.template_id, r.member_id,
+               row_number() OVER (PARTITION BY r.template_id ORDER BY r.position) - 1 AS slot,
+               COUNT(*) OVER (PARTITION BY r.template_id) AS size
+        FROM chore_template_members r
+        JOIN family_members m ON m.member_id = r.member_id
+        WHERE m.active
+    ), due AS (
+        SELECT t.template_id, t.task, t.points, day::date AS due_date,
+               CASE
+                   WHEN t.rotate_every = 'week'
+                       THEN (date_trunc('week', day)::date - date_trunc('week', t.start_date)::date) / 7
+                   WHEN t.frequency = 'weekly' THEN (day::date - t.start_date) / 7
+                   ELSE day::date - t.start_date
+               END AS turn
+        FROM templates t
+        CROSS JOIN LATERAL generate_series(t.first_day, %(until)s::date, interval '1 day') AS day
+        WHERE t.frequency = 'daily' OR extract(isodow FROM day) = t.weekday
+    ), inserted AS (
+        INSERT INTO chores (task, member_id, due_date, points, template_id)
+        SELECT d.task, r.member_id, d.due_date, d.points, d.template_id
+        FROM due d
+        LEFT JOIN rotation r ON r.template_id = d.template_id AND r.slot = d.turn %% r.size
+        ORDER BY d.due_date, d.template_id
+        ON CONFLICT (template_id, due_date) WHERE template_id IS NOT NULL DO NOTHING
+        RETURNING 1
+    ), advanced AS (
+        UPDATE chore_templates c SET generated_through = %(until)s
+        FROM templates t
+        WHERE c.template_id = t.template_id
+          AND (c.generated_through IS NULL OR c.generated_through < %(until)s)
+    )
+    SELECT COUNT(*) FROM inserted
+"""
+
+
+def generate_chores(horizon_days=ROTATION_HORIZON_DAYS, template_ids=None, today=None):
+    """Create the chores recurring templates call for over the next horizon_days.
+
+    Returns the number of chores created; instances that already exist are
+    left alone, so running it again is safe.
+    """
+    today = today or datetime.now().date()
+    until = today + timedelta(days=horizon_days)
+    conn = get_db_connection()
+    if not conn:
+        return 0
+    try:
+        with tracer.span("generate chores", "scheduler"):
+            with conn.cursor() as cur:
+                cur.execute(GENERATE_CHORES_SQL, {
+                    'today': today,
+                    'until': until,
+                    'template_ids': list(template_ids) if template_ids is not None else None,
+                })
+                created = cur.fetchone()[0]
+            conn.commit()
+        performance_monitor.increment('chores_generated', created)
+        return created
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def add_chore_template(task, member_ids, frequency='weekly', weekday=None, rotate_every='week',
+                       start_date=None, points=DEFAULT_CHORE_POINTS):
+    """Save a recurring chore rotating through member_ids in order; returns its template_id."""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    if rotate_every not in ROTATE_EVERY:
+        raise ValueError(f"Unknown rotation: {rotate_every}")
+    start_date = start_date or datetime.now().date()
+    if frequency == 'weekly' and weekday is None:
+        weekday = start_date.isoweekday()
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO chore_templates (task, points, frequency, weekday, rotate_every, start_date)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING template_id
+            """, (task, points, frequency, weekday if frequency == 'weekly' else None, rotate_every, start_date))
+            template_id = cur.fetchone()[0]
+            cur.execute("""
+                INSERT INTO chore_template_members (template_id, position, member_id)
+                SELECT %s, position - 1, member_id
+                FROM unnest(%s::int[]) WITH ORDINALITY AS r(member_id, position)
+            """, (template_id, list(member_ids)))
+        conn.commit()
+        return template_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_chore_templates():
+    """Return active templates with their rotation as a list of member ids."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT t.template_id, t.task, t.points, t.frequency, t.weekday, t.rotate_every,
+                       t.start_date, t.generated_through,
+                       COALESCE(array_agg(r.member_id ORDER BY r.position)
+                                FILTER (WHERE r.member_id IS NOT NULL), '{}') AS rotation
+                FROM chore_templates t
+                LEFT JOIN chore_template_members r ON r.template_id = t.template_id
+                WHERE t.active
+                GROUP BY t.template_id
+                ORDER BY t.template_id
+            """)
+            return [dict(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def stop_chore_template(template_id, today=None):
+    """Stop a recurring chore and remove its pending instances from today on.
+
+    Completed instances stay for the points history. Returns the number of
+    chores removed.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return 0
+    try:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE chore_templates SET active = FALSE WHERE template_id = %s", (template_id,))
+            cur.execute("""
+                DELETE FROM chores
+                WHERE template_id = %s AND due_date >= %s AND completed IS NOT TRUE
+            """, (template_id, today or datetime.now().date()))
+            removed = cur.rowcount
+        conn.commit()
+        return removed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+class ChoreScheduler:
+    """Generates recurring chores on a background thread, independent of page views."""
+
+    def __init__(self):
+        self._stop = None
+        self._lock = threading.Lock()
+        self.last_run = None
+        self.last_created = 0
+
+    def run_once(self):
+        started = time.perf_counter()
+        created = generate_chores()
+        self.last_run = datetime.now()
+        self.last_created = created
+        if created:
+            log_info(f"Generated {created} recurring chores in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return created
+
+    def start(self, interval_seconds=ROTATION_INTERVAL_SECONDS):
+        """Generate now and then every interval; a no-op if already running."""
+        with self._lock:
+            if self._stop is not None:
+                return
+            stop = self._stop = threading.Event()
+
+        def run():
+            while True:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    log_error(f"Recurring chore generation failed: {str(e)}", show_notification=False)
+                if stop.wait(interval_seconds):
+                    return
+
+        threading.Thread(target=run, name="chore-scheduler", daemon=True).start()
+        log_info(f"Scheduled recurring chore generation every {interval_seconds}s")
+
+    def stop(self):
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    @property
+    def running(self):
+        return self._stop is not None
+
+
+chore_scheduler = ChoreScheduler()
+
+
+def start_chore_scheduler():
+    """Start the process's chore scheduler unless CHORE_SCHEDULER_ENABLED is false."""
+    if os.environ.get('CHORE_SCHEDULER_ENABLED', 'true').lower() == 'false':
+        return
+    chore_scheduler.start()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from utils.database import get_db_connection
+from utils.pagination import NO_DATE
+from utils.points import DEFAULT_CHORE_POINTS
+
+CHORE_COLUMNS = "id, task, member_id, due_date, completed, points"
+# Matches idx_chores_due_id, so pages are read in index order
+CHORE_ORDER = (f"COALESCE(due_date, {NO_DATE})", "id")
+
+# Covers CHORE_COLUMNS, so lists filtered by person, status and due date are
+# index-only scans. Needs member_id and points, so it runs after
+# FAMILY_SCHEMA_SQL and POINTS_SCHEMA_SQL.
+CHORE_PERSON_INDEX_SQL = """
+    DROP INDEX IF EXISTS idx_chores_person_status_due;
+    CREATE INDEX idx_chores_person_status_due ON chores(member_id, completed, due_date)
+        INCLUDE (id, task, points);
+"""
+
+# Completion and payout in one statement: only chores that were still
+# pending are credited, and the partial unique index stops double payouts
+COMPLETE_CHORES_SQL = f"""
+    WITH done AS (
+        UPDATE chores SET completed = TRUE
+        WHERE id = ANY(%s) AND completed IS NOT TRUE
+        RETURNING id, member_id, COALESCE(points, {DEFAULT_CHORE_POINTS}) AS points
+    ), paid AS (
+        INSERT INTO points_ledger (member_id, points, reason, chore_id)
+        SELECT member_id, points, 'chore', id FROM done
+        WHERE member_id IS NOT NULL AND points > 0
+        ON CONFLICT (chore_id) WHERE reason = 'chore' DO NOTHING
+        RETURNING points
+    )
+    SELECT (SELECT COUNT(*) FROM done), COALESCE((SELECT SUM(points) FROM paid), 0)
+"""
+
+# Undated chores are listed under "upcoming"; overdue ones have a tab of their own
+DUE_WINDOWS = ("today", "tomorrow", "upcoming", "overdue")
+
+
+def due_window(window, today):
+    """Return the due-date condition and params for a named window."""
+    tomorrow = today + timedelta(days=1)
+    if window == "today":
+        return "due_date = %s", [today]
+    if window == "tomorrow":
+        return "due_date = %s", [tomorrow]
+    if window == "upcoming":
+        return "due_date > %s OR due_date IS NULL", [tomorrow]
+    if window == "overdue":
+        return "due_date < %s", [today]
+    raise ValueError(f"Unknown due window: {window}")
+
+
+def chore_filters(people=None, completed=None, window=None, today=None):
+    """Build the WHERE conditions and params for a chore query.
+
+    people limits to those member ids, completed=False/True to pending or
+    done chores (None for both), window to one of DUE_WINDOWS. The person,
+    status and due-date conditions line up with idx_chores_person_status_due.
+    """
+    where, params = [], []
+    if people:
+        where.append("member_id = ANY(%s)")
+        params.append(list(people))
+    if completed is not None:
+        where.append("completed = %s")
+        params.append(completed)
+    if window:
+        condition, window_params = due_window(window, today or datetime.now().date())
+        where.append(condition)
+        params.extend(window_params)
+    return where, params
+
+
+def fetch_chores(cur, people=None, completed=None, window=None, today=None, limit=None):
+    """Return the matching chores in due-date order on an open cursor."""
+    where, params = chore_filters(people, completed, window, today)
+    query = f"SELECT {CHORE_COLUMNS} FROM chores"
+    if where:
+        query += " WHERE " + " AND ".join(f"({condition})" for condition in where)
+    query += " ORDER BY " + ", ".join(CHORE_ORDER)
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    cur.execute(query, params)
+    return cur.fetchall()
+
+
+def fetch_chore_page(cur, paginator, people=None, completed=None, window=None, today=None):
+    """Fetch the paginator's current page of matching chores."""
+    where, params = chore_filters(people, completed, window, today)
+    return paginator.fetch(cur, "chores", CHORE_COLUMNS, order_by=CHORE_ORDER, where=where, params=params)
+
+
+def complete_chores(chore_ids):
+    """Mark chores as completed and credit their points in the same transaction.
+
+    Returns (chores completed, points awarded); chores that were already
+    done are skipped.
+    """
+    if not chore_ids:
+        return 0, 0
+    conn = get_db_connection()
+    if not conn:
+        return 0, 0
+    try:
+        with conn.cursor() as cur:
+            cur.execute(COMPLETE_CHORES_SQL, (list(chore_ids),))
+            completed, points = cur.fetchone()
+        conn.commit()
+        return completed, points
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -1,52 +1,203 @@
 import os
+import threading
+import time
+import weakref
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 import streamlit as st
+from utils.logger import log_error
+from utils.performance import performance_monitor
+from utils.query_stats import query_stats, fingerprint
+from utils.tracing import tracer
 
-def init_connection_pool():
-    """Initialize database connection pool."""
-    if 'db_pool' not in st.session_state:
-        try:
-            st.session_state.db_pool = SimpleConnectionPool(
-                minconn=1,
-                maxconn=20,
-                host=os.environ['PGHOST'],
-                database=os.environ['PGDATABASE'],
-                user=os.environ['PGUSER'],
-                password=os.environ['PGPASSWORD'],
-                port=os.environ['PGPORT']
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '20'))
+
+_tracing_cursor_classes = {}
+_pools = weakref.WeakSet()
+# One pool per process, shared by every session
+_pool = None
+_pool_lock = threading.Lock()
+
+def _query_text(cursor, query):
+    """Return the SQL text of a str, bytes or psycopg2.sql query."""
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode('utf-8', 'replace')
+    try:
+        return query.as_string(cursor)
+    except Exception:
+        return str(query)
+
+class TracingCursorMixin:
+    """Cursor mixin that records every statement in the query statistics."""
+
+    def _trace(self, query, start, calls=1):
+        elapsed = time.perf_counter() - start
+        sql = _query_text(self, query)
+        performance_monitor.record_db_time(elapsed)
+        query_stats.record(sql, elapsed, rows=self.rowcount, calls=calls)
+        if tracer.current_trace() is not None:
+            tracer.record_span(
+                "sql", "sql", time.time_ns() // 1000 - int(elapsed * 1_000_000), elapsed,
+                query=fingerprint(sql), rows=self.rowcount, calls=calls
             )
-        except Exception as e:
-            st.error(f"Failed to initialize connection pool: {str(e)}")
-            return False
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._trace(query, start)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._trace(query, start, calls=len(vars_list))
+
+def tracing_cursor(base=psycopg2.extensions.cursor):
+    """Return a tracing subclass of a cursor class such as RealDictCursor."""
+    if issubclass(base, TracingCursorMixin):
+        return base
+    cursor_class = _tracing_cursor_classes.get(base)
+    if cursor_class is None:
+        cursor_class = type(f"Tracing{base.__name__}", (TracingCursorMixin, base), {})
+        _tracing_cursor_classes[base] = cursor_class
+    return cursor_class
+
+class TracingConnection(psycopg2.extensions.connection):
+    """Connection whose cursors are always traced.
+
+    Connections handed out by the pool go back to it on close(), so the
+    usual get_db_connection() ... conn.close() pattern never leaks pool slots.
+    """
+
+    _pool = None
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs['cursor_factory'] = tracing_cursor(base)
+        return super().cursor(*args, **kwargs)
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None and not pool.closed:
+            # putconn() calls close() again for connections it discards
+            pool.putconn(self)
+        else:
+            super().close()
+
+class SharedConnectionPool(ThreadedConnectionPool):
+    """Thread-safe pool that can be retired without closing connections still in use."""
+
+    retired = False
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close or self.retired)
+
+    def retire(self):
+        """Close idle connections now and the rest as their sessions return them."""
+        with self._lock:
+            self.retired = True
+            idle, self._pool = self._pool, []
+        for conn in idle:
+            conn.close()
+
+def get_pool_stats():
+    """Return in-use and idle connection counts across all live pools."""
+    stats = {'pools': 0, 'in_use': 0, 'idle': 0, 'max': 0}
+    for pool in list(_pools):
+        if pool.closed:
+            continue
+        stats['pools'] += 1
+        stats['in_use'] += len(pool._used)
+        stats['idle'] += len(pool._pool)
+        stats['max'] += pool.maxconn
+    return stats
+
+performance_monitor.register_gauge(
+    'db_pool_connections',
+    lambda: [({'state': state}, value) for state, value in get_pool_stats().items() if state != 'pools'],
+    "Database pool connections by state"
+)
+
+def _create_pool():
+    pool = SharedConnectionPool(
+        minconn=DB_POOL_MIN,
+        maxconn=DB_POOL_MAX,
+        host=os.environ['PGHOST'],
+        database=os.environ['PGDATABASE'],
+        user=os.environ['PGUSER'],
+        password=os.environ['PGPASSWORD'],
+        port=os.environ['PGPORT'],
+        connection_factory=TracingConnection
+    )
+    _pools.add(pool)
+    return pool
+
+def init_connection_pool():
+    """Initialize the process-wide database connection pool."""
+    global _pool
+    if _pool is not None and not _pool.closed:
+        return True
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            try:
+                _pool = _create_pool()
+            except Exception as e:
+                st.error(f"Failed to initialize connection pool: {str(e)}")
+                return False
     return True
 
+def reset_connection_pool():
+    """Retire the pool so the next request opens fresh connections.
+
+    Connections other sessions are using stay open until they are returned.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and not pool.closed:
+        pool.retire()
+
 def get_db_connection():
-    """Get connection from pool with automatic cleanup."""
+    """Get connection from pool with automatic cleanup.
+
+    Returns None when the database is unreachable or every pooled
+    connection is busy; other sessions' connections are never touched.
+    """
     if not init_connection_pool():
         return None
+    pool = _pool
+    if pool is None:
+        return None
     
     try:
-        # Check if there are available connections
-        if st.session_state.db_pool.closed:
-            # Reinitialize pool if closed
-            init_connection_pool()
-        
-        conn = st.session_state.db_pool.getconn()
-        return conn
+        # Idle connections broken by a server restart are discarded, not handed out
+        for _ in range(pool.maxconn + 1):
+            conn = pool.getconn()
+            if not conn.closed and conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                conn._pool = pool
+                return conn
+            pool.putconn(conn, close=True)
+        return None
+    except PoolError as e:
+        performance_monitor.increment('db_pool_exhausted')
+        log_error(f"Database busy: {str(e)}", show_notification=False)
+        return None
     except Exception as e:
         st.error(f"Failed to get database connection: {str(e)}")
-        # Try to reinitialize pool
-        if 'db_pool' in st.session_state:
-            del st.session_state.db_pool
-        init_connection_pool()
         return None
 
 def release_connection(conn):
     """Release connection back to pool."""
-    if conn and hasattr(st.session_state, 'db_pool'):
+    if conn:
         try:
-            st.session_state.db_pool.putconn(conn)
+            conn.close()
         except Exception as e:
             print(f"Error releasing connection: {str(e)}")
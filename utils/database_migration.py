@@ -2,98 +2,225 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import streamlit as st
 from utils.database import get_db_connection
+from utils.logger import log_error, log_info
+from utils.chore_rotation import CHORE_ROTATION_SCHEMA_SQL
+from utils.chores import CHORE_PERSON_INDEX_SQL
+from utils.family import FAMILY_SCHEMA_SQL
+from utils.recipe_search import SEARCH_SCHEMA_SQL
+from utils.points import POINTS_SCHEMA_SQL
+from utils.rewards import REWARDS_SCHEMA_SQL
 
-def update_database_schema():
-    """Update database schema with missing columns."""
+# Columns and tables added before the schema was versioned
+BASE_SCHEMA_SQL = """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'grocery_items'
+            AND column_name = 'is_togo'
+        ) THEN
+            ALTER TABLE grocery_items
+            ADD COLUMN is_togo BOOLEAN DEFAULT FALSE;
+        END IF;
+    END $$;
+
+    -- Add instructions column to recipes table if not exists
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'recipes'
+            AND column_name = 'instructions'
+        ) THEN
+            ALTER TABLE recipes
+            ADD COLUMN instructions TEXT;
+        END IF;
+    END $$;
+
+    -- Update recipes table structure if not exists
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'recipes'
+            AND column_name = 'servings'
+        ) THEN
+            ALTER TABLE recipes
+            ADD COLUMN servings INTEGER DEFAULT 4;
+        END IF;
+    END $$;
+
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'recipes'
+            AND column_name = 'prep_time'
+        ) THEN
+            ALTER TABLE recipes
+            ADD COLUMN prep_time INTEGER DEFAULT 30;
+        END IF;
+    END $$;
+
+    -- Create recipe_ingredients table if not exists
+    CREATE TABLE IF NOT EXISTS recipe_ingredients (
+        ingredient_id SERIAL PRIMARY KEY,
+        recipe_id INTEGER REFERENCES recipes(recipe_id),
+        ingredient_name VARCHAR(255) NOT NULL,
+        quantity DECIMAL NOT NULL,
+        unit VARCHAR(50) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- schema.sql never had the todo list
+    CREATE TABLE IF NOT EXISTS todo_items (
+        id SERIAL PRIMARY KEY,
+        task TEXT NOT NULL,
+        priority VARCHAR(20) DEFAULT 'normal',
+        due_date DATE,
+        completed BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT valid_priority CHECK (priority IN ('high', 'normal', 'low'))
+    );
+
+    -- Notifications created by the first schema used id, read, no
+    -- priority and a type list without event, chore and school;
+    -- bring them in line with utils/notifications.py
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'notifications' AND column_name = 'read') THEN
+            ALTER TABLE notifications RENAME COLUMN read TO read_status;
+        END IF;
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'notifications' AND column_name = 'id') THEN
+            ALTER TABLE notifications RENAME COLUMN id TO notification_id;
+        END IF;
+    END $$;
+    ALTER TABLE notifications ADD COLUMN IF NOT EXISTS priority INTEGER DEFAULT 1;
+    ALTER TABLE notifications DROP CONSTRAINT IF EXISTS valid_type;
+
+    -- Create meal_plans table if not exists
+    CREATE TABLE IF NOT EXISTS meal_plans (
+        plan_id SERIAL PRIMARY KEY,
+        date DATE NOT NULL,
+        meal_type VARCHAR(50) NOT NULL,
+        recipe_id INTEGER REFERENCES recipes(recipe_id),
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+KEYSET_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_school_events_date_id
+        ON school_events(event_date, id);
+    CREATE INDEX IF NOT EXISTS idx_chores_due_id
+        ON chores((COALESCE(due_date, DATE '9999-12-31')), id);
+"""
+
+# Merge duplicate unpurchased grocery items before the unique index goes on
+GROCERY_UNIQUE_SQL = """
+    WITH ranked AS (
+        SELECT id,
+               first_value(id) OVER keys_by_id AS keep_id,
+               SUM(quantity) OVER keys AS total
+        FROM grocery_items
+        WHERE purchased = FALSE
+        WINDOW keys AS (PARTITION BY lower(trim(item)), coalesce(lower(unit), '')),
+               keys_by_id AS (keys ORDER BY id)
+    ), merged AS (
+        UPDATE grocery_items g SET quantity = r.total
+        FROM ranked r
+        WHERE g.id = r.id AND r.id = r.keep_id
+    )
+    DELETE FROM grocery_items g
+    USING ranked r
+    WHERE g.id = r.id AND r.id <> r.keep_id;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_grocery_items_pending_item_unit
+        ON grocery_items ((lower(trim(item))), (coalesce(lower(unit), '')))
+        WHERE purchased = FALSE;
+"""
+
+RECIPE_NAME_KEY_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_recipes_name_key
+        ON recipes ((lower(trim(name))));
+"""
+
+# The person index moved to member_id, see CHORE_PERSON_INDEX_SQL
+CHORE_FILTER_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_chores_status_due
+        ON chores(completed, due_date);
+"""
+
+TODO_PRIORITY_INDEX_SQL = """
+    DROP INDEX IF EXISTS idx_todo_items_pending_due_id;
+    CREATE INDEX IF NOT EXISTS idx_todo_items_pending_due_rank_id ON todo_items(
+        (COALESCE(due_date, DATE '9999-12-31')), (CASE priority WHEN 'high' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END), id
+    ) WHERE completed = FALSE;
+"""
+
+# Keep the most recently created meal of each slot before the unique index
+# goes on; the meal planner already showed that one
+MEAL_PLAN_SLOT_SQL = """
+    DELETE FROM meal_plans a
+    USING meal_plans b
+    WHERE a.date = b.date AND a.meal_type = b.meal_type
+      AND (COALESCE(a.created_at, '-infinity'), a.ctid) < (COALESCE(b.created_at, '-infinity'), b.ctid);
+
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_meal_plans_date_meal_type
+        ON meal_plans(date, meal_type);
+"""
+
+# (schema version, description, SQL), applied in list order. The points and
+# rewards SQL is written against member ids, so the family step comes first
+# even though it is a later version. Every step is idempotent.
+MIGRATIONS = (
+    (1, "base columns and tables", BASE_SCHEMA_SQL),
+    (2, "keyset pagination indexes", KEYSET_INDEXES_SQL),
+    (3, "unique pending grocery items", GROCERY_UNIQUE_SQL),
+    (4, "recipe search vector", SEARCH_SCHEMA_SQL),
+    (5, "recipe import name lookup", RECIPE_NAME_KEY_SQL),
+    (6, "chore filter indexes", CHORE_FILTER_INDEXES_SQL),
+    (9, "family members and integer member keys", FAMILY_SCHEMA_SQL),
+    (10, "recurring chore templates", CHORE_ROTATION_SCHEMA_SQL),
+    (7, "points ledger and balances", POINTS_SCHEMA_SQL),
+    (8, "reward claims", REWARDS_SCHEMA_SQL),
+    (11, "todo priority ordering index", TODO_PRIORITY_INDEX_SQL),
+    (12, "chore person index covers points", CHORE_PERSON_INDEX_SQL),
+    (13, "one meal per plan slot", MEAL_PLAN_SLOT_SQL),
+)
+
+def update_database_schema(from_version=0):
+    """Apply the migrations newer than from_version in one transaction.
+
+    Returns True once they are committed. Recording the new version is left
+    to the caller (utils/init_database.migrate_database).
+    """
     conn = get_db_connection()
     if conn:
         try:
             with conn.cursor() as cur:
-                # Add is_togo column to grocery_items table if not exists
-                cur.execute("""
-                    DO $$ 
-                    BEGIN
-                        IF NOT EXISTS (
-                            SELECT 1 
-                            FROM information_schema.columns 
-                            WHERE table_name = 'grocery_items' 
-                            AND column_name = 'is_togo'
-                        ) THEN
-                            ALTER TABLE grocery_items 
-                            ADD COLUMN is_togo BOOLEAN DEFAULT FALSE;
-                        END IF;
-                    END $$;
-
-                    -- Add instructions column to recipes table if not exists
-                    DO $$ 
-                    BEGIN
-                        IF NOT EXISTS (
-                            SELECT 1 
-                            FROM information_schema.columns 
-                            WHERE table_name = 'recipes' 
-                            AND column_name = 'instructions'
-                        ) THEN
-                            ALTER TABLE recipes 
-                            ADD COLUMN instructions TEXT;
-                        END IF;
-                    END $$;
-
-                    -- Update recipes table structure if not exists
-                    DO $$ 
-                    BEGIN
-                        IF NOT EXISTS (
-                            SELECT 1 
-                            FROM information_schema.columns 
-                            WHERE table_name = 'recipes' 
-                            AND column_name = 'servings'
-                        ) THEN
-                            ALTER TABLE recipes 
-                            ADD COLUMN servings INTEGER DEFAULT 4;
-                        END IF;
-                    END $$;
-
-                    DO $$ 
-                    BEGIN
-                        IF NOT EXISTS (
-                            SELECT 1 
-                            FROM information_schema.columns 
-                            WHERE table_name = 'recipes' 
-                            AND column_name = 'prep_time'
-                        ) THEN
-                            ALTER TABLE recipes 
-                            ADD COLUMN prep_time INTEGER DEFAULT 30;
-                        END IF;
-                    END $$;
-
-                    -- Create recipe_ingredients table if not exists
-                    CREATE TABLE IF NOT EXISTS recipe_ingredients (
-                        ingredient_id SERIAL PRIMARY KEY,
-                        recipe_id INTEGER REFERENCES recipes(recipe_id),
-                        ingredient_name VARCHAR(255) NOT NULL,
-                        quantity DECIMAL NOT NULL,
-                        unit VARCHAR(50) NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-
-                    -- Create meal_plans table if not exists
-                    CREATE TABLE IF NOT EXISTS meal_plans (
-                        plan_id SERIAL PRIMARY KEY,
-                        date DATE NOT NULL,
-                        meal_type VARCHAR(50) NOT NULL,
-                        recipe_id INTEGER REFERENCES recipes(recipe_id),
-                        notes TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-                conn.commit()
-                st.success("Database schema updated successfully!")
+                for version, description, sql in MIGRATIONS:
+                    if version > from_version:
+                        cur.execute(sql)
+                        log_info(f"Applied schema migration {version}: {description}")
+            conn.commit()
+            log_info("Database schema updated successfully")
+            return True
         except Exception as e:
-            st.error(f"Error updating schema: {str(e)}")
-            print(f"Error updating schema: {str(e)}")
+            # Nothing is kept, so the next start retries the whole migration
+            conn.rollback()
+            log_error(f"Error updating schema: {str(e)}", show_notification=False)
+            return False
         finally:
             conn.close()
+    return False
 
 if __name__ == "__main__":
     update_database_schema()
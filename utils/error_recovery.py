@@ -2,6 +2,8 @@ import streamlit as st
 from datetime import datetime
 import json
 import os
+from utils.database import init_connection_pool, reset_connection_pool
+from utils.styles import inject_stylesheet
 
 class ErrorRecovery:
     def __init__(self):
@@ -27,8 +29,7 @@ class ErrorRecovery:
     def recover_database_connection(self):
         """Attempt to recover database connection."""
         try:
-            if 'db_pool' in st.session_state:
-                del st.session_state['db_pool']
+            reset_connection_pool()
             return init_connection_pool()
         except Exception as e:
             self.log_error('database_recovery_failed', str(e))
@@ -37,7 +38,7 @@ class ErrorRecovery:
     def recover_style_conflict(self):
         """Reset and reload styles."""
         try:
-            st.markdown(get_consolidated_styles(), unsafe_allow_html=True)
+            inject_stylesheet(force=True)
             return True
         except Exception as e:
             self.log_error('style_recovery_failed', str(e))
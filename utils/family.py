@@ -0,0 +1,177 @@
+from collections import namedtuple
+from utils.database import get_db_connection
+from utils.logger import log_error
+
+DEFAULT_MEMBERS = ("Emma", "James", "Sarah", "David")
+FAMILY_LABEL = "Family"
+
+Member = namedtuple('Member', ['member_id', 'name'])
+
+_default_values = ", ".join(f"('{name}')" for name in DEFAULT_MEMBERS)
+
+# People are referenced by integer member_id everywhere. Older schemas kept
+# names in chores.assigned_to, notifications.user_id, points_ledger.user_name,
+# points_balance.user_name and rewards.claimed_by; those are converted once,
+# creating a member for every name found. Runs before POINTS_SCHEMA_SQL.
+FAMILY_SCHEMA_SQL = f"""
+    CREATE TABLE IF NOT EXISTS family_members (
+        member_id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO family_members (name) VALUES {_default_values} ON CONFLICT (name) DO NOTHING;
+
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'chores' AND column_name = 'assigned_to') THEN
+            INSERT INTO family_members (name)
+            SELECT DISTINCT trim(assigned_to) FROM chores WHERE trim(assigned_to) <> ''
+            ON CONFLICT (name) DO NOTHING;
+            ALTER TABLE chores ADD COLUMN member_id INTEGER REFERENCES family_members(member_id);
+            UPDATE chores c SET member_id = m.member_id
+            FROM family_members m WHERE m.name = trim(c.assigned_to);
+            ALTER TABLE chores DROP COLUMN assigned_to;
+        END IF;
+
+        -- 'family', unknown names and the integer ids of the first schema
+        -- become family-wide (NULL) notifications
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'notifications' AND column_name = 'user_id') THEN
+            ALTER TABLE notifications
+                ADD COLUMN member_id INTEGER REFERENCES family_members(member_id) ON DELETE CASCADE;
+            UPDATE notifications n SET member_id = m.member_id
+            FROM family_members m WHERE lower(m.name) = lower(n.user_id::text);
+            ALTER TABLE notifications DROP COLUMN user_id;
+        END IF;
+
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'points_ledger' AND column_name = 'user_name') THEN
+            INSERT INTO family_members (name)
+            SELECT DISTINCT user_name FROM points_ledger
+            ON CONFLICT (name) DO NOTHING;
+            ALTER TABLE points_ledger ADD COLUMN member_id INTEGER REFERENCES family_members(member_id);
+            -- The one sanctioned rewrite of the append-only ledger
+            ALTER TABLE points_ledger DISABLE TRIGGER points_ledger_append_only;
+            UPDATE points_ledger l SET member_id = m.member_id
+            FROM family_members m WHERE m.name = l.user_name;
+            ALTER TABLE points_ledger ENABLE TRIGGER points_ledger_append_only;
+            ALTER TABLE points_ledger DROP COLUMN user_name;
+            ALTER TABLE points_ledger ALTER COLUMN member_id SET NOT NULL;
+        END IF;
+
+        -- Converted in place: balances from before the ledger existed are
+        -- not in the ledger, so they cannot be rebuilt from it
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'points_balance' AND column_name = 'user_name') THEN
+            INSERT INTO family_members (name)
+            SELECT DISTINCT user_name FROM points_balance
+            ON CONFLICT (name) DO NOTHING;
+            ALTER TABLE points_balance ADD COLUMN member_id INTEGER REFERENCES family_members(member_id);
+            UPDATE points_balance b SET member_id = m.member_id
+            FROM family_members m WHERE m.name = b.user_name;
+            ALTER TABLE points_balance DROP COLUMN id;
+            ALTER TABLE points_balance DROP COLUMN user_name;
+            ALTER TABLE points_balance ADD PRIMARY KEY (member_id);
+        END IF;
+
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'rewards' AND column_name = 'claimed_by') THEN
+            INSERT INTO family_members (name)
+            SELECT DISTINCT claimed_by FROM rewards WHERE claimed_by IS NOT NULL
+            ON CONFLICT (name) DO NOTHING;
+            ALTER TABLE rewards ADD COLUMN claimed_by_id INTEGER REFERENCES family_members(member_id);
+            UPDATE rewards r SET claimed_by_id = m.member_id
+            FROM family_members m WHERE m.name = r.claimed_by;
+            ALTER TABLE rewards DROP COLUMN claimed_by;
+        END IF;
+    END $$;
+
+    CREATE INDEX IF NOT EXISTS idx_notifications_member_read ON notifications(member_id, read_status);
+"""
+
+
+class MemberDirectory:
+    """Active family members by id and by name, loaded once and shared."""
+
+    def __init__(self, members):
+        self.members = [Member(*member) for member in members]
+        self._names = {member.member_id: member.name for member in self.members}
+        self._ids = {member.name: member.member_id for member in self.members}
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
+
+    def ids(self):
+        return [member.member_id for member in self.members]
+
+    def name(self, member_id):
+        """Return a member's name; None is the whole family."""
+        if member_id is None:
+            return FAMILY_LABEL
+        return self._names.get(member_id, f"Member {member_id}")
+
+    def id_for(self, name):
+        return self._ids.get(name)
+
+
+def load_member_directory():
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT member_id, name FROM family_members
+                WHERE active
+                ORDER BY member_id
+            """)
+            return MemberDirectory(cur.fetchall())
+    except Exception as e:
+        log_error(f"Error loading family members: {str(e)}", show_notification=False)
+        return None
+    finally:
+        conn.close()
+
+
+def add_family_member(name):
+    """Add a member, or reactivate one with that name; returns the member_id."""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO family_members (name) VALUES (%s)
+                ON CONFLICT (name) DO UPDATE SET active = TRUE
+                RETURNING member_id
+            """, (name.strip(),))
+            member_id = cur.fetchone()[0]
+        conn.commit()
+        return member_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def deactivate_family_member(member_id):
+    """Hide a member from pickers; their chores and points history stay."""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE family_members SET active = FALSE WHERE member_id = %s", (member_id,))
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
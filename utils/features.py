@@ -5,7 +5,29 @@ from psycopg2.extras import RealDictCursor
 from utils.logger import log_error
 from utils.helpers import format_date
 from utils.styles import get_mobile_styles
+from utils.performance import performance_monitor
+from utils.list_renderer import CardTemplate, render_list
+from utils.pagination import KeysetPaginator, NO_DATE
+from utils.fragment_cache import ROW_VERSION
 
+PRIORITY_ICONS = {
+    'high': '🔴',
+    'normal': '🟡',
+    'low': '🟢'
+}
+
+# High priority first within a day; matches idx_todo_items_pending_due_rank_id
+PRIORITY_RANK = "CASE priority WHEN 'high' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END"
+TODO_ORDER = (f"COALESCE(due_date, {NO_DATE})", PRIORITY_RANK, "id")
+
+TODO_CARD = CardTemplate("""
+    <div class="list-card">
+        $icon $task<br>
+        <small class="list-card-meta">Due: $due</small>
+    </div>
+""")
+
+@performance_monitor.track_render()
 def display_todo_list():
     """Display the todo list with filtering and sorting options."""
     st.subheader("📋 Todo List")
@@ -14,37 +36,27 @@ def display_todo_list():
     if conn:
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get all todo items
-                cur.execute("""
-                    SELECT * FROM todo_items 
-                    WHERE completed = FALSE 
-                    ORDER BY due_date, priority DESC
-                """)
-                todos = cur.fetchall()
+                # One keyset page of pending items, earliest due first, then by priority
+                paginator = KeysetPaginator("todos")
+                page = paginator.fetch(
+                    cur, "todo_items", f"id, task, priority, due_date, {ROW_VERSION}",
+                    order_by=TODO_ORDER,
+                    where=["completed = FALSE"]
+                )
                 
-                if todos:
-                    for todo in todos:
-                        priority_color = {
-                            'high': '🔴',
-                            'normal': '🟡',
-                            'low': '🟢'
-                        }.get(todo['priority'], '⚪')
-                        
-                        st.markdown(f"""
-                            <div style='padding: 10px; 
-                                border-left: 3px solid var(--primary-color); 
-                                margin: 5px 0; 
-                                background: rgba(255,255,255,0.05); 
-                                border-radius: 5px;'>
-                                {priority_color} {todo['task']}<br>
-                                <small style='color: #9CA3AF;'>
-                                    Due: {format_date(str(todo['due_date']))}
-                                </small>
-                            </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.info("No pending tasks")
-                    
+                render_list(
+                    page.rows,
+                    TODO_CARD,
+                    empty_message="No pending tasks",
+                    name="todos",
+                    fields=lambda todo: {
+                        'icon': PRIORITY_ICONS.get(todo['priority'], '⚪'),
+                        'task': todo['task'],
+                        'due': format_date(str(todo['due_date']))
+                    },
+                    cache_key=lambda todo: ("todo", todo['id'], todo['row_version'])
+                )
+                paginator.controls(page)
         except Exception as e:
             log_error(f"Error displaying todo list: {str(e)}")
         finally:
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from utils.performance import performance_monitor
+
+# Rendered HTML kept across reruns and sessions; least recently used goes first
+FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# Selected alongside a row to version its cached fragment. xmin changes on
+# every UPDATE of the row, so an edited row never serves stale HTML.
+ROW_VERSION = "xmin::text AS row_version"
+
+
+class FragmentCache:
+    """LRU cache of rendered HTML fragments keyed by (kind, id, version)."""
+
+    def __init__(self, max_bytes=FRAGMENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def put(self, key, html):
+        size = sys.getsizeof(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= sys.getsizeof(previous)
+            self._entries[key] = html
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= sys.getsizeof(evicted)
+                self.evictions += 1
+
+    def render(self, key, build, cache="fragments"):
+        """Return the cached fragment for key, calling build() on a miss."""
+        return self.render_many((key,), lambda item: item, lambda item: build(), cache=cache)[0]
+
+    def render_many(self, items, key_func, build, cache="fragments"):
+        """Render a list of items, rebuilding only those whose key is not cached.
+
+        Hits and misses are counted once per call rather than per row; this
+        is the only place they are counted, render() goes through here too.
+        """
+        hits = 0
+        parts = []
+        for item in items:
+            key = key_func(item)
+            html = self.get(key)
+            if html is None:
+                html = build(item)
+                self.put(key, html)
+            else:
+                hits += 1
+            parts.append(html)
+        if parts:
+            performance_monitor.increment('cache_requests', hits, cache=cache, result='hit')
+            performance_monitor.increment('cache_requests', len(parts) - hits, cache=cache, result='miss')
+        return parts
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+fragment_cache = FragmentCache()
+
+performance_monitor.register_gauge(
+    'fragment_cache_bytes', lambda: fragment_cache.bytes, "Bytes of rendered HTML held in the fragment cache"
+)
@@ -0,0 +1,84 @@
+from psycopg2.extras import RealDictCursor
+from utils.database import get_db_connection
+
+DEFAULT_CATEGORY = "From Meal Plan"
+
+# One statement per batch: rows are pre-aggregated by normalized item and
+# unit (ON CONFLICT cannot touch the same row twice), then merged into the
+# unpurchased list through uq_grocery_items_pending_item_unit. Rows are
+# taken in key order so concurrent batches lock in the same order.
+MERGE_SQL = """
+    INSERT INTO grocery_items (item, quantity, unit, category)
+    SELECT min(trim(item)), GREATEST(ROUND(SUM(quantity), 2), 0.01), min(unit), %(category)s
+    FROM ({source}) AS incoming(item, quantity, unit)
+    WHERE quantity > 0 AND trim(item) <> ''
+    GROUP BY lower(trim(item)), coalesce(lower(unit), '')
+    ORDER BY lower(trim(item)), coalesce(lower(unit), '')
+    ON CONFLICT ((lower(trim(item))), (coalesce(lower(unit), ''))) WHERE purchased = FALSE
+    DO UPDATE SET quantity = grocery_items.quantity + EXCLUDED.quantity
+    RETURNING id, item, quantity, unit, (xmax = 0) AS inserted
+"""
+
+ITEMS_SOURCE = """
+    SELECT * FROM unnest(%(items)s::text[], %(quantities)s::numeric[], %(units)s::text[])
+"""
+
+RECIPES_SOURCE = """
+    SELECT ri.ingredient_name, ri.quantity * m.multiplier, ri.unit
+    FROM unnest(%(recipe_ids)s::int[], %(multipliers)s::numeric[]) AS m(recipe_id, multiplier)
+    JOIN recipe_ingredients ri ON ri.recipe_id = m.recipe_id
+"""
+
+
+def _merge(source, params, category):
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(MERGE_SQL.format(source=source), dict(params, category=category))
+            rows = cur.fetchall()
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def merge_grocery_items(items, category=DEFAULT_CATEGORY):
+    """Merge (item, quantity, unit) tuples into the unpurchased list in one statement.
+
+    Returns the affected rows with an `inserted` flag; False means the
+    quantity was added to an item already on the list.
+    """
+    items = list(items)
+    if not items:
+        return []
+    names, quantities, units = zip(*items)
+    return _merge(ITEMS_SOURCE, {
+        'items': list(names),
+        'quantities': [float(quantity) for quantity in quantities],
+        'units': list(units)
+    }, category)
+
+
+def add_recipes_to_grocery_list(multipliers, category=DEFAULT_CATEGORY):
+    """Merge the scaled ingredients of several recipes in one round trip.
+
+    multipliers maps recipe_id to a servings multiplier, e.g. a whole
+    week's menu with repeated recipes summed up.
+    """
+    if not multipliers:
+        return []
+    return _merge(RECIPES_SOURCE, {
+        'recipe_ids': list(multipliers),
+        'multipliers': [float(multiplier) for multiplier in multipliers.values()]
+    }, category)
+
+
+def summarize_merge(rows):
+    """Return (inserted, merged) counts for a merge result."""
+    inserted = sum(1 for row in rows if row['inserted'])
+    return inserted, len(rows) - inserted
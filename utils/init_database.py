@@ -1,6 +1,23 @@
+import threading
 import streamlit as st
 from utils.database import get_db_connection
 from utils.logger import log_error, log_info
+from utils.chore_rotation import CHORE_ROTATION_SCHEMA_SQL
+from utils.chores import CHORE_PERSON_INDEX_SQL
+from utils.family import FAMILY_SCHEMA_SQL
+from utils.recipe_search import SEARCH_SCHEMA_SQL
+from utils.points import POINTS_SCHEMA_SQL
+from utils.rewards import REWARDS_SCHEMA_SQL
+
+# Bump together with a new MIGRATIONS step in utils/database_migration.py
+SCHEMA_VERSION = 13
+CORE_TABLES = ('family_members', 'recipes', 'todo_items', 'events', 'chores', 'school_events',
+               'grocery_items', 'family_messages', 'notifications', 'meal_plans',
+               'recipe_ingredients', 'rewards', 'points_balance', 'points_ledger',
+               'chore_templates', 'chore_template_members')
+
+_schema_checked = False
+_schema_lock = threading.Lock()
 
 def initialize_database():
     """Initialize database with all required tables."""
@@ -10,6 +27,11 @@ def initialize_database():
             with conn.cursor() as cur:
                 # Drop all existing tables in correct order
                 cur.execute("""
+                    DROP TABLE IF EXISTS chore_template_members CASCADE;
+                    DROP TABLE IF EXISTS chore_templates CASCADE;
+                    DROP TABLE IF EXISTS points_ledger CASCADE;
+                    DROP TABLE IF EXISTS points_balance CASCADE;
+                    DROP TABLE IF EXISTS rewards CASCADE;
                     DROP TABLE IF EXISTS recipe_ingredients CASCADE;
                     DROP TABLE IF EXISTS meal_plans CASCADE;
                     DROP TABLE IF EXISTS recipes CASCADE;
@@ -20,11 +42,19 @@ def initialize_database():
                     DROP TABLE IF EXISTS chores CASCADE;
                     DROP TABLE IF EXISTS school_events CASCADE;
                     DROP TABLE IF EXISTS grocery_items CASCADE;
+                    DROP TABLE IF EXISTS family_members CASCADE;
                 """)
                 
                 # Create all tables in correct order
                 cur.execute("""
                     -- Base tables (no foreign key dependencies)
+                    CREATE TABLE family_members (
+                        member_id SERIAL PRIMARY KEY,
+                        name VARCHAR(100) NOT NULL UNIQUE,
+                        active BOOLEAN NOT NULL DEFAULT TRUE,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+
                     CREATE TABLE recipes (
                         recipe_id SERIAL PRIMARY KEY,
                         name VARCHAR(200) NOT NULL,
@@ -59,7 +89,7 @@ def initialize_database():
                     CREATE TABLE chores (
                         id SERIAL PRIMARY KEY,
                         task TEXT NOT NULL,
-                        assigned_to VARCHAR(100) NOT NULL,
+                        member_id INTEGER REFERENCES family_members(member_id),
                         due_date DATE,
                         completed BOOLEAN DEFAULT FALSE,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -97,13 +127,14 @@ def initialize_database():
                     );
 
                     CREATE TABLE notifications (
-                        id SERIAL PRIMARY KEY,
-                        user_id INTEGER NOT NULL,
+                        notification_id SERIAL PRIMARY KEY,
+                        -- NULL for notifications meant for the whole family
+                        member_id INTEGER REFERENCES family_members(member_id) ON DELETE CASCADE,
                         message TEXT NOT NULL,
                         type VARCHAR(50) NOT NULL,
-                        read BOOLEAN DEFAULT FALSE,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        CONSTRAINT valid_type CHECK (type IN ('info', 'warning', 'error', 'success'))
+                        read_status BOOLEAN DEFAULT FALSE,
+                        priority INTEGER DEFAULT 1
                     );
 
                     -- Dependent tables (with foreign keys)
@@ -128,15 +159,48 @@ def initialize_database():
 
                     -- Create indexes for better performance
                     CREATE INDEX idx_meal_plans_date ON meal_plans(date);
+                    -- One meal per slot; save_meal_plan upserts on it
+                    CREATE UNIQUE INDEX uq_meal_plans_date_meal_type ON meal_plans(date, meal_type);
                     CREATE INDEX idx_meal_plans_recipe ON meal_plans(recipe_id);
                     CREATE INDEX idx_recipe_ingredients_recipe ON recipe_ingredients(recipe_id);
                     CREATE INDEX idx_family_messages_expires ON family_messages(expires_at);
-                    CREATE INDEX idx_notifications_user_read ON notifications(user_id, read);
+                    CREATE INDEX idx_notifications_member_read ON notifications(member_id, read_status);
                     CREATE INDEX idx_todo_items_due_date ON todo_items(due_date);
                     CREATE INDEX idx_chores_due_date ON chores(due_date);
                     CREATE INDEX idx_grocery_items_category ON grocery_items(category);
                     CREATE INDEX idx_school_events_date ON school_events(event_date);
+                    
+                    -- Keyset pagination indexes, matching the ORDER BY of each list
+                    CREATE INDEX idx_school_events_date_id ON school_events(event_date, id);
+                    CREATE INDEX idx_chores_due_id ON chores((COALESCE(due_date, DATE '9999-12-31')), id);
+                    CREATE INDEX idx_todo_items_pending_due_rank_id ON todo_items(
+                        (COALESCE(due_date, DATE '9999-12-31')), (CASE priority WHEN 'high' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END), id
+                    ) WHERE completed = FALSE;
+                    
+                    -- One unpurchased row per normalized item and unit; target of the grocery merge
+                    CREATE UNIQUE INDEX uq_grocery_items_pending_item_unit
+                        ON grocery_items ((lower(trim(item))), (coalesce(lower(unit), '')))
+                        WHERE purchased = FALSE;
+                    
+                    -- Recipe import matches existing recipes by name
+                    CREATE INDEX idx_recipes_name_key ON recipes ((lower(trim(name))));
+                    
+                    -- Chore queries filter by person, status and due date; the
+                    -- person index goes on with CHORE_PERSON_INDEX_SQL below
+                    CREATE INDEX idx_chores_status_due ON chores(completed, due_date);
                 """)
+                # Default family members
+                cur.execute(FAMILY_SCHEMA_SQL)
+                # Recurring chore templates and their rotations
+                cur.execute(CHORE_ROTATION_SCHEMA_SQL)
+                # Recipe search document, its triggers and indexes
+                cur.execute(SEARCH_SCHEMA_SQL)
+                # Chore points, rewards, the points ledger and its balance trigger
+                cur.execute(POINTS_SCHEMA_SQL)
+                cur.execute(REWARDS_SCHEMA_SQL)
+                # Covering index for chore lists, once points exists
+                cur.execute(CHORE_PERSON_INDEX_SQL)
+                set_schema_version(cur, SCHEMA_VERSION)
                 
                 conn.commit()
                 log_info("All tables created successfully")
@@ -150,5 +214,84 @@ def initialize_database():
             conn.close()
     return False
 
+def get_schema_version(cur):
+    """Return the recorded schema version, or 0 when none is recorded."""
+    cur.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return 0
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cur.fetchone()[0]
+
+def set_schema_version(cur, version):
+    """Record the schema version the database is at."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO schema_version (version) VALUES (%s)
+        ON CONFLICT (version) DO NOTHING;
+    """, (version,))
+
+def ensure_database():
+    """Validate the schema once per process, creating or migrating it only when needed."""
+    global _schema_checked
+    if _schema_checked:
+        return True
+    with _schema_lock:
+        if _schema_checked:
+            return True
+        conn = get_db_connection()
+        if not conn:
+            return False
+        try:
+            with conn.cursor() as cur:
+                version = get_schema_version(cur)
+                cur.execute(
+                    "SELECT COUNT(*) FROM unnest(%s::text[]) AS t(name) WHERE to_regclass(t.name) IS NULL",
+                    (list(CORE_TABLES),)
+                )
+                missing_tables = cur.fetchone()[0]
+            conn.commit()
+        except Exception as e:
+            log_error(f"Schema check failed: {str(e)}", show_notification=False)
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+        if version >= SCHEMA_VERSION and not missing_tables:
+            _schema_checked = True
+            return True
+        if missing_tables == len(CORE_TABLES):
+            log_info("No schema found, creating tables")
+            _schema_checked = initialize_database()
+        else:
+            log_info(f"Migrating schema from version {version} to {SCHEMA_VERSION}")
+            # Tables missing at the current version were dropped since; reapply everything
+            _schema_checked = migrate_database(0 if version >= SCHEMA_VERSION else version)
+        return _schema_checked
+
+def migrate_database(from_version=0):
+    """Apply the migrations newer than from_version and record the current schema version."""
+    from utils.database_migration import update_database_schema
+    if not update_database_schema(from_version):
+        log_error(f"Schema migration to version {SCHEMA_VERSION} failed", show_notification=False)
+        return False
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            set_schema_version(cur, SCHEMA_VERSION)
+        conn.commit()
+        return True
+    except Exception as e:
+        log_error(f"Database migration error: {str(e)}", show_notification=False)
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
     initialize_database()
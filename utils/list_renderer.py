@@ -0,0 +1,65 @@
+from html import escape
+from string import Template
+import streamlit as st
+from utils.performance import performance_monitor
+from utils.fragment_cache import fragment_cache
+
+
+def _escape_field(value):
+    """Escape a value for HTML and keep line breaks without ending the HTML block."""
+    if value is None:
+        return ""
+    return escape(str(value)).replace("\r\n", "\n").replace("\n", "<br>")
+
+
+class CardTemplate:
+    """A precompiled card template; substituted fields are HTML-escaped.
+
+    Templates are collapsed onto one line so a rendered list is a single
+    markdown HTML block, whatever the row count.
+    """
+
+    def __init__(self, template, safe_fields=()):
+        self.template = Template("".join(line.strip() for line in template.strip().splitlines()))
+        self.safe_fields = frozenset(safe_fields)
+
+    def render(self, **fields):
+        return self.template.substitute({
+            key: value if key in self.safe_fields else _escape_field(value)
+            for key, value in fields.items()
+        })
+
+
+def render_list_html(rows, template, list_class="list-card-group", fields=None, cache_key=None, name="list"):
+    """Return the HTML for a whole list.
+
+    rows are template field dicts, or source rows when fields(row) maps a
+    row to its template fields. With cache_key(row) -> (kind, id, version),
+    unchanged rows come from the fragment cache and fields() is skipped.
+    """
+    def build(row):
+        return template.render(**(fields(row) if fields else row))
+
+    if cache_key is None:
+        cards = "".join(build(row) for row in rows)
+    else:
+        cards = "".join(fragment_cache.render_many(
+            rows, lambda row: (name,) + tuple(cache_key(row)), build, cache=f"fragments:{name}"
+        ))
+    return f'<div class="{list_class}">{cards}</div>'
+
+
+def render_list(rows, template, empty_message=None, name="list", list_class="list-card-group",
+                fields=None, cache_key=None):
+    """Render a list as one Streamlit element, instead of one element per row."""
+    rows = list(rows)
+    if not rows:
+        if empty_message:
+            st.info(empty_message)
+        return 0
+    st.markdown(
+        render_list_html(rows, template, list_class, fields=fields, cache_key=cache_key, name=name),
+        unsafe_allow_html=True
+    )
+    performance_monitor.increment('list_rows_rendered', len(rows), list=name)
+    return len(rows)
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from psycopg2.extras import RealDictCursor
+from utils.database import get_db_connection
+from utils.fragment_cache import ROW_VERSION
+from utils.logger import log_error
+
+MEAL_TYPES = ("Breakfast", "Lunch", "Dinner")
+
+# Recipes with their ingredients in one round trip; the version covers both
+RECIPES_QUERY = f"""
+    SELECT r.recipe_id, r.name, r.description, r.servings, r.prep_time,
+           COALESCE(r.instructions, '') AS instructions, r.{ROW_VERSION},
+           COALESCE(
+               json_agg(
+                   json_build_object(
+                       'ingredient_name', ri.ingredient_name,
+                       'quantity', ri.quantity,
+                       'unit', ri.unit,
+                       'row_version', ri.xmin::text
+                   ) ORDER BY ri.ingredient_name, ri.unit
+               ) FILTER (WHERE ri.recipe_id IS NOT NULL),
+               '[]'
+           ) AS ingredients
+    FROM recipes r
+    LEFT JOIN recipe_ingredients ri ON ri.recipe_id = r.recipe_id
+    WHERE r.recipe_id = ANY(%s)
+    GROUP BY r.recipe_id
+"""
+
+
+def week_bounds(day):
+    """Return the Monday and Sunday of the week containing day."""
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+class MealPlanRange:
+    """Meal plans for a date range plus every recipe they reference.
+
+    Loaded in two round trips on one connection; columns, previews and the
+    week view all read from it instead of querying per meal.
+    """
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.meals = {}
+        self.recipes = {}
+
+    @classmethod
+    def load(cls, start_date, end_date):
+        plan_range = cls(start_date, end_date)
+        conn = get_db_connection()
+        if not conn:
+            return plan_range
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT date, meal_type, recipe_id, notes
+                    FROM meal_plans
+                    WHERE date BETWEEN %s AND %s
+                """, (start_date, end_date))
+                # One row per slot, see uq_meal_plans_date_meal_type
+                for row in cur.fetchall():
+                    plan_range.meals[(row['date'], row['meal_type'])] = dict(row)
+                plan_range._fetch_recipes(cur, {
+                    meal['recipe_id'] for meal in plan_range.meals.values() if meal['recipe_id']
+                })
+        except Exception as e:
+            log_error(f"Error loading meal plans: {str(e)}", show_notification=False)
+        finally:
+            conn.close()
+        return plan_range
+
+    def _fetch_recipes(self, cur, recipe_ids):
+        recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id not in self.recipes]
+        if not recipe_ids:
+            return
+        cur.execute(RECIPES_QUERY, (recipe_ids,))
+        for row in cur.fetchall():
+            self.recipes[row['recipe_id']] = dict(row)
+
+    def get_meal(self, date, meal_type):
+        return self.meals.get((date, meal_type), {})
+
+    def get_recipe(self, recipe_id):
+        """Return a recipe with its ingredients, loading it if it is not planned in the range."""
+        if recipe_id and recipe_id not in self.recipes:
+            conn = get_db_connection()
+            if conn:
+                try:
+                    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                        self._fetch_recipes(cur, [recipe_id])
+                finally:
+                    conn.close()
+        return self.recipes.get(recipe_id)
+
+    def set_meal(self, date, meal_type, recipe_id, notes):
+        """Reflect a saved meal, so fragment reruns see it without reloading."""
+        self.meals[(date, meal_type)] = {
+            'date': date, 'meal_type': meal_type, 'recipe_id': recipe_id, 'notes': notes
+        }
+
+    def days(self):
+        day = self.start_date
+        while day <= self.end_date:
+            yield day
+            day += timedelta(days=1)
+
+
+def save_meal_plan(date, meal_type, recipe_id, notes):
+    """Insert or update the meal for a date and meal type in one statement.
+
+    uq_meal_plans_date_meal_type makes two sessions saving the same slot
+    update one row instead of both inserting.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO meal_plans
+                (date, meal_type, recipe_id, notes)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (date, meal_type)
+                DO UPDATE SET recipe_id = EXCLUDED.recipe_id, notes = EXCLUDED.notes
+            """, (date, meal_type, recipe_id, notes))
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
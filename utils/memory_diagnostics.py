@@ -0,0 +1,182 @@
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.logger import log_info, log_error
+
+MAX_SNAPSHOTS = 5
+TRACE_FRAMES = 10
+DEFAULT_SCHEDULE_SECONDS = 600
+MAX_TRACKED_SESSIONS = 200
+# Session state is re-measured at most this often per session
+SESSION_SIZE_INTERVAL = 60
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def estimate_size(obj, seen=None, depth=0, max_depth=20):
+    """Approximate the deep size of an object in bytes."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or depth > max_depth:
+        return 0
+    seen.add(id(obj))
+    try:
+        size = sys.getsizeof(obj)
+    except TypeError:
+        return 0
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(
+            estimate_size(key, seen, depth + 1) + estimate_size(value, seen, depth + 1)
+            for key, value in list(obj.items())
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_size(item, seen, depth + 1) for item in list(obj))
+    elif hasattr(obj, '__dict__'):
+        size += estimate_size(vars(obj), seen, depth + 1)
+    return size
+
+
+class MemoryDiagnostics:
+    """tracemalloc snapshots, snapshot diffs and per-session state sizes."""
+
+    def __init__(self):
+        self.snapshots = deque(maxlen=MAX_SNAPSHOTS)
+        self.session_sizes = {}
+        self._lock = threading.Lock()
+        self._schedule_stop = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, nframes=TRACE_FRAMES):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nframes)
+            log_info(f"tracemalloc started with {nframes} frames")
+
+    def stop_tracing(self):
+        self.stop_schedule()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            log_info("tracemalloc stopped")
+
+    def take_snapshot(self, label="manual"):
+        """Take a filtered tracemalloc snapshot, starting tracing if needed."""
+        self.start_tracing()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        traced, peak = tracemalloc.get_traced_memory()
+        entry = {
+            'taken_at': datetime.now(),
+            'label': label,
+            'traced_kb': round(traced / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'snapshot': snapshot
+        }
+        with self._lock:
+            self.snapshots.append(entry)
+        return entry
+
+    def list_snapshots(self):
+        with self._lock:
+            return [
+                {key: value for key, value in entry.items() if key != 'snapshot'}
+                for entry in self.snapshots
+            ]
+
+    def compare(self, older=-2, newer=-1, key_type='lineno', limit=20):
+        """Return the allocation sites that grew most between two snapshots."""
+        with self._lock:
+            if len(self.snapshots) < 2:
+                return []
+            old_snapshot = self.snapshots[older]['snapshot']
+            new_snapshot = self.snapshots[newer]['snapshot']
+        stats = new_snapshot.compare_to(old_snapshot, key_type)
+        return [
+            {
+                'location': str(stat.traceback[0]) if stat.traceback else 'unknown',
+                'growth_kb': round(stat.size_diff / 1024, 1),
+                'size_kb': round(stat.size / 1024, 1),
+                'count_diff': stat.count_diff,
+                'count': stat.count
+            }
+            for stat in stats[:limit]
+        ]
+
+    def start_schedule(self, interval_seconds=DEFAULT_SCHEDULE_SECONDS):
+        """Take a snapshot every interval on a background thread."""
+        if self._schedule_stop is not None:
+            return
+        self.start_tracing()
+        stop = self._schedule_stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval_seconds):
+                try:
+                    self.take_snapshot("scheduled")
+                except Exception as e:
+                    log_error(f"Scheduled memory snapshot failed: {str(e)}", show_notification=False)
+
+        threading.Thread(target=run, name="memory-snapshots", daemon=True).start()
+        log_info(f"Scheduled memory snapshots every {interval_seconds}s")
+
+    def stop_schedule(self):
+        if self._schedule_stop is not None:
+            self._schedule_stop.set()
+            self._schedule_stop = None
+
+    @property
+    def scheduled(self):
+        return self._schedule_stop is not None
+
+    def record_session_state_size(self, force=False):
+        """Estimate the current session's st.session_state size, throttled per session."""
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        previous = self.session_sizes.get(ctx.session_id)
+        if previous and not force and time.time() - previous['measured_at'] < SESSION_SIZE_INTERVAL:
+            return previous
+        key_sizes = {
+            str(key): estimate_size(value)
+            for key, value in st.session_state.to_dict().items()
+        }
+        entry = {
+            'session_id': ctx.session_id,
+            'measured_at': time.time(),
+            'keys': len(key_sizes),
+            'total_kb': round(sum(key_sizes.values()) / 1024, 1),
+            'largest_keys': ", ".join(
+                f"{key} ({size / 1024:.1f} KB)"
+                for key, size in sorted(key_sizes.items(), key=lambda item: item[1], reverse=True)[:3]
+            )
+        }
+        with self._lock:
+            self.session_sizes[ctx.session_id] = entry
+            if len(self.session_sizes) > MAX_TRACKED_SESSIONS:
+                oldest = min(self.session_sizes, key=lambda sid: self.session_sizes[sid]['measured_at'])
+                del self.session_sizes[oldest]
+        return entry
+
+    def get_session_sizes(self):
+        """Return the latest size estimate for each session, largest first."""
+        with self._lock:
+            rows = [
+                {**entry, 'measured_at': datetime.fromtimestamp(entry['measured_at']).strftime('%H:%M:%S')}
+                for entry in self.session_sizes.values()
+            ]
+        return sorted(rows, key=lambda row: row['total_kb'], reverse=True)
+
+
+memory_diagnostics = MemoryDiagnostics()
@@ -0,0 +1,178 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import psutil
+from utils.performance import performance_monitor, LogHistogram
+from utils.logger import log_info, log_error
+
+METRICS_PREFIX = "familyhub"
+DEFAULT_METRICS_PORT = 9101
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Fixed histogram boundaries in seconds, so bucket series stay stable across scrapes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HISTOGRAM_METRICS = {
+    'response_time': "Tracked function response time in seconds",
+    'render_time': "Render span duration in seconds",
+    'render_db_time': "Database time inside render spans in seconds",
+    'db_time': "Database statement time in seconds",
+}
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def active_session_count():
+    """Browser sessions connected to this Streamlit server, one websocket each."""
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return 0
+    return Runtime.instance()._session_mgr.num_active_sessions()
+
+
+performance_monitor.register_gauge(
+    'websocket_connections', active_session_count, "Open Streamlit browser sessions"
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _histogram_lines(name, labels, histogram):
+    """Render one LogHistogram as cumulative Prometheus buckets."""
+    lines = []
+    for le in LATENCY_BUCKETS:
+        count = sum(
+            bucket_count for index, bucket_count in histogram.buckets.items()
+            if LogHistogram.bucket_midpoint(index) <= le
+        )
+        lines.append(f"{name}_bucket{_format_labels(labels, {'le': le})} {count}")
+    lines.append(f"{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram.count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render_metrics():
+    """Render the performance monitor in Prometheus text exposition format."""
+    lines = []
+
+    for metric, help_text in HISTOGRAM_METRICS.items():
+        series_list = performance_monitor.store.find(metric)
+        if not series_list:
+            continue
+        name = f"{METRICS_PREFIX}_{metric}_seconds"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for series in series_list:
+            with series.lock:
+                histogram = LogHistogram()
+                histogram.merge(series.lifetime)
+            lines.extend(_histogram_lines(name, series.labels, histogram))
+
+    counters = {}
+    for counter_name, labels, value in performance_monitor.get_counters():
+        counters.setdefault(counter_name, []).append((labels, value))
+    for counter_name, samples in counters.items():
+        name = f"{METRICS_PREFIX}_{counter_name}_total"
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for gauge_name, help_text, samples in performance_monitor.get_gauges():
+        name = f"{METRICS_PREFIX}_{gauge_name}"
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    process = psutil.Process()
+    cpu_times = process.cpu_times()
+    lines.extend([
+        "# HELP process_resident_memory_bytes Resident memory size in bytes",
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {process.memory_info().rss}",
+        "# HELP process_cpu_seconds_total Total user and system CPU time in seconds",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {cpu_times.user + cpu_times.system}",
+        "# HELP process_start_time_seconds Start time of the process since unix epoch",
+        "# TYPE process_start_time_seconds gauge",
+        f"process_start_time_seconds {process.create_time()}",
+        "# TYPE process_num_threads gauge",
+        f"process_num_threads {process.num_threads()}",
+    ])
+    cpu_series = performance_monitor.store.find('cpu_percent')
+    if cpu_series:
+        lines.append(f"# TYPE {METRICS_PREFIX}_cpu_percent gauge")
+        lines.append(f"{METRICS_PREFIX}_cpu_percent {cpu_series[0].samples.last() or 0}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serve /metrics and the /ready probe; everything else is a 404."""
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/ready':
+            self._send_ready()
+            return
+        if path != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics().encode('utf-8')
+        except Exception as e:
+            log_error(f"Error rendering metrics: {str(e)}", show_notification=False)
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_ready(self):
+        """200 once the warm-up has completed, 503 until then."""
+        from utils.warmup import is_ready
+        ready = is_ready()
+        body = b"ready\n" if ready else b"warming up\n"
+        self.send_response(200 if ready else 503)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the application log
+        pass
+
+
+def start_metrics_server(port=None, host=None):
+    """Start the metrics endpoint on a daemon thread, once per process."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        port = int(port or os.environ.get('METRICS_PORT', DEFAULT_METRICS_PORT))
+        host = host or os.environ.get('METRICS_HOST', '0.0.0.0')
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        except OSError as e:
+            log_error(f"Could not start metrics server on port {port}: {str(e)}", show_notification=False)
+            return None
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        log_info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return _server
@@ -1,35 +1,46 @@
 from datetime import datetime, timedelta
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from psycopg2.extras import RealDictCursor
+from utils.tracing import tracer
+from utils.chores import fetch_chores
+from utils.reference_data import get_family_members
 
-def create_notification(conn, user_id: str, message: str, notification_type: str, priority: int = 1) -> bool:
-    """Create a new notification in the database."""
+def recipient_filter(member_id: Optional[int]):
+    """Return the condition and params selecting one member's notifications, or the family's for None."""
+    if member_id is None:
+        return "member_id IS NULL", []
+    return "member_id = %s", [member_id]
+
+def create_notification(conn, member_id: Optional[int], message: str, notification_type: str, priority: int = 1) -> bool:
+    """Create a new notification in the database; member_id None notifies the whole family."""
     try:
         with conn.cursor() as cur:
             cur.execute("""
-                INSERT INTO notifications (user_id, message, type, priority)
+                INSERT INTO notifications (member_id, message, type, priority)
                 VALUES (%s, %s, %s, %s)
-            """, (user_id, message, notification_type, priority))
+            """, (member_id, message, notification_type, priority))
         conn.commit()
         return True
     except Exception as e:
         st.error(f"Error creating notification: {str(e)}")
         return False
 
-def get_notifications(conn, user_id: str, limit: int = 10, unread_only: bool = False) -> List[Dict[str, Any]]:
-    """Get notifications for a user."""
+def get_notifications(conn, member_id: Optional[int] = None, limit: int = 10, unread_only: bool = False) -> List[Dict[str, Any]]:
+    """Get notifications for a family member, or family-wide ones for None."""
     try:
         with conn.cursor() as cur:
-            query = """
+            condition, params = recipient_filter(member_id)
+            query = f"""
                 SELECT notification_id, message, type, created_at, read_status, priority
                 FROM notifications
-                WHERE user_id = %s
+                WHERE {condition}
             """
             if unread_only:
                 query += " AND read_status = FALSE"
             query += " ORDER BY created_at DESC LIMIT %s"
             
-            cur.execute(query, (user_id, limit))
+            cur.execute(query, params + [limit])
             notifications = cur.fetchall()
             
             return [{
@@ -59,20 +70,22 @@ def mark_notification_as_read(conn, notification_id: int) -> bool:
         st.error(f"Error updating notification: {str(e)}")
         return False
 
-def get_unread_count(conn, user_id: str) -> int:
-    """Get count of unread notifications for a user."""
+def get_unread_count(conn, member_id: Optional[int] = None) -> int:
+    """Get count of unread notifications for a family member, or family-wide ones for None."""
     try:
         with conn.cursor() as cur:
-            cur.execute("""
+            condition, params = recipient_filter(member_id)
+            cur.execute(f"""
                 SELECT COUNT(*)
                 FROM notifications
-                WHERE user_id = %s AND read_status = FALSE
-            """, (user_id,))
+                WHERE {condition} AND read_status = FALSE
+            """, params)
             return cur.fetchone()[0]
     except Exception as e:
         st.error(f"Error counting notifications: {str(e)}")
         return 0
 
+@tracer.trace_function(category="outbound")
 def check_and_create_notifications(conn):
     """Check for events and create notifications if needed."""
     today = datetime.now().date()
@@ -91,7 +104,7 @@ def check_and_create_notifications(conn):
         
         for event in events:
             message = f"Reminder: '{event[0]}' is tomorrow"
-            create_notification(conn, "family", message, "event", priority=2)
+            create_notification(conn, None, message, "event", priority=2)
         
         # Next week's events
         cur.execute("""
@@ -104,34 +117,19 @@ def check_and_create_notifications(conn):
         for event in upcoming_events:
             days_until = (event[1] - today).days
             message = f"Upcoming: '{event[0]}' in {days_until} days"
-            create_notification(conn, "family", message, "event", priority=1)
+            create_notification(conn, None, message, "event", priority=1)
     
     # Check due chores
-    with conn.cursor() as cur:
-        # Tomorrow's chores
-        cur.execute("""
-            SELECT task, assigned_to 
-            FROM chores 
-            WHERE due_date = %s AND completed = FALSE
-        """, (tomorrow,))
-        chores = cur.fetchall()
-        
-        for chore in chores:
-            message = f"Chore due tomorrow: {chore[0]} (Assigned to: {chore[1]})"
-            create_notification(conn, chore[1].lower(), message, "chore", priority=2)
-        
-        # Overdue chores
-        cur.execute("""
-            SELECT task, assigned_to, due_date
-            FROM chores 
-            WHERE due_date < %s AND completed = FALSE
-        """, (today,))
-        overdue_chores = cur.fetchall()
+    members = get_family_members()
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        for chore in fetch_chores(cur, completed=False, window="tomorrow", today=today):
+            message = f"Chore due tomorrow: {chore['task']} (Assigned to: {members.name(chore['member_id'])})"
+            create_notification(conn, chore['member_id'], message, "chore", priority=2)
         
-        for chore in overdue_chores:
-            days_overdue = (today - chore[2]).days
-            message = f"OVERDUE: {chore[0]} was due {days_overdue} days ago (Assigned to: {chore[1]})"
-            create_notification(conn, chore[1].lower(), message, "chore", priority=3)
+        for chore in fetch_chores(cur, completed=False, window="overdue", today=today):
+            days_overdue = (today - chore['due_date']).days
+            message = f"OVERDUE: {chore['task']} was due {days_overdue} days ago (Assigned to: {members.name(chore['member_id'])})"
+            create_notification(conn, chore['member_id'], message, "chore", priority=3)
     
     # Check school events
     with conn.cursor() as cur:
@@ -145,7 +143,7 @@ def check_and_create_notifications(conn):
         
         for event in school_events:
             message = f"School event tomorrow: {event[0]}"
-            create_notification(conn, "family", message, "school", priority=3)
+            create_notification(conn, None, message, "school", priority=3)
         
         # Upcoming events
         cur.execute("""
@@ -158,7 +156,7 @@ def check_and_create_notifications(conn):
         for event in upcoming_school_events:
             days_until = (event[1] - today).days
             message = f"Upcoming school event: {event[0]} in {days_until} days"
-            create_notification(conn, "family", message, "school", priority=2)
+            create_notification(conn, None, message, "school", priority=2)
 
 def get_notification_color(priority: int) -> str:
     """Get color based on notification priority."""
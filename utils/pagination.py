@@ -0,0 +1,104 @@
+from collections import namedtuple
+import streamlit as st
+
+PAGE_SIZE = 25
+# Sort-key stand-in for NULL dates, so keyset comparisons never see NULL
+NO_DATE = "DATE '9999-12-31'"
+
+Page = namedtuple('Page', ['rows', 'next_after', 'has_more', 'number'])
+
+
+def fetch_keyset_page(cur, table, columns, order_by, where=(), params=(),
+                      after=None, limit=PAGE_SIZE, descending=False):
+    """Fetch one page of rows after a keyset cursor.
+
+    order_by is a sequence of SQL expressions that must be non-null and
+    unique as a tuple (end with the primary key). Filters in `where` are
+    ANDed and pushed down to the query, so only limit + 1 rows are read
+    however much history the table holds. Expressions and table names are
+    code constants; all values go through params.
+
+    cur must return dict rows (RealDictCursor): the next cursor is read
+    back from the rows by the _k{i} aliases of the order_by expressions.
+    """
+    key_columns = ", ".join(f"{expression} AS _k{i}" for i, expression in enumerate(order_by))
+    conditions = list(where)
+    values = list(params)
+    if after is not None:
+        placeholders = ", ".join(["%s"] * len(order_by))
+        conditions.append(f"({', '.join(order_by)}) {'<' if descending else '>'} ({placeholders})")
+        values.extend(after)
+    direction = " DESC" if descending else ""
+    query = f"SELECT {columns}, {key_columns} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(f"({condition})" for condition in conditions)
+    query += " ORDER BY " + ", ".join(f"{expression}{direction}" for expression in order_by)
+    query += " LIMIT %s"
+    values.append(limit + 1)
+    cur.execute(query, values)
+    rows = cur.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_after = None
+    if has_more:
+        last = rows[-1]
+        next_after = tuple(last[f"_k{i}"] for i in range(len(order_by)))
+    return rows, next_after, has_more
+
+
+class KeysetPaginator:
+    """Windowed paging state for one list, kept in st.session_state.
+
+    Only the cursors of the pages before the current one are stored, so
+    each rerun fetches exactly one page. Changing the filters starts over
+    from the first page.
+    """
+
+    def __init__(self, key, filters=None, page_size=PAGE_SIZE):
+        self.key = f"pager_{key}"
+        self.page_size = page_size
+        signature = repr(filters)
+        state = st.session_state.get(self.key)
+        if state is None or state['filters'] != signature:
+            state = st.session_state[self.key] = {'filters': signature, 'cursors': [], 'next': None}
+        self.state = state
+
+    @property
+    def after(self):
+        cursors = self.state['cursors']
+        return cursors[-1] if cursors else None
+
+    @property
+    def page_number(self):
+        return len(self.state['cursors']) + 1
+
+    def fetch(self, cur, table, columns, order_by, where=(), params=(), descending=False):
+        """Fetch the current page and remember where the next one starts."""
+        rows, next_after, has_more = fetch_keyset_page(
+            cur, table, columns, order_by, where, params,
+            after=self.after, limit=self.page_size, descending=descending
+        )
+        self.state['next'] = next_after
+        return Page(rows, next_after, has_more, self.page_number)
+
+    def _next_page(self):
+        if self.state['next'] is not None:
+            self.state['cursors'].append(self.state['next'])
+
+    def _previous_page(self):
+        if self.state['cursors']:
+            self.state['cursors'].pop()
+
+    def controls(self, page):
+        """Render previous/next buttons for the page just fetched."""
+        if page.number == 1 and not page.has_more:
+            return
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀ Previous", key=f"{self.key}_prev", disabled=page.number == 1,
+                      on_click=self._previous_page)
+        with col2:
+            st.caption(f"Page {page.number}")
+        with col3:
+            st.button("Next ▶", key=f"{self.key}_next", disabled=not page.has_more,
+                      on_click=self._next_page)
@@ -1,50 +1,456 @@
+import math
 import time
 import streamlit as st
+from collections import deque
+from contextlib import contextmanager
 from functools import wraps
-import psutil
 import threading
+from utils.tracing import tracer
+
+# Log-bucketed histograms: each bucket is ~19% wider than the previous one,
+# which keeps percentile estimates within ~10% of the true value.
+HISTOGRAM_GROWTH = 2 ** 0.25
+HISTOGRAM_MIN_VALUE = 1e-4
+HISTOGRAM_MAX_BUCKETS = 128
+
+# Sliding windows are built from fixed time slices
+WINDOW_SLICE_SECONDS = 60
+WINDOW_SLICES = 60
+
+DEFAULT_WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+# Number of completed reruns kept per session for the render timing report
+SESSION_RENDER_HISTORY = 20
+
+
+class RingBuffer:
+    """Fixed-size buffer of (timestamp, value) samples."""
+
+    def __init__(self, capacity=1024):
+        self._samples = deque(maxlen=capacity)
+
+    def append(self, value, timestamp=None):
+        self._samples.append((timestamp or time.time(), value))
+
+    def values(self, window_seconds=None):
+        """Return sample values, optionally limited to the last N seconds."""
+        if window_seconds is None:
+            return [value for _, value in self._samples]
+        cutoff = time.time() - window_seconds
+        return [value for ts, value in self._samples if ts >= cutoff]
+
+    def last(self):
+        return self._samples[-1][1] if self._samples else None
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class LogHistogram:
+    """Histogram with logarithmically sized buckets."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+
+    @staticmethod
+    def bucket_index(value):
+        if value <= HISTOGRAM_MIN_VALUE:
+            return 0
+        index = int(math.ceil(math.log(value / HISTOGRAM_MIN_VALUE, HISTOGRAM_GROWTH)))
+        return min(index, HISTOGRAM_MAX_BUCKETS - 1)
+
+    @staticmethod
+    def bucket_upper_bound(index):
+        return HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** index
+
+    @staticmethod
+    def bucket_midpoint(index):
+        if index == 0:
+            return HISTOGRAM_MIN_VALUE
+        return HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** (index - 0.5)
+
+    def add(self, value):
+        index = self.bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, pct):
+        """Estimate a percentile (0-100) from the bucket counts."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.bucket_midpoint(index)
+        return self.bucket_midpoint(max(self.buckets))
+
+
+class WindowedHistogram:
+    """Ring of per-slice histograms that can be merged over a sliding window."""
+
+    def __init__(self, slice_seconds=WINDOW_SLICE_SECONDS, slices=WINDOW_SLICES):
+        self.slice_seconds = slice_seconds
+        self._slices = deque(maxlen=slices)
+
+    def add(self, value, timestamp=None):
+        slice_id = int((timestamp or time.time()) // self.slice_seconds)
+        if not self._slices or self._slices[-1][0] != slice_id:
+            self._slices.append((slice_id, LogHistogram()))
+        self._slices[-1][1].add(value)
+
+    def window(self, window_seconds):
+        """Merge all slices that overlap the last N seconds."""
+        oldest = int((time.time() - window_seconds) // self.slice_seconds)
+        merged = LogHistogram()
+        for slice_id, histogram in self._slices:
+            if slice_id >= oldest:
+                merged.merge(histogram)
+        return merged
+
+
+class MetricSeries:
+    """Samples, windowed histogram and lifetime totals for one labelled metric."""
+
+    def __init__(self, name, labels, capacity):
+        self.name = name
+        self.labels = dict(labels)
+        self.samples = RingBuffer(capacity)
+        self.histogram = WindowedHistogram()
+        self.lifetime = LogHistogram()
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        now = time.time()
+        with self.lock:
+            self.samples.append(value, now)
+            self.histogram.add(value, now)
+            self.lifetime.add(value)
+            self.max = max(self.max, value)
+
+    def summary(self, windows=None, percentiles=DEFAULT_PERCENTILES):
+        """Return count, mean, max and windowed percentiles."""
+        windows = windows or DEFAULT_WINDOWS
+        with self.lock:
+            result = {
+                'count': self.lifetime.count,
+                'avg': self.lifetime.total / self.lifetime.count if self.lifetime.count else 0,
+                'max': self.max,
+                'last': self.samples.last(),
+                'windows': {}
+            }
+            for window_name, seconds in windows.items():
+                histogram = self.histogram.window(seconds)
+                stats = {'count': histogram.count}
+                for pct in percentiles:
+                    stats[f'p{pct}'] = histogram.percentile(pct)
+                result['windows'][window_name] = stats
+        return result
+
+
+class MetricsStore:
+    """Thread-safe registry of labelled metric series."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def series(self, name, **labels):
+        key = self._key(name, labels)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    series = MetricSeries(name, key[1], self.capacity)
+                    self._series[key] = series
+        return series
+
+    def observe(self, name, value, **labels):
+        self.series(name, **labels).observe(value)
+
+    def find(self, name):
+        """Return all series recorded under a metric name."""
+        with self._lock:
+            return [series for (series_name, _), series in self._series.items() if series_name == name]
+
+    def merged(self, name, window_seconds=None):
+        """Merge every labelled series of a metric into one histogram."""
+        merged = LogHistogram()
+        for series in self.find(name):
+            with series.lock:
+                if window_seconds is None:
+                    merged.merge(series.lifetime)
+                else:
+                    merged.merge(series.histogram.window(window_seconds))
+        return merged
+
+
+class RenderSpan:
+    """Timing of one rendered block, including the DB time spent inside it."""
+
+    def __init__(self, name, page=None, parent=None):
+        self.name = name
+        self.page = page or (parent.page if parent else None) or name
+        self.parent = parent
+        self.children = []
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.db_time = 0.0
+        self.db_calls = 0
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self, depth=0):
+        """Flatten the span tree into rows for display."""
+        rows = [{
+            'span': '  ' * depth + self.name,
+            'page': self.page,
+            'duration_ms': round(self.duration * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'db_calls': self.db_calls
+        }]
+        for child in self.children:
+            rows.extend(child.to_dict(depth + 1))
+        return rows
+
 
 class PerformanceMonitor:
     def __init__(self):
-        self.metrics = {
-            'response_times': [],
-            'memory_usage': [],
-            'cpu_usage': [],
-            'active_connections': 0
-        }
+        self.store = MetricsStore()
+        self.active_connections = 0
+        self._local = threading.local()
+        self._counters = {}
+        self._counter_lock = threading.Lock()
+        self._gauges = {}
         self.start_monitoring()
-    
+
     def monitor_resources(self):
         """Monitor system resources periodically."""
+        # Imported here so psutil loads on the monitor thread, not on the first page view
+        import psutil
+        process = psutil.Process()
         while True:
-            self.metrics['memory_usage'].append(psutil.Process().memory_info().rss / 1024 / 1024)
-            self.metrics['cpu_usage'].append(psutil.Process().cpu_percent())
+            self.store.observe('memory_usage_mb', process.memory_info().rss / 1024 / 1024)
+            self.store.observe('cpu_percent', process.cpu_percent())
             time.sleep(60)  # Update every minute
-    
+
     def start_monitoring(self):
         """Start resource monitoring in background."""
         thread = threading.Thread(target=self.monitor_resources, daemon=True)
         thread.start()
-    
-    def track_response_time(self, func):
+
+    def record(self, name, value, page=None, operation=None):
+        """Record a metric sample labelled by page and operation."""
+        self.store.observe(name, value, page=page, operation=operation)
+
+    def increment(self, name, value=1, **labels):
+        """Increment a labelled counter."""
+        key = MetricsStore._key(name, labels)
+        with self._counter_lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_cache(self, cache, hit):
+        """Count a cache lookup as a hit or a miss."""
+        result = 'hit' if hit else 'miss'
+        self.increment('cache_requests', cache=cache, result=result)
+        tracer.instant(f"cache {result}", "cache", cache=cache)
+
+    def get_counters(self, name=None):
+        """Return (name, labels, value) for all counters, optionally filtered by name."""
+        with self._counter_lock:
+            return [
+                (counter_name, dict(labels), value)
+                for (counter_name, labels), value in self._counters.items()
+                if name is None or counter_name == name
+            ]
+
+    def get_cache_hit_rates(self):
+        """Return hit, miss and hit-rate figures per cache."""
+        caches = {}
+        for _, labels, value in self.get_counters('cache_requests'):
+            stats = caches.setdefault(labels['cache'], {'hit': 0, 'miss': 0})
+            stats[labels['result']] += value
+        for stats in caches.values():
+            total = stats['hit'] + stats['miss']
+            stats['hit_rate'] = stats['hit'] / total if total else 0
+        return caches
+
+    def register_gauge(self, name, callback, help_text=""):
+        """Register a callback sampled at report time.
+
+        The callback returns a number or a list of (labels, value) pairs.
+        """
+        self._gauges[name] = (callback, help_text)
+
+    def get_gauges(self):
+        """Sample all registered gauges as (name, help, [(labels, value)])."""
+        results = []
+        for name, (callback, help_text) in list(self._gauges.items()):
+            try:
+                value = callback()
+            except Exception:
+                continue
+            samples = value if isinstance(value, list) else [({}, value)]
+            results.append((name, help_text, samples))
+        return results
+
+    def track_response_time(self, func=None, *, page=None, operation=None):
         """Decorator to track function response times."""
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            end_time = time.time()
-            self.metrics['response_times'].append(end_time - start_time)
-            return result
-        return wrapper
-    
+        def decorator(func):
+            op = operation or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record('response_time', time.perf_counter() - start_time, page=page, operation=op)
+            return wrapper
+
+        if func is not None:
+            return decorator(func)
+        return decorator
+
+    def _span_stack(self):
+        stack = getattr(self._local, 'spans', None)
+        if stack is None:
+            stack = self._local.spans = []
+        return stack
+
+    def current_span(self):
+        """Return the innermost open render span on this thread."""
+        stack = self._span_stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, page=None):
+        """Time a block of rendering code; spans nest per script thread."""
+        stack = self._span_stack()
+        parent = stack[-1] if stack else None
+        span = RenderSpan(name, page=page, parent=parent)
+        if parent:
+            parent.children.append(span)
+        stack.append(span)
+        trace_name = name if parent is None or name == span.page else f"{span.page}:{name}"
+        try:
+            with tracer.span(trace_name, "render", page=span.page):
+                yield span
+        finally:
+            span.finish()
+            stack.pop()
+            self.record('render_time', span.duration, page=span.page, operation=name)
+            self.record('render_db_time', span.db_time, page=span.page, operation=name)
+            if parent is None:
+                self._store_session_timing(span)
+
+    def track_render(self, name=None, page=None):
+        """Decorator that wraps a render function in a timing span."""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, page=page):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record_db_time(self, elapsed):
+        """Attribute DB time to every span open on this thread."""
+        for span in self._span_stack():
+            span.db_time += elapsed
+            span.db_calls += 1
+        self.record('db_time', elapsed)
+
+    def _store_session_timing(self, root):
+        """Keep the last few rerun span trees in the user's session."""
+        try:
+            if 'render_timings' not in st.session_state:
+                st.session_state.render_timings = deque(maxlen=SESSION_RENDER_HISTORY)
+            st.session_state.render_timings.append({
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'name': root.name,
+                'duration_ms': round(root.duration * 1000, 2),
+                'db_ms': round(root.db_time * 1000, 2),
+                'spans': root.to_dict()
+            })
+        except Exception:
+            # No session outside a Streamlit script run
+            pass
+
+    def get_session_render_timings(self):
+        """Get render span trees recorded for the current session."""
+        try:
+            return list(st.session_state.get('render_timings', []))
+        except Exception:
+            return []
+
+    def get_render_report(self, window='5m'):
+        """Aggregate render timings per page and span across all sessions."""
+        db_times = {
+            (s.labels.get('page'), s.labels.get('operation')): s.summary()
+            for s in self.store.find('render_db_time')
+        }
+        rows = []
+        for series in self.store.find('render_time'):
+            summary = series.summary()
+            stats = summary['windows'][window]
+            db = db_times.get((series.labels.get('page'), series.labels.get('operation')), {})
+            rows.append({
+                'page': series.labels.get('page'),
+                'span': series.labels.get('operation'),
+                'count': summary['count'],
+                'avg_ms': round(summary['avg'] * 1000, 2),
+                'p50_ms': round(stats['p50'] * 1000, 2),
+                'p95_ms': round(stats['p95'] * 1000, 2),
+                'max_ms': round(summary['max'] * 1000, 2),
+                'avg_db_ms': round(db.get('avg', 0) * 1000, 2)
+            })
+        return sorted(rows, key=lambda row: row['avg_ms'], reverse=True)
+
+    def get_metric_summaries(self, name, windows=None):
+        """Get per-label summaries for a metric."""
+        return [
+            {'labels': series.labels, **series.summary(windows)}
+            for series in self.store.find(name)
+        ]
+
     def get_performance_report(self):
         """Generate performance report."""
+        response_times = self.store.merged('response_time')
+        recent = self.store.merged('response_time', DEFAULT_WINDOWS['5m'])
+        memory = self.store.merged('memory_usage_mb')
+        response_series = self.store.find('response_time')
         return {
-            'avg_response_time': sum(self.metrics['response_times']) / len(self.metrics['response_times']) if self.metrics['response_times'] else 0,
-            'max_response_time': max(self.metrics['response_times']) if self.metrics['response_times'] else 0,
-            'avg_memory_usage': sum(self.metrics['memory_usage']) / len(self.metrics['memory_usage']) if self.metrics['memory_usage'] else 0,
-            'peak_memory_usage': max(self.metrics['memory_usage']) if self.metrics['memory_usage'] else 0,
-            'active_connections': self.metrics['active_connections']
+            'avg_response_time': response_times.total / response_times.count if response_times.count else 0,
+            'max_response_time': max((s.max for s in response_series), default=0),
+            'p50_response_time': recent.percentile(50),
+            'p95_response_time': recent.percentile(95),
+            'p99_response_time': recent.percentile(99),
+            'avg_memory_usage': memory.total / memory.count if memory.count else 0,
+            'peak_memory_usage': max((s.max for s in self.store.find('memory_usage_mb')), default=0),
+            'active_connections': self.active_connections,
+            'by_label': self.get_metric_summaries('response_time')
         }
 
-performance_monitor = PerformanceMonitor() 
\ No newline at end of file
+performance_monitor = PerformanceMonitor()
@@ -0,0 +1,109 @@
+from psycopg2.extras import RealDictCursor
+from utils.database import get_db_connection
+
+LEADERBOARD_SIZE = 10
+DEFAULT_CHORE_POINTS = 10
+
+# Every points change is a ledger row; rows are never updated or deleted.
+# points_balance holds the running total per person and is only written by
+# the ledger trigger, one update per person per statement, so standings are
+# read without summing the ledger.
+POINTS_SCHEMA_SQL = f"""
+    ALTER TABLE chores ADD COLUMN IF NOT EXISTS points INTEGER DEFAULT {DEFAULT_CHORE_POINTS};
+
+    CREATE TABLE IF NOT EXISTS rewards (
+        reward_id SERIAL PRIMARY KEY,
+        reward_name VARCHAR(255) NOT NULL,
+        points_required INTEGER NOT NULL,
+        description TEXT,
+        claimed_by_id INTEGER REFERENCES family_members(member_id),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS points_balance (
+        member_id INTEGER PRIMARY KEY REFERENCES family_members(member_id),
+        points INTEGER NOT NULL DEFAULT 0 CONSTRAINT points_balance_not_negative CHECK (points >= 0),
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS points_ledger (
+        entry_id BIGSERIAL PRIMARY KEY,
+        member_id INTEGER NOT NULL REFERENCES family_members(member_id),
+        points INTEGER NOT NULL,
+        reason VARCHAR(20) NOT NULL CHECK (reason IN ('chore', 'reward', 'adjustment')),
+        chore_id INTEGER,
+        reward_id INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    -- A chore pays out once, even if it is reopened and completed again
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_points_ledger_chore ON points_ledger(chore_id) WHERE reason = 'chore';
+    CREATE INDEX IF NOT EXISTS idx_points_ledger_user ON points_ledger(member_id, entry_id);
+
+    CREATE OR REPLACE FUNCTION points_ledger_append_only() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        RAISE EXCEPTION 'points_ledger is append-only; add an adjustment entry instead';
+    END $$;
+
+    -- Rows are created at zero and then updated, rather than upserted with
+    -- the delta, so a CHECK on the balance sees the new total, not the delta
+    CREATE OR REPLACE FUNCTION points_ledger_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO points_balance (member_id, points)
+        SELECT DISTINCT member_id, 0 FROM new_entries
+        ON CONFLICT (member_id) DO NOTHING;
+
+        UPDATE points_balance b
+        SET points = b.points + d.points, last_updated = now()
+        FROM (SELECT member_id, SUM(points) AS points FROM new_entries GROUP BY member_id) d
+        WHERE b.member_id = d.member_id;
+        RETURN NULL;
+    END $$;
+
+    DROP TRIGGER IF EXISTS points_ledger_append_only ON points_ledger;
+    CREATE TRIGGER points_ledger_append_only
+        BEFORE UPDATE OR DELETE ON points_ledger
+        FOR EACH STATEMENT EXECUTE PROCEDURE points_ledger_append_only();
+
+    DROP TRIGGER IF EXISTS points_ledger_apply ON points_ledger;
+    CREATE TRIGGER points_ledger_apply
+        AFTER INSERT ON points_ledger REFERENCING NEW TABLE AS new_entries
+        FOR EACH STATEMENT EXECUTE PROCEDURE points_ledger_apply();
+
+    -- Chores completed before the ledger existed are credited once
+    INSERT INTO points_ledger (member_id, points, reason, chore_id, created_at)
+    SELECT member_id, COALESCE(points, {DEFAULT_CHORE_POINTS}), 'chore', id, created_at
+    FROM chores
+    WHERE completed AND member_id IS NOT NULL AND COALESCE(points, {DEFAULT_CHORE_POINTS}) > 0
+    ORDER BY id
+    ON CONFLICT (chore_id) WHERE reason = 'chore' DO NOTHING;
+"""
+
+
+def add_ledger_entry(cur, member_id, points, reason, chore_id=None, reward_id=None):
+    """Append a ledger row on an open cursor; the balance follows in the same transaction."""
+    cur.execute("""
+        INSERT INTO points_ledger (member_id, points, reason, chore_id, reward_id)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING entry_id
+    """, (member_id, points, reason, chore_id, reward_id))
+    return cur.fetchone()[0]
+
+
+def get_leaderboard(limit=LEADERBOARD_SIZE):
+    """Return [{'rank', 'member_id', 'name', 'points'}] for active members, highest first."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT rank() OVER (ORDER BY b.points DESC) AS rank, b.member_id, m.name, b.points
+                FROM points_balance b
+                JOIN family_members m ON m.member_id = b.member_id
+                WHERE m.active
+                ORDER BY b.points DESC, m.name
+                LIMIT %s
+            """, (limit,))
+            return [dict(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
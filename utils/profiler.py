@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from utils.logger import log_info, log_error
+
+# Streamlit runs every script rerun on a thread with this name prefix
+SCRIPT_THREAD_PREFIX = "ScriptRunner"
+
+MAX_PROFILE_SECONDS = 120
+DEFAULT_INTERVAL = 0.01  # 100 Hz
+MAX_STACK_DEPTH = 64
+# Fraction of wall time the sampler may spend walking stacks; the sampling
+# interval is stretched whenever a sample costs more than this budget allows.
+MAX_OVERHEAD = 0.02
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(frame):
+    """Return a flamegraph-safe 'file:function' label for a frame."""
+    filename = frame.f_code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.f_code.co_name}".replace(";", ":").replace(" ", "_")
+
+
+class SamplingProfiler:
+    """Samples the stacks of all Streamlit script threads, one profile at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = False
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.finished_at = None
+        self.duration = 0
+        self.sampling_time = 0.0
+        self.effective_interval = DEFAULT_INTERVAL
+
+    def start(self, seconds, interval=DEFAULT_INTERVAL):
+        """Start a background profile; returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.running = True
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.duration = max(1, min(int(seconds), MAX_PROFILE_SECONDS))
+        self.effective_interval = interval
+        self.started_at = datetime.now()
+        self.finished_at = None
+        thread = threading.Thread(
+            target=self._run, args=(self.duration, interval), name="sampling-profiler", daemon=True
+        )
+        thread.start()
+        log_info(f"Sampling profiler started for {self.duration}s")
+        return True
+
+    def _sample(self, own_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or not names.get(ident, "").startswith(SCRIPT_THREAD_PREFIX):
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def _run(self, seconds, interval):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                self._sample(own_ident)
+                cost = time.perf_counter() - start
+                self.sampling_time += cost
+                # Enforce the overhead cap by sleeping at least cost * (1 - cap) / cap
+                self.effective_interval = max(interval, cost * (1 - MAX_OVERHEAD) / MAX_OVERHEAD)
+                time.sleep(self.effective_interval)
+        except Exception as e:
+            log_error(f"Sampling profiler failed: {str(e)}", show_notification=False)
+        finally:
+            self.finished_at = datetime.now()
+            with self._lock:
+                self.running = False
+            log_info(f"Sampling profiler finished with {self.samples} samples")
+
+    def status(self):
+        """Return the state of the current or last profile."""
+        elapsed = 0
+        if self.started_at:
+            end = self.finished_at or datetime.now()
+            elapsed = (end - self.started_at).total_seconds()
+        return {
+            'running': self.running,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration': self.duration,
+            'elapsed': elapsed,
+            'samples': self.samples,
+            'overhead': self.sampling_time / elapsed if elapsed else 0,
+            'interval_ms': round(self.effective_interval * 1000, 2)
+        }
+
+    def collapsed_stacks(self):
+        """Return stacks in collapsed format for flamegraph.pl or speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit=20):
+        """Return functions with the most self samples."""
+        leaf_counts = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaf_counts.values()) or 1
+        return [
+            {'function': name, 'samples': count, 'percent': round(count * 100 / total, 1)}
+            for name, count in leaf_counts.most_common(limit)
+        ]
+
+
+profiler = SamplingProfiler()
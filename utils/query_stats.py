@@ -0,0 +1,160 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from utils.performance import LogHistogram, performance_monitor
+
+# The same statement fingerprint executed this many times within one rerun
+# is reported as a likely N+1 query pattern.
+N_PLUS_ONE_THRESHOLD = 3
+MAX_DETECTIONS = 50
+MAX_CALLERS_PER_QUERY = 10
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_CALLER_FILES = (
+    os.path.join('utils', 'database.py'),
+    os.path.join('utils', 'query_stats.py'),
+    os.path.join('utils', 'performance.py'),
+)
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Normalize a SQL statement so that calls differing only in literals group together."""
+    normalized = _COMMENT_RE.sub(' ', sql)
+    normalized = _STRING_RE.sub('?', normalized)
+    normalized = _PLACEHOLDER_RE.sub('?', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('(?+)', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip().rstrip(';').lower()
+
+
+def find_caller():
+    """Return 'path:function' of the first application frame outside the DB layer."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and not filename.endswith(_SKIP_CALLER_FILES):
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryStats:
+    """Aggregated timings for one statement fingerprint."""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.max_calls_per_rerun = 0
+        self.histogram = LogHistogram()
+        self.callers = Counter()
+
+    def to_dict(self):
+        top_caller = self.callers.most_common(1)
+        return {
+            'query': self.fingerprint,
+            'calls': self.calls,
+            'total_ms': round(self.total_time * 1000, 2),
+            'avg_ms': round(self.total_time / self.calls * 1000, 2) if self.calls else 0,
+            'p50_ms': round(self.histogram.percentile(50) * 1000, 2),
+            'p95_ms': round(self.histogram.percentile(95) * 1000, 2),
+            'max_ms': round(self.max_time * 1000, 2),
+            'rows': self.rows,
+            'max_per_rerun': self.max_calls_per_rerun,
+            'top_caller': top_caller[0][0] if top_caller else None
+        }
+
+
+class QueryStatsRegistry:
+    """Process-wide statement statistics with per-rerun N+1 detection."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.detections = deque(maxlen=MAX_DETECTIONS)
+
+    def _rerun_counts(self):
+        """Return fingerprint counts for the rerun running on this thread."""
+        span = performance_monitor.current_span()
+        if span is None:
+            return None
+        while span.parent is not None:
+            span = span.parent
+        if getattr(self._local, 'root', None) is not span:
+            self._local.root = span
+            self._local.counts = {}
+            self._local.detections = {}
+        return self._local.counts
+
+    def record(self, sql, elapsed, rows=0, calls=1):
+        """Record one executed statement."""
+        fp = fingerprint(sql)
+        caller = find_caller()
+        counts = self._rerun_counts()
+        span = performance_monitor.current_span()
+
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                stats = self._stats[fp] = QueryStats(fp)
+            stats.calls += calls
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.rows += max(rows, 0)
+            stats.histogram.add(elapsed)
+            if caller in stats.callers or len(stats.callers) < MAX_CALLERS_PER_QUERY:
+                stats.callers[caller] += 1
+
+            if counts is not None:
+                counts[fp] = counts.get(fp, 0) + calls
+                stats.max_calls_per_rerun = max(stats.max_calls_per_rerun, counts[fp])
+                self._check_n_plus_one(fp, counts[fp], caller, span)
+
+    def _check_n_plus_one(self, fp, count, caller, span):
+        detection = self._local.detections.get(fp)
+        if detection is not None:
+            detection['calls_in_rerun'] = count
+        elif count >= N_PLUS_ONE_THRESHOLD:
+            detection = {
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'query': fp,
+                'calls_in_rerun': count,
+                'caller': caller,
+                'page': span.page if span else None
+            }
+            self._local.detections[fp] = detection
+            self.detections.append(detection)
+
+    def top_queries(self, limit=20, sort_by='total_ms'):
+        """Return the most expensive statements."""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._stats.values()]
+        return sorted(rows, key=lambda row: row[sort_by], reverse=True)[:limit]
+
+    def get_detections(self):
+        """Return recent N+1 detections, newest first."""
+        with self._lock:
+            return list(reversed(self.detections))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.detections.clear()
+
+
+query_stats = QueryStatsRegistry()
@@ -0,0 +1,351 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import get_db_connection
+from utils.logger import log_error, log_info
+from utils.reference_data import invalidate_recipes
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))
+JSON_CHUNK_SIZE = 64 * 1024
+# A JSON array element still unparsed at this size is broken, not cut off at
+# the end of a chunk
+MAX_JSON_RECIPE_SIZE = 1024 * 1024
+MAX_NAME_LENGTH = 200
+
+# CSV files have one row per ingredient; consecutive rows with the same
+# recipe name form one recipe and its fields are taken from the first row
+CSV_COLUMNS = ('name', 'description', 'servings', 'prep_time', 'instructions',
+               'ingredient_name', 'quantity', 'unit')
+
+RowError = namedtuple('RowError', ['row', 'name', 'message'])
+ImportResult = namedtuple('ImportResult', ['inserted', 'updated', 'ingredients', 'errors', 'seconds'])
+
+STAGING_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS import_recipes (
+        seq INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT,
+        servings INTEGER,
+        prep_time INTEGER,
+        instructions TEXT,
+        recipe_id INTEGER
+    ) ON COMMIT DELETE ROWS;
+    CREATE TEMP TABLE IF NOT EXISTS import_ingredients (
+        seq INTEGER NOT NULL,
+        ingredient_name TEXT NOT NULL,
+        quantity NUMERIC NOT NULL,
+        unit TEXT NOT NULL
+    ) ON COMMIT DELETE ROWS;
+"""
+
+# Recipes are matched by case-insensitive name (idx_recipes_name_key). The last copy of a name in
+# the batch wins, existing recipes are updated and get their ingredient list
+# replaced, new ones take ids from the recipes sequence up front so the
+# ingredient insert can join on the staging table.
+MERGE_STEPS = (
+    """
+    DELETE FROM import_recipes i
+    USING import_recipes later
+    WHERE lower(trim(later.name)) = lower(trim(i.name)) AND later.seq > i.seq
+    """,
+    """
+    UPDATE import_recipes i SET recipe_id = (
+        SELECT MIN(r.recipe_id) FROM recipes r WHERE lower(trim(r.name)) = lower(trim(i.name))
+    )
+    """,
+    """
+    UPDATE recipes r
+    SET description = i.description, servings = i.servings,
+        prep_time = i.prep_time, instructions = i.instructions
+    FROM import_recipes i
+    WHERE r.recipe_id = i.recipe_id
+    """,
+    """
+    DELETE FROM recipe_ingredients ri
+    USING import_recipes i
+    WHERE ri.recipe_id = i.recipe_id
+    """,
+)
+
+ASSIGN_IDS_SQL = """
+    UPDATE import_recipes
+    SET recipe_id = nextval(pg_get_serial_sequence('recipes', 'recipe_id'))
+    WHERE recipe_id IS NULL
+    RETURNING seq
+"""
+
+INSERT_RECIPES_SQL = """
+    INSERT INTO recipes (recipe_id, name, description, servings, prep_time, instructions)
+    SELECT recipe_id, name, description, servings, prep_time, instructions
+    FROM import_recipes
+    WHERE seq = ANY(%s)
+"""
+
+INSERT_INGREDIENTS_SQL = """
+    INSERT INTO recipe_ingredients (recipe_id, ingredient_name, quantity, unit)
+    SELECT i.recipe_id, trim(ii.ingredient_name), ii.quantity, trim(ii.unit)
+    FROM import_ingredients ii
+    JOIN import_recipes i ON i.seq = ii.seq
+"""
+
+
+def iter_csv_recipes(stream):
+    """Yield (row, recipe) from a CSV stream, one recipe per run of rows with the same name."""
+    reader = csv.DictReader(stream)
+    missing = {'name', 'ingredient_name'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+    recipe, start_row = None, None
+    for row in reader:
+        name = (row.get('name') or '').strip()
+        if recipe is None or name.lower() != recipe['name'].strip().lower():
+            if recipe is not None:
+                yield start_row, recipe
+            recipe = {column: row.get(column) for column in CSV_COLUMNS[:5]}
+            recipe['ingredients'] = []
+            # Header is line 1
+            start_row = reader.line_num
+        if row.get('ingredient_name'):
+            recipe['ingredients'].append({
+                'name': row['ingredient_name'],
+                'quantity': row.get('quantity'),
+                'unit': row.get('unit')
+            })
+    if recipe is not None:
+        yield start_row, recipe
+
+
+def iter_json_recipes(stream, chunk_size=JSON_CHUNK_SIZE):
+    """Yield (index, recipe) from a JSON array or JSON Lines stream without loading it whole.
+
+    A JSON Lines line that does not parse is yielded as a RowError for its
+    line number and the following lines are still read; a broken array
+    raises ValueError, since nothing after the error can be located.
+    """
+    decoder = json.JSONDecoder()
+    head = stream.read(chunk_size).lstrip()
+    if not head.startswith('['):
+        # JSON Lines: one recipe object per line
+        for index, line in enumerate(_lines(head, stream), 1):
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line.strip())
+            except json.JSONDecodeError as e:
+                yield index, RowError(index, None, f"invalid JSON: {e.msg} at column {e.colno}")
+        return
+
+    buffer, position, index = head, 1, 0
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position == len(buffer):
+                raise json.JSONDecodeError("Unexpected end of JSON array", buffer, position)
+            recipe, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # The next element straddles the end of the buffer; only the
+            # unread tail is carried over, so memory stays at about a chunk.
+            # A broken element would otherwise pull in the rest of the file.
+            if len(buffer) - position > MAX_JSON_RECIPE_SIZE:
+                raise ValueError(f"recipe {index + 1} is not valid JSON: {e.msg}") from None
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        index += 1
+        yield index, recipe
+
+
+def _lines(head, stream):
+    """Yield the lines of head followed by the rest of stream."""
+    pending = ''
+    for line in io.StringIO(head):
+        if line.endswith('\n'):
+            yield line
+        else:
+            pending = line
+    for line in stream:
+        yield pending + line
+        pending = ''
+    if pending:
+        yield pending
+
+
+def _positive_int(value, field, errors, default=None):
+    if value in (None, ''):
+        return default
+    try:
+        number = int(Decimal(str(value).strip()))
+    except (InvalidOperation, ValueError):
+        errors.append(f"{field} must be a whole number")
+        return None
+    if number <= 0:
+        errors.append(f"{field} must be positive")
+        return None
+    return number
+
+
+def validate_recipe(recipe):
+    """Return (clean recipe, errors) for a parsed recipe."""
+    errors = []
+    if not isinstance(recipe, dict):
+        return None, ["recipe must be an object"]
+    name = str(recipe.get('name') or '').strip()
+    if not name:
+        errors.append("name is required")
+    elif len(name) > MAX_NAME_LENGTH:
+        errors.append(f"name is longer than {MAX_NAME_LENGTH} characters")
+
+    clean = {
+        'name': name,
+        'description': recipe.get('description') or None,
+        'servings': _positive_int(recipe.get('servings'), 'servings', errors, default=4),
+        'prep_time': _positive_int(recipe.get('prep_time'), 'prep_time', errors, default=30),
+        'instructions': recipe.get('instructions') or None,
+        'ingredients': []
+    }
+
+    ingredients = recipe.get('ingredients') or []
+    if not ingredients:
+        errors.append("at least one ingredient is required")
+    for number, ingredient in enumerate(ingredients, 1):
+        if not isinstance(ingredient, dict):
+            errors.append(f"ingredient {number}: must be an object")
+            continue
+        ingredient_name = str(ingredient.get('name') or '').strip()
+        unit = str(ingredient.get('unit') or '').strip()
+        try:
+            quantity = Decimal(str(ingredient.get('quantity')).strip())
+        except (InvalidOperation, ValueError):
+            quantity = None
+        if not ingredient_name:
+            errors.append(f"ingredient {number}: name is required")
+        if quantity is None or not quantity.is_finite() or quantity <= 0:
+            errors.append(f"ingredient {number}: quantity must be a positive number")
+        if not unit:
+            errors.append(f"ingredient {number}: unit is required")
+        clean['ingredients'].append((ingredient_name, quantity, unit))
+    return clean, errors
+
+
+def _copy_rows(cur, table, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def load_batch(conn, batch):
+    """COPY a batch of (seq, recipe) into staging and merge it; returns (inserted, updated, ingredients)."""
+    with conn.cursor() as cur:
+        cur.execute(STAGING_SQL)
+        _copy_rows(cur, 'import_recipes', (
+            (seq, r['name'], r['description'], r['servings'], r['prep_time'], r['instructions'], None)
+            for seq, r in batch
+        ))
+        _copy_rows(cur, 'import_ingredients', (
+            (seq, name, quantity, unit)
+            for seq, r in batch for name, quantity, unit in r['ingredients']
+        ))
+        for step in MERGE_STEPS:
+            cur.execute(step)
+        cur.execute("SELECT COUNT(*) FROM import_recipes")
+        staged = cur.fetchone()[0]
+        cur.execute(ASSIGN_IDS_SQL)
+        new_seqs = [row[0] for row in cur.fetchall()]
+        cur.execute(INSERT_RECIPES_SQL, (new_seqs,))
+        cur.execute(INSERT_INGREDIENTS_SQL)
+        ingredients = cur.rowcount
+    conn.commit()
+    return len(new_seqs), staged - len(new_seqs), ingredients
+
+
+def import_recipes(records, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Validate and load (row, recipe) records in batches.
+
+    Invalid recipes are skipped and reported with their row; a batch the
+    database rejects is rolled back and reported for each of its recipes.
+    """
+    started = time.perf_counter()
+    inserted = updated = ingredients = 0
+    errors = []
+    batch, rows = [], {}
+
+    conn = get_db_connection()
+    if not conn:
+        return ImportResult(0, 0, 0, [RowError(None, None, "Database connection failed")], 0.0)
+
+    def flush():
+        nonlocal inserted, updated, ingredients
+        try:
+            batch_inserted, batch_updated, batch_ingredients = load_batch(conn, batch)
+            inserted += batch_inserted
+            updated += batch_updated
+            ingredients += batch_ingredients
+        except Exception as e:
+            conn.rollback()
+            log_error(f"Recipe import batch failed: {str(e)}", show_notification=False)
+            errors.extend(RowError(rows[seq], r['name'], f"batch rejected: {str(e).strip()}") for seq, r in batch)
+        if progress:
+            progress(inserted + updated, len(errors))
+        batch.clear()
+        rows.clear()
+
+    try:
+        for seq, (row, recipe) in enumerate(records, 1):
+            if isinstance(recipe, RowError):
+                errors.append(recipe)
+                continue
+            clean, problems = validate_recipe(recipe)
+            if problems:
+                name = recipe.get('name') if isinstance(recipe, dict) else None
+                errors.extend(RowError(row, name, problem) for problem in problems)
+                continue
+            batch.append((seq, clean))
+            rows[seq] = row
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except (ValueError, csv.Error) as e:
+        # Unreadable input stops the import; batches already loaded stay
+        errors.append(RowError(None, None, f"could not parse input: {str(e)}"))
+    finally:
+        conn.close()
+
+    if inserted or updated:
+        invalidate_recipes()
+    seconds = time.perf_counter() - started
+    log_info(f"Imported {inserted} new and {updated} updated recipes in {seconds:.2f}s, {len(errors)} errors")
+    return ImportResult(inserted, updated, ingredients, errors, seconds)
+
+
+def import_recipe_file(stream, filename, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Import a CSV, JSON or JSON Lines text stream, picking the parser by extension."""
+    if filename.lower().endswith('.csv'):
+        records = iter_csv_recipes(stream)
+    else:
+        records = iter_json_recipes(stream)
+    return import_recipes(records, batch_size, progress)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            result = import_recipe_file(f, path)
+        print(f"{path}: {result.inserted} inserted, {result.updated} updated, "
+              f"{result.ingredients} ingredients, {len(result.errors)} errors in {result.seconds:.2f}s")
+        for error in result.errors[:20]:
+            print(f"  row {error.row} ({error.name}): {error.message}")
@@ -0,0 +1,224 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from psycopg2.extras import RealDictCursor
+from utils.cache import shared_cache
+from utils.database import get_db_connection
+from utils.logger import log_error
+from utils.performance import performance_monitor
+
+SEARCH_LIMIT = 20
+RECENT_QUERIES = 128
+# Results from other processes' edits show up after at most this long
+SEARCH_TTL = 60
+
+# Weighted document per recipe: name, ingredient names, description,
+# instructions. Kept in recipes.search_vector by triggers; the ingredient
+# triggers are statement-level, so a bulk insert refreshes each recipe once.
+SEARCH_SCHEMA_SQL = """
+    ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+    CREATE OR REPLACE FUNCTION recipe_search_document(
+        p_recipe_id INTEGER, p_name TEXT, p_description TEXT, p_instructions TEXT
+    ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce(p_name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce((
+                   SELECT string_agg(ingredient_name, ' ')
+                   FROM recipe_ingredients WHERE recipe_id = p_recipe_id
+               ), '')), 'B')
+            || setweight(to_tsvector('english', coalesce(p_description, '')), 'C')
+            || setweight(to_tsvector('english', coalesce(p_instructions, '')), 'D')
+    $$;
+
+    CREATE OR REPLACE FUNCTION recipes_search_vector_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := recipe_search_document(NEW.recipe_id, NEW.name, NEW.description, NEW.instructions);
+        RETURN NEW;
+    END $$;
+
+    CREATE OR REPLACE FUNCTION recipe_ingredients_search_refresh() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE recipes r
+            SET search_vector = recipe_search_document(r.recipe_id, r.name, r.description, r.instructions)
+            WHERE r.recipe_id IN (SELECT recipe_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE recipes r
+            SET search_vector = recipe_search_document(r.recipe_id, r.name, r.description, r.instructions)
+            WHERE r.recipe_id IN (SELECT recipe_id FROM old_rows);
+        ELSE
+            UPDATE recipes r
+            SET search_vector = recipe_search_document(r.recipe_id, r.name, r.description, r.instructions)
+            WHERE r.recipe_id IN (SELECT recipe_id FROM old_rows UNION SELECT recipe_id FROM new_rows);
+        END IF;
+        RETURN NULL;
+    END $$;
+
+    DROP TRIGGER IF EXISTS recipes_search_vector ON recipes;
+    CREATE TRIGGER recipes_search_vector
+        BEFORE INSERT OR UPDATE OF name, description, instructions ON recipes
+        FOR EACH ROW EXECUTE PROCEDURE recipes_search_vector_update();
+
+    DROP TRIGGER IF EXISTS recipe_ingredients_search_insert ON recipe_ingredients;
+    CREATE TRIGGER recipe_ingredients_search_insert
+        AFTER INSERT ON recipe_ingredients REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE PROCEDURE recipe_ingredients_search_refresh();
+    DROP TRIGGER IF EXISTS recipe_ingredients_search_update ON recipe_ingredients;
+    CREATE TRIGGER recipe_ingredients_search_update
+        AFTER UPDATE ON recipe_ingredients REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE PROCEDURE recipe_ingredients_search_refresh();
+    DROP TRIGGER IF EXISTS recipe_ingredients_search_delete ON recipe_ingredients;
+    CREATE TRIGGER recipe_ingredients_search_delete
+        AFTER DELETE ON recipe_ingredients REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE PROCEDURE recipe_ingredients_search_refresh();
+
+    UPDATE recipes
+    SET search_vector = recipe_search_document(recipe_id, name, description, instructions)
+    WHERE search_vector IS NULL;
+
+    CREATE INDEX IF NOT EXISTS idx_recipes_search ON recipes USING GIN (search_vector);
+
+    -- Typo-tolerant name matching when pg_trgm can be installed
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'pg_trgm is not available, recipe search uses prefix matching only';
+    END $$;
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+            CREATE INDEX IF NOT EXISTS idx_recipes_name_trgm ON recipes USING GIN (lower(name) gin_trgm_ops);
+        END IF;
+    END $$;
+"""
+
+# Prefix matches on every typed word, plus word similarity on the name so
+# "spagetti" still finds "Spaghetti Bolognese"
+TRIGRAM_SEARCH_SQL = """
+    SELECT recipe_id, name,
+           ts_rank(search_vector, q) * 2 + word_similarity(%(text)s, lower(name)) AS rank
+    FROM recipes, to_tsquery('english', %(tsquery)s) AS q
+    WHERE search_vector @@ q OR %(text)s <%% lower(name)
+    ORDER BY rank DESC, name
+    LIMIT %(limit)s
+"""
+
+PREFIX_SEARCH_SQL = """
+    SELECT recipe_id, name,
+           ts_rank(search_vector, q) * 2 + (lower(name) LIKE %(prefix)s)::int AS rank
+    FROM recipes, to_tsquery('english', %(tsquery)s) AS q
+    WHERE search_vector @@ q OR lower(name) LIKE %(contains)s
+    ORDER BY rank DESC, name
+    LIMIT %(limit)s
+"""
+
+BROWSE_SQL = """
+    SELECT recipe_id, name, 0 AS rank FROM recipes ORDER BY name, recipe_id LIMIT %(limit)s
+"""
+
+
+def normalize_query(text):
+    """Return the lowercased words of a query, joined by single spaces."""
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+
+def to_prefix_tsquery(query):
+    """Turn normalized words into a tsquery where each word may be a prefix."""
+    return " & ".join(f"{word}:*" for word in query.split())
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _load_trigram_support():
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def has_trigram_support():
+    return bool(shared_cache.get_or_load('pg_trgm', _load_trigram_support))
+
+
+class RecipeSearch:
+    """Ranked recipe search with a small LRU of recent queries."""
+
+    def __init__(self, max_queries=RECENT_QUERIES, ttl=SEARCH_TTL):
+        self.max_queries = max_queries
+        self.ttl = ttl
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            self._recent.move_to_end(key)
+            return entry[0]
+
+    def _remember(self, key, results):
+        with self._lock:
+            self._recent[key] = (results, time.monotonic() + self.ttl)
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_queries:
+                self._recent.popitem(last=False)
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Return up to limit [{'recipe_id', 'name', 'rank'}], best match first.
+
+        An empty query lists recipes by name.
+        """
+        query = normalize_query(text)
+        key = (query, limit)
+        results = self._cached(key)
+        performance_monitor.record_cache('recipe_search', results is not None)
+        if results is not None:
+            return results
+
+        if not query:
+            sql, params = BROWSE_SQL, {'limit': limit}
+        elif has_trigram_support():
+            sql, params = TRIGRAM_SEARCH_SQL, {'text': query, 'tsquery': to_prefix_tsquery(query), 'limit': limit}
+        else:
+            sql, params = PREFIX_SEARCH_SQL, {
+                'tsquery': to_prefix_tsquery(query),
+                'prefix': _like_escape(query) + '%',
+                'contains': '%' + _like_escape(query) + '%',
+                'limit': limit
+            }
+
+        conn = get_db_connection()
+        if not conn:
+            return []
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(sql, params)
+                results = [dict(row) for row in cur.fetchall()]
+        except Exception as e:
+            log_error(f"Error searching recipes: {str(e)}", show_notification=False)
+            return []
+        finally:
+            conn.close()
+        self._remember(key, results)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+
+recipe_search = RecipeSearch()
+
+
+def search_recipes(text, limit=SEARCH_LIMIT):
+    return recipe_search.search(text, limit)
@@ -0,0 +1,26 @@
+from utils.cache import shared_cache
+from utils.family import MemberDirectory, load_member_directory
+from utils.recipe_search import recipe_search, search_recipes
+
+
+def get_family_members():
+    """Return the directory of members chores and notifications can be assigned to."""
+    return shared_cache.get_or_load('family_members', load_member_directory) or MemberDirectory([])
+
+
+def invalidate_family_members():
+    """Reload the member directory on next use after members change."""
+    shared_cache.invalidate('family_members')
+
+
+def invalidate_recipes():
+    """Forget cached recipe search results after recipes change."""
+    recipe_search.clear()
+
+
+def prefetch_reference_data():
+    """Load all reference data into the shared cache."""
+    return {
+        'family_members': len(get_family_members()),
+        'recipe_search': len(search_recipes('')),
+    }
@@ -0,0 +1,126 @@
+import os
+from collections import namedtuple
+from psycopg2 import errors
+from psycopg2.extras import RealDictCursor
+from utils.database import get_db_connection
+from utils.points import add_ledger_entry
+
+# A claim waits at most this long for a row another claim holds, instead
+# of piling up behind it
+CLAIM_LOCK_TIMEOUT = os.environ.get('CLAIM_LOCK_TIMEOUT', '2s')
+
+CLAIMED = 'claimed'
+ALREADY_CLAIMED = 'already_claimed'
+INSUFFICIENT_POINTS = 'insufficient_points'
+NOT_FOUND = 'not_found'
+BUSY = 'busy'
+
+ClaimResult = namedtuple('ClaimResult', ['status', 'balance'])
+
+REWARDS_SCHEMA_SQL = """
+    ALTER TABLE rewards ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP;
+    CREATE INDEX IF NOT EXISTS idx_rewards_available ON rewards(points_required, reward_id)
+        WHERE claimed_by_id IS NULL;
+
+    -- Last line of defence against double spending; NOT VALID so old
+    -- negative balances do not block the migration
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'points_balance_not_negative') THEN
+            ALTER TABLE points_balance
+                ADD CONSTRAINT points_balance_not_negative CHECK (points >= 0) NOT VALID;
+        END IF;
+    END $$;
+"""
+
+
+def claim_reward(reward_id, member_id):
+    """Claim a reward for a person, spending its points.
+
+    One short transaction that only locks the rows involved, always in the
+    same order: the reward row, through a conditional update that only
+    succeeds while it is unclaimed, then the person's balance row. Two
+    claims for the same reward cannot both pass the update, and two claims
+    on the same balance see each other's spend, so points are never spent
+    twice. Claims for other rewards and people never wait on each other.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return ClaimResult(BUSY, None)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL lock_timeout = %s", (CLAIM_LOCK_TIMEOUT,))
+            cur.execute("""
+                UPDATE rewards SET claimed_by_id = %s, claimed_at = CURRENT_TIMESTAMP
+                WHERE reward_id = %s AND claimed_by_id IS NULL
+                RETURNING points_required
+            """, (member_id, reward_id))
+            row = cur.fetchone()
+            if row is None:
+                conn.rollback()
+                cur.execute("SELECT 1 FROM rewards WHERE reward_id = %s", (reward_id,))
+                status = ALREADY_CLAIMED if cur.fetchone() else NOT_FOUND
+                conn.rollback()
+                return ClaimResult(status, None)
+            cost = row[0]
+
+            cur.execute("""
+                SELECT points FROM points_balance WHERE member_id = %s FOR UPDATE
+            """, (member_id,))
+            row = cur.fetchone()
+            balance = row[0] if row else 0
+            if balance < cost:
+                conn.rollback()
+                return ClaimResult(INSUFFICIENT_POINTS, balance)
+
+            # The ledger trigger takes the points off the balance row locked above
+            add_ledger_entry(cur, member_id, -cost, 'reward', reward_id=reward_id)
+        conn.commit()
+        return ClaimResult(CLAIMED, balance - cost)
+    except errors.LockNotAvailable:
+        conn.rollback()
+        return ClaimResult(BUSY, None)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def add_reward(reward_name, points_required, description=None):
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO rewards (reward_name, points_required, description)
+                VALUES (%s, %s, %s)
+                RETURNING reward_id
+            """, (reward_name, points_required, description))
+            reward_id = cur.fetchone()[0]
+        conn.commit()
+        return reward_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_available_rewards():
+    """Return unclaimed rewards, cheapest first."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT reward_id, reward_name, points_required, description
+                FROM rewards
+                WHERE claimed_by_id IS NULL
+                ORDER BY points_required, reward_id
+            """)
+            return [dict(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from utils.database import get_db_connection
+
+# unit -> (canonical unit, factor to canonical); volumes use US measures
+UNIT_CONVERSIONS = {
+    'g': ('g', 1.0),
+    'kg': ('g', 1000.0),
+    'ml': ('ml', 1.0),
+    'l': ('ml', 1000.0),
+    'tsp': ('ml', 4.92892),
+    'tbsp': ('ml', 14.7868),
+    'cup': ('ml', 236.588),
+    'piece': ('piece', 1.0),
+}
+# Canonical amounts at or above the threshold are shown in the larger unit
+DISPLAY_UNITS = {
+    'g': ('kg', 1000.0),
+    'ml': ('l', 1000.0),
+}
+
+SHOPPING_COLUMNS = ['item', 'required', 'on_list', 'to_buy', 'unit', 'meals']
+# Shortfalls below this many g, ml or pieces are unit conversion noise
+# (3 tsp against 1 tbsp), not something to buy
+MIN_TO_BUY = 0.001
+
+
+def _normalize_text(values):
+    """Strip and lowercase a column via its distinct values only."""
+    codes, uniques = pd.factorize(values.fillna(''))
+    normalized = np.array([value.strip().lower() for value in uniques], dtype=object)
+    return codes, normalized
+
+
+def normalize_units(frame, quantity_column='quantity'):
+    """Add key, base_unit and base_quantity columns, converting units column-wise."""
+    item_codes, item_keys = _normalize_text(frame['item'])
+    unit_codes, units = _normalize_text(frame['unit'])
+    # Conversion lookups run once per distinct unit, then broadcast by code;
+    # unknown units are kept as their own base so they still aggregate
+    base_units = np.array([UNIT_CONVERSIONS.get(unit, (unit, 1.0))[0] for unit in units], dtype=object)
+    factors = np.array([UNIT_CONVERSIONS.get(unit, (unit, 1.0))[1] for unit in units], dtype=float)
+    frame['key'] = item_keys[item_codes]
+    frame['base_unit'] = base_units[unit_codes]
+    frame['base_quantity'] = frame[quantity_column].to_numpy(dtype=float) * factors[unit_codes]
+    return frame
+
+
+def display_scale(base_quantities, base_units):
+    """Return per-row (factors, units) that show large g/ml amounts as kg/l."""
+    base_quantities = np.asarray(base_quantities, dtype=float)
+    units = np.asarray(base_units, dtype=object).copy()
+    factors = np.ones(len(units))
+    for base_unit, (display_unit, factor) in DISPLAY_UNITS.items():
+        larger = (units == base_unit) & (base_quantities >= factor)
+        factors[larger] = factor
+        units[larger] = display_unit
+    return factors, units
+
+
+def round_up(values, decimals=2):
+    """Round amounts to buy up, so a small shortfall never shows as 0."""
+    scale = 10 ** decimals
+    # Rounded first, so 0.1 + 0.2 does not become 0.31
+    return np.ceil(np.round(np.asarray(values, dtype=float) * scale, 6)) / scale
+
+
+def load_planned_ingredients(cur, start_date, end_date, servings=None):
+    """Return every planned recipe ingredient in the range, scaled, as a DataFrame."""
+    cur.execute("""
+        SELECT ri.ingredient_name AS item,
+               ri.quantity * COALESCE(%s::numeric / NULLIF(r.servings, 0), 1) AS quantity,
+               ri.unit
+        FROM meal_plans mp
+        JOIN recipes r ON r.recipe_id = mp.recipe_id
+        JOIN recipe_ingredients ri ON ri.recipe_id = mp.recipe_id
+        WHERE mp.date BETWEEN %s AND %s
+    """, (servings, start_date, end_date))
+    return pd.DataFrame(cur.fetchall(), columns=['item', 'quantity', 'unit'])
+
+
+def load_grocery_list(cur):
+    cur.execute("SELECT item, quantity, unit FROM grocery_items WHERE purchased = FALSE")
+    return pd.DataFrame(cur.fetchall(), columns=['item', 'quantity', 'unit'])
+
+
+def build_shopping_list(ingredients, groceries):
+    """Aggregate planned ingredients and diff them against the grocery list.
+
+    Both frames have item, quantity and unit columns. Returns one row per
+    normalized item and base unit with what the plan needs, what is already
+    on the list and what is left to buy, in display units.
+    """
+    if ingredients.empty:
+        return pd.DataFrame(columns=SHOPPING_COLUMNS + ['list_unit', 'list_to_buy'])
+
+    needed = normalize_units(ingredients.copy()).groupby(['key', 'base_unit'], sort=True).agg(
+        item=('item', 'first'),
+        required=('base_quantity', 'sum'),
+        meals=('base_quantity', 'size')
+    )
+    if groceries.empty:
+        needed['on_list'] = 0.0
+        needed['list_unit'] = None
+    else:
+        on_list = normalize_units(groceries.copy()).groupby(['key', 'base_unit']).agg(
+            on_list=('base_quantity', 'sum'),
+            list_unit=('unit', 'first')
+        )
+        needed = needed.join(on_list, how='left')
+        needed['on_list'] = needed['on_list'].fillna(0.0)
+
+    to_buy = needed['required'] - needed['on_list']
+    needed['to_buy'] = to_buy.where(to_buy >= MIN_TO_BUY, 0.0)
+    base_units = needed.index.get_level_values('base_unit')
+
+    # Amount to add in the unit of the existing grocery row, so merging tops it up
+    list_factors = needed['list_unit'].fillna('').str.strip().str.lower().map(
+        lambda unit: UNIT_CONVERSIONS.get(unit, (None, 1.0))[1]
+    ).astype(float)
+    needed['list_to_buy'] = round_up(needed['to_buy'] / list_factors)
+
+    # One display unit per row, picked from the required amount
+    factors, units = display_scale(needed['required'], base_units)
+    result = pd.DataFrame({'item': needed['item'].to_numpy(), 'meals': needed['meals'].to_numpy()})
+    for column in ('required', 'on_list'):
+        result[column] = np.round(needed[column].to_numpy() / factors, 2)
+    result['to_buy'] = round_up(needed['to_buy'].to_numpy() / factors)
+    result['unit'] = units
+    result['list_unit'] = needed['list_unit'].to_numpy()
+    result['list_to_buy'] = needed['list_to_buy'].to_numpy()
+    return result[SHOPPING_COLUMNS + ['list_unit', 'list_to_buy']]
+
+
+def generate_shopping_list(start_date, end_date, servings=None):
+    """Build the shopping list for every meal planned between two dates."""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            ingredients = load_planned_ingredients(cur, start_date, end_date, servings)
+            groceries = load_grocery_list(cur)
+    finally:
+        conn.close()
+    return build_shopping_list(ingredients, groceries)
+
+
+def missing_items(shopping_list):
+    """Return (item, quantity, unit) tuples still to buy, ready for merge_grocery_items."""
+    missing = shopping_list[shopping_list['to_buy'] > 0]
+    return [
+        (row.item, row.list_to_buy, row.list_unit) if pd.notna(row.list_unit) else (row.item, row.to_buy, row.unit)
+        for row in missing.itertuples(index=False)
+    ]
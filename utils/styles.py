@@ -1,7 +1,14 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 import streamlit as st
-from utils.context import require_context
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-@require_context
 def get_mobile_styles():
     """Return mobile-optimized styles."""
     return """
@@ -59,7 +66,6 @@ def get_mobile_styles():
         </style>
     """
 
-@require_context
 def get_base_styles():
     """Get base application styles."""
     return """
@@ -193,3 +199,322 @@ def get_panel_styles():
     </style>
     """
 
+
+def get_header_styles():
+    """Get dashboard header and page title styles."""
+    return """
+    <style>
+        /* Header container */
+        .dashboard-header {
+            text-align: center;
+            padding: 2rem;
+            background: linear-gradient(90deg, rgba(255,75,75,0.1) 0%, rgba(255,143,0,0.1) 100%);
+            border-radius: 10px;
+            margin: 1rem 0 3rem 0;
+            position: relative;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
+            border: 1px solid rgba(255,255,255,0.1);
+            clear: both;
+            display: block;
+            width: 100%;
+        }
+
+        /* Title styling */
+        .main-title {
+            font-size: 2.5rem;
+            font-weight: bold;
+            background: linear-gradient(45deg, #FF4B4B, #FF8F00);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            margin-bottom: 1rem;
+            text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
+            line-height: 1.4;
+            display: block;
+        }
+
+        /* Subtitle styling */
+        .subtitle {
+            font-size: 1.2rem;
+            color: #9CA3AF;
+            animation: fadeInOut 4s infinite;
+            display: block;
+            margin-top: 0.5rem;
+            clear: both;
+        }
+
+        /* Animation */
+        @keyframes fadeInOut {
+            0%, 100% { opacity: 0; transform: translateY(-10px); }
+            20%, 80% { opacity: 1; transform: translateY(0); }
+        }
+
+        /* Page title styling */
+        .page-title {
+            font-size: 1.8rem;
+            font-weight: bold;
+            color: #FFFFFF;
+            margin: 2rem 0;
+            padding: 1rem 0;
+            border-bottom: 2px solid rgba(255,255,255,0.1);
+            clear: both;
+            display: block;
+            width: 100%;
+        }
+
+        /* Fix streamlit elements spacing */
+        .stMarkdown {
+            margin-bottom: 1rem;
+        }
+
+        .element-container {
+            margin-bottom: 1rem;
+        }
+
+        /* Ensure proper spacing between elements */
+        .block-container {
+            padding-top: 2rem;
+            padding-bottom: 2rem;
+        }
+
+        /* Fix for overlapping elements */
+        div[data-testid="stVerticalBlock"] > div {
+            margin-bottom: 1rem;
+        }
+
+        /* Unread notifications */
+        .notification-badge {
+            text-align: right;
+            color: #FF8F00;
+            font-weight: 600;
+        }
+    </style>
+    """
+
+def get_meal_styles():
+    """Get meal planner card styles."""
+    return """
+    <style>
+        /* Mobile-friendly styles */
+        @media (max-width: 768px) {
+            .stColumn {
+                flex: 0 1 100% !important;
+                width: 100% !important;
+                margin-bottom: 1rem;
+            }
+        
+            .meal-card {
+                margin: 0.5rem 0;
+                padding: 0.75rem;
+            }
+        
+            .meal-title {
+                font-size: 1.1rem;
+            }
+        
+            .meal-description {
+                font-size: 0.9rem;
+            }
+        }
+    
+        /* Enhanced card styling */
+        .meal-card {
+            background-color: var(--secondary-background-color);
+            padding: 1rem;
+            border-radius: 8px;
+            margin: 0.75rem 0;
+            border-left: 4px solid var(--primary-color);
+        }
+    
+        .meal-header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 0.5rem;
+        }
+    
+        .meal-title {
+            color: #FFFFFF;
+            font-weight: bold;
+            font-size: 1.2rem;
+        }
+    
+        .meal-type {
+            background: var(--primary-color);
+            padding: 0.25rem 0.5rem;
+            border-radius: 4px;
+            font-size: 0.8rem;
+            color: #FFFFFF;
+        }
+    
+        .meal-content {
+            color: #FFFFFF;
+            font-size: 1rem;
+        }
+    
+        .ingredient-list {
+            margin-top: 1rem;
+            padding-left: 1rem;
+        }
+    
+        .ingredient-item {
+            margin: 0.5rem 0;
+            color: #FFFFFF;
+        }
+    </style>
+    """
+
+def get_list_styles():
+    """Get styles for batched list cards."""
+    return """
+    <style>
+        .list-card {
+            padding: 10px;
+            margin: 5px 0;
+            border-radius: 5px;
+            border-left: 3px solid var(--primary-color);
+            background: rgba(255,255,255,0.05);
+        }
+
+        .list-card-title {
+            font-weight: 600;
+            font-size: 1.1rem;
+            margin-bottom: 0.25rem;
+        }
+
+        .list-card-meta {
+            color: #9CA3AF;
+            font-size: 0.85rem;
+        }
+
+        /* Status variants, matching st.info / st.warning / st.success / st.error */
+        .list-card.info {
+            background: rgba(28,131,225,0.1);
+            border-left-color: rgb(28,131,225);
+        }
+
+        .list-card.warning {
+            background: rgba(255,193,7,0.1);
+            border-left-color: rgb(255,193,7);
+        }
+
+        .list-card.success {
+            background: rgba(33,195,84,0.1);
+            border-left-color: rgb(33,195,84);
+        }
+
+        .list-card.error {
+            background: rgba(255,43,43,0.09);
+            border-left-color: rgb(255,43,43);
+        }
+
+        /* Tinted by event type; text stays dark on the light background */
+        .list-card.tinted {
+            color: #1F2937;
+            border-left-color: rgba(0,0,0,0.2);
+        }
+
+        .list-card.tinted .list-card-meta {
+            color: #4B5563;
+        }
+    </style>
+    """
+
+# Merged in this order; later duplicates win, as they would in the page.
+# get_consolidated_styles is left out: its global reset and fixed sidebar
+# were never applied to the running app.
+STYLE_SOURCES = (
+    get_base_styles,
+    get_mobile_styles,
+    get_panel_styles,
+    get_header_styles,
+    get_meal_styles,
+    get_list_styles,
+)
+
+STYLE_ELEMENT_PREFIX = "familyhub-css-"
+
+def _strip_style_tags(sheet):
+    return re.sub(r"</?style[^>]*>", "", sheet or "")
+
+_serializer_lock = threading.Lock()
+
+@contextmanager
+def _minified_serializer(cssutils):
+    """Minify through cssutils' serializer, putting the previous one back afterwards.
+
+    Rules serialize their nested rules and declarations through the
+    module-level cssutils.ser, so a serializer called directly would only
+    minify the outer rule; it is swapped in for the duration instead.
+    """
+    serializer = cssutils.CSSSerializer()
+    serializer.prefs.useMinified()
+    serializer.prefs.keepUnknownAtRules = True
+    with _serializer_lock:
+        previous = cssutils.ser
+        cssutils.setSerializer(serializer)
+        try:
+            yield serializer
+        finally:
+            cssutils.setSerializer(previous)
+
+def compile_stylesheet(sources=STYLE_SOURCES):
+    """Merge, dedupe and minify style sources; returns (css, sha1 digest)."""
+    import cssutils
+    cssutils.log.setLevel(logging.CRITICAL)
+
+    rules = []
+    with _minified_serializer(cssutils):
+        for source in sources:
+            sheet = cssutils.parseString(_strip_style_tags(source()), validate=False)
+            for rule in sheet:
+                if rule.type == rule.COMMENT:
+                    continue
+                if rule.cssText:
+                    rules.append(rule.cssText)
+    # Keep the last copy of each identical rule so the cascade order is unchanged
+    seen = set()
+    unique = []
+    for text in reversed(rules):
+        if text not in seen:
+            seen.add(text)
+            unique.append(text)
+    css = "".join(reversed(unique))
+    return css, hashlib.sha1(css.encode('utf-8')).hexdigest()[:12]
+
+@lru_cache(maxsize=None)
+def build_stylesheet():
+    """Compile the app-wide stylesheet once per process."""
+    return compile_stylesheet()
+
+def inject_stylesheet(force=False):
+    """Add the compiled stylesheet to the page head, once per full run.
+
+    Nothing is remembered across runs: a run cut short by st.rerun() or a
+    dropped iframe may never execute the script, and the next run has to
+    try again. The script skips the work when the <style> element is
+    already in the parent document.
+    """
+    css, digest = build_stylesheet()
+    # The run context replaces its cursors at the start of every run, so
+    # they tell a second call in this run (the header) from a new run
+    ctx = get_script_run_ctx()
+    run = ctx.cursors if ctx else None
+    if not force and run is not None and st.session_state.get('_stylesheet_run') is run:
+        return False
+    style_id = STYLE_ELEMENT_PREFIX + digest
+    # JSON-encode the CSS for the script, without letting it close the <script> tag
+    css_literal = json.dumps(css).replace("</", "<\\/")
+    components.html(f"""
+        <script>
+            const doc = window.parent.document;
+            if (!doc.getElementById("{style_id}")) {{
+                doc.querySelectorAll('style[id^="{STYLE_ELEMENT_PREFIX}"]').forEach(el => el.remove());
+                const style = doc.createElement("style");
+                style.id = "{style_id}";
+                style.textContent = {css_literal};
+                doc.head.appendChild(style);
+            }}
+        </script>
+    """, height=0)
+    st.session_state._stylesheet_run = run
+    return True
@@ -0,0 +1,161 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from datetime import datetime
+from pathlib import Path
+
+# Traces are written in the Chrome Trace Event "JSON Array" format, which
+# chrome://tracing, Perfetto and speedscope open without a closing bracket,
+# so events can be appended to the current file as traces complete.
+TRACES_DIR = Path("logs") / "traces"
+TRACE_FILE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_FILES_KEPT = 10
+
+# Fraction of traces written to disk; traces slower than the threshold are always kept
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.1'))
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '300'))
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'true').lower() != 'false'
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+class Trace:
+    """Events collected for one root span on one thread."""
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = f"{os.getpid():x}-{threading.get_ident():x}-{_now_us():x}"
+        self.events = []
+
+
+class TraceFileWriter:
+    """Appends trace events to size-rotated files in TRACES_DIR."""
+
+    def __init__(self, directory=TRACES_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._path = None
+
+    def _new_file(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path = self.directory / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+        with open(self._path, 'w') as f:
+            f.write("[\n")
+        files = sorted(self.directory.glob("trace_*.json"))
+        for old_file in files[:-TRACE_FILES_KEPT]:
+            old_file.unlink(missing_ok=True)
+
+    def write(self, events):
+        with self._lock:
+            if self._path is None or not self._path.exists() or \
+                    self._path.stat().st_size > TRACE_FILE_MAX_BYTES:
+                self._new_file()
+            with open(self._path, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event, default=str))
+                    f.write(",\n")
+
+    def list_files(self):
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("trace_*.json"), reverse=True)
+
+
+class Tracer:
+    """Request-scoped spans; the outermost span on a thread starts a new trace."""
+
+    def __init__(self, writer=None):
+        self.writer = writer or TraceFileWriter()
+        self.enabled = TRACING_ENABLED
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def current_trace(self):
+        return getattr(self._local, 'trace', None)
+
+    def _event(self, name, category, start_us, duration_us, args):
+        return {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': duration_us,
+            'pid': self._pid,
+            'tid': threading.get_ident(),
+            'args': args
+        }
+
+    @contextmanager
+    def span(self, name, category="app", **args):
+        """Trace a block; opens a root trace if none is active on this thread."""
+        if not self.enabled:
+            yield None
+            return
+        trace = self.current_trace()
+        is_root = trace is None
+        if is_root:
+            trace = self._local.trace = Trace(name)
+            args.setdefault('trace_id', trace.trace_id)
+        start_us = _now_us()
+        start = time.perf_counter()
+        try:
+            yield trace
+        except Exception as e:
+            args['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            trace.events.append(self._event(name, category, start_us, int(duration * 1_000_000), args))
+            if is_root:
+                self._local.trace = None
+                self._finish(trace, duration)
+
+    def record_span(self, name, category, start_us, duration, **args):
+        """Add an already-timed child span to the active trace, if any."""
+        trace = self.current_trace()
+        if trace is not None:
+            trace.events.append(self._event(name, category, start_us, int(duration * 1_000_000), args))
+
+    def instant(self, name, category="app", **args):
+        """Add a zero-duration marker to the active trace, if any."""
+        trace = self.current_trace()
+        if trace is not None:
+            trace.events.append({
+                'name': name, 'cat': category, 'ph': 'i', 's': 't',
+                'ts': _now_us(), 'pid': self._pid, 'tid': threading.get_ident(), 'args': args
+            })
+
+    def _finish(self, trace, duration):
+        if duration * 1000 < TRACE_SLOW_MS and random.random() >= TRACE_SAMPLE_RATE:
+            return
+        thread_name = threading.current_thread().name
+        trace.events.append({
+            'name': 'thread_name', 'ph': 'M', 'pid': self._pid,
+            'tid': threading.get_ident(), 'args': {'name': thread_name}
+        })
+        try:
+            self.writer.write(trace.events)
+        except OSError:
+            # Tracing must never break a rerun
+            pass
+
+    def trace_function(self, name=None, category="app"):
+        """Decorator that wraps a function in a span."""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+tracer = Tracer()
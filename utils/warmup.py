@@ -0,0 +1,62 @@
+import threading
+import time
+from utils.database import init_connection_pool
+from utils.init_database import ensure_database
+from utils.logger import log_info, log_error
+from utils.performance import performance_monitor
+from utils.reference_data import prefetch_reference_data
+from utils.styles import build_stylesheet
+from utils.tracing import tracer
+
+# A failed warm-up (e.g. the database is still starting) is retried at most this often
+WARMUP_RETRY_SECONDS = 30
+
+_ready = threading.Event()
+_warmup_lock = threading.Lock()
+_last_attempt = 0.0
+
+WARMUP_STEPS = (
+    ('connection_pool', init_connection_pool),
+    ('schema', ensure_database),
+    ('stylesheet', build_stylesheet),
+    ('reference_data', prefetch_reference_data),
+)
+
+
+def is_ready():
+    """True once every warm-up step has succeeded in this process."""
+    return _ready.is_set()
+
+
+def warm_up(force=False):
+    """Open the pool, validate the schema and prefill caches before serving traffic."""
+    global _last_attempt
+    if _ready.is_set() and not force:
+        return True
+    with _warmup_lock:
+        if _ready.is_set() and not force:
+            return True
+        if not force and time.monotonic() - _last_attempt < WARMUP_RETRY_SECONDS:
+            return False
+        _last_attempt = time.monotonic()
+        started = time.perf_counter()
+        with tracer.span("warmup", "startup"):
+            for step, func in WARMUP_STEPS:
+                step_start = time.perf_counter()
+                try:
+                    ok = func() is not False
+                except Exception as e:
+                    log_error(f"Warm-up step {step} failed: {str(e)}", show_notification=False)
+                    ok = False
+                performance_monitor.record('warmup_time', time.perf_counter() - step_start, operation=step)
+                if not ok:
+                    log_info(f"Warm-up stopped at {step}; retrying in {WARMUP_RETRY_SECONDS}s")
+                    return False
+        _ready.set()
+        log_info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return True
+
+
+performance_monitor.register_gauge(
+    'app_ready', lambda: 1 if is_ready() else 0, "1 once the warm-up has completed"
+)
@@ -2,7 +2,6 @@ import asyncio
 import json
 from datetime import datetime
 import streamlit as st
-from streamlit.web.server.websocket_headers import _get_websocket_headers
 
 class WebSocketManager:
     def __init__(self):